@@ -0,0 +1,40 @@
+"""
+条件请求（conditional GET）工具：以响应内容摘要（services.versions）生成弱 ETag。
+
+列表与详情接口读出要返回的行后一次序列化为 JSON 并计算摘要，与请求头 If-None-Match 匹配则返回 304、省去响应体传输；
+否则直接以已序列化的字节作为响应体，不再经 response_model 二次校验与序列化（response_model 仍用于生成文档）。
+参考数据列表的序列化结果随缓存一起保存，命中缓存时不访问数据库也不序列化。NDJSON 流式输出不带 ETag。
+只按 If-None-Match 判断，不提供 Last-Modified：updated_at 为写入事务的开始时间，不能据此判断是否变化。
+"""
+
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+
+from services.versions import VersionedJSON
+
+
+def validator_headers(version: str) -> Dict[str, str]:
+    return {
+        "ETag": f'W/"{version}"',
+        # 允许缓存但每次须携带 If-None-Match 重新验证
+        "Cache-Control": "no-cache",
+    }
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # 弱比较：忽略 W/ 前缀
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def conditional_json(request: Request, payload: VersionedJSON) -> Response:
+    """客户端版本未变化时返回 304，否则以预序列化的 JSON 返回 200；两者都带 ETag 响应头。"""
+    headers = validator_headers(payload.version)
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
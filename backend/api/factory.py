@@ -1,5 +1,24 @@
-from fastapi import APIRouter, Depends
-from services.auth_deps import get_current_app_user
+"""
+工厂系统综合接口：看板统计等跨资源的只读聚合、站内搜索，以及增量同步用的删除墓碑。
+"""
+
+from datetime import date, datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from api.pagination import MAX_PAGE_SIZE, set_next_cursor
+from schemas.changes import SyncWatermarkOut, TombstoneOut
+from schemas.search import SearchHit
+from schemas.stats import DashboardStats
+from services import changes as changes_service
+from services import search as search_service
+from services import stats as stats_service
+from services import summaries as summaries_service
+from services.auth_deps import get_current_app_user, require_app_roles
+from src.db.database import get_async_db, get_db
 
 router = APIRouter(
     prefix="/factory",
@@ -7,4 +26,74 @@ router = APIRouter(
     dependencies=[Depends(get_current_app_user)],
 )
 
-# 预留：工厂系统相关接口在此模块下实现
+
+@router.get("/stats", response_model=DashboardStats)
+async def get_dashboard_stats(
+    low_stock_threshold: int = Query(stats_service.DEFAULT_LOW_STOCK_THRESHOLD, ge=0, description="低库存阈值"),
+    date_from: Optional[date] = Query(None, description="采购统计起始日期（含）"),
+    date_to: Optional[date] = Query(None, description="采购统计截止日期（含）"),
+    live: bool = Query(False, description="是否绕过汇总表，直接按明细实时计算"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    看板统计：各仓库库存金额与低库存数、按月/供应商/零件类型的采购支出，一次查询返回。
+    默认读取汇总表，响应中的 summary_rebuilt_at / summary_updated_at 标示汇总新鲜度。
+    """
+    return await stats_service.get_dashboard_stats_async(db, low_stock_threshold, date_from, date_to, live)
+
+
+@router.post(
+    "/stats/rebuild",
+    dependencies=[Depends(require_app_roles("admin"))],
+)
+def rebuild_stats_summaries(db: Session = Depends(get_db)) -> dict:
+    """按明细整体重建汇总表（首次部署或数据修复后执行）。"""
+    summaries_service.rebuild_summaries(db)
+    return {"rebuilt": [summaries_service.PURCHASE_SUMMARY, summaries_service.STOCK_SUMMARY]}
+
+
+@router.get("/deletions", response_model=List[TombstoneOut])
+async def list_deletions(
+    response: Response,
+    resource: Optional[Literal[changes_service.RESOURCES]] = Query(None, description="资源名，不传则返回全部"),
+    changed_since: Optional[datetime] = Query(None, description="增量同步水位（见 /factory/sync-watermark）：deleted_at >= 该值的删除"),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="每页条数，按墓碑序号排序"),
+    after: Optional[int] = Query(None, description="游标：上一页最后一条的 id"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    删除墓碑：与各列表接口的 changed_since 配合，下游同步据此删除本地已不存在的记录。
+    """
+    records = await changes_service.list_tombstones_async(db, resource, changed_since, limit, after)
+    set_next_cursor(response, records, limit, lambda r: str(r.id))
+    return records
+
+
+@router.get("/sync-watermark", response_model=SyncWatermarkOut)
+async def get_sync_watermark(db: AsyncSession = Depends(get_async_db)):
+    """
+    增量同步水位：每轮同步开始前调用，本轮各接口仍用上一轮的水位作为 changed_since，
+    本轮全部成功后保存此值供下一轮使用。不要用客户端见过的最大 updated_at 作为水位。
+    """
+    return {"watermark": await changes_service.sync_watermark_async(db)}
+
+
+@router.get("/search", response_model=List[SearchHit])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=50, description="关键词，按子串匹配（不区分大小写）"),
+    resource: Optional[List[Literal[search_service.RESOURCES]]] = Query(None, description="限定资源，可多选"),
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[int] = Query(
+        None, ge=0, le=search_service.MAX_OFFSET, description="游标：上一页响应头 X-Next-Cursor 的值"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    按名称搜索零件、供应商（名称/地址）与员工，结果按匹配程度排序。
+    """
+    offset = after or 0
+    hits = await search_service.search_async(db, q.strip(), resource, limit, offset)
+    if offset + limit <= search_service.MAX_OFFSET:
+        set_next_cursor(response, hits, limit, lambda _: str(offset + limit))
+    return hits
@@ -1,4 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
+from fastapi.responses import PlainTextResponse
+
+from api.metrics import render_metrics
+from services.auth import auth_cache
+from services.readiness import check_readiness
+from services.reference_cache import reference_cache
+from src.db.database import pool_stats
 
 router = APIRouter(prefix="", tags=["system"])
 
@@ -9,3 +16,39 @@ async def health_check() -> dict:
     健康检查：用于存活探测和基础连通性验证。
     """
     return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def readiness_check(response: Response) -> dict:
+    """
+    就绪探测：数据库 SELECT 1（短超时）、JWKS 公钥可用、连接池余量；任一不满足返回 503。
+    结果缓存 READINESS_CACHE_SECONDS 秒，频繁探测不会给数据库加压。
+    """
+    result = await check_readiness()
+    if not result["ready"]:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return result
+
+
+@router.get("/health/pool")
+def pool_health() -> dict:
+    """
+    数据库连接池指标：当前占用/溢出及累计借出、等待耗时、超时次数（不访问数据库）。
+    """
+    return pool_stats()
+
+
+@router.get("/health/cache")
+def cache_health() -> dict:
+    """
+    进程内缓存指标：鉴权缓存与参考数据缓存的条目数、命中率、淘汰次数。
+    """
+    return {"auth": auth_cache.stats(), "reference": reference_cache.stats()}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    Prometheus 指标：按路由的请求数、延迟直方图与 SQL 计量，进行中请求、线程池、连接池与缓存命中。
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
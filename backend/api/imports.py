@@ -0,0 +1,47 @@
+"""
+批量导入（import）路由：以请求体流式上传 CSV / NDJSON，导入零件、供应商、采购单。
+"""
+
+import tempfile
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from schemas.imports import ImportResult
+from services import imports as imports_service
+from services.auth_deps import get_current_app_user, require_app_roles
+from src.db.database import get_db
+
+# 上传内容超过该大小即落盘，保证内存占用恒定
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+router = APIRouter(
+    prefix="/factory/import",
+    tags=["import"],
+    dependencies=[Depends(get_current_app_user)],
+)
+
+
+@router.post(
+    "/{resource}",
+    response_model=ImportResult,
+    dependencies=[Depends(require_app_roles("admin", "purchaser"))],
+)
+async def import_resource(
+    resource: Literal["parts", "suppliers", "purchases"],
+    request: Request,
+    fmt: Literal["csv", "ndjson"] = Query("csv", alias="format", description="csv（首行为表头）或 ndjson"),
+    chunk_size: int = Query(imports_service.DEFAULT_CHUNK_SIZE, ge=1, le=5000, description="每批写入行数"),
+    db: Session = Depends(get_db),
+):
+    """
+    请求体即文件内容（Content-Type: text/csv 或 application/x-ndjson）。
+    校验失败或写入失败的行记入 errors，不影响其余行。
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        return await run_in_threadpool(imports_service.import_rows, db, resource, spool, fmt, chunk_size)
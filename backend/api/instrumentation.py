@@ -0,0 +1,201 @@
+"""
+请求级 SQL 计量：每个请求执行的语句数、数据库耗时、连接池借出等待与处理耗时。
+
+- 引擎事件：同步引擎与异步引擎（sync_engine）的 before/after_cursor_execute 为每条语句计时，
+  累加到当前请求的 RequestStats（contextvar；同步路由在线程池中执行时上下文随之复制，
+  异步会话的 greenlet 沿用调用方上下文）；连接池借出等待由 src.db.database 的等待回调累加；
+- RequestInstrumentationMiddleware（纯 ASGI 中间件）：响应头写入
+  Server-Timing: db;dur=..;desc="N queries", pool;dur=.., app;dur=..（毫秒），
+  维护进行中请求数，请求结束后按 (方法, 路由模板) 累计到预先分配的 RouteSeries
+  （请求数、状态码分类、延迟分桶、SQL 计数），由 api/metrics.py 以 Prometheus 文本格式输出；
+- 单条语句超过 SLOW_QUERY_MS 时以 WARNING 记录路由、耗时与 SQL（截断）。
+
+响应头发出后才执行的语句（如 NDJSON 流式输出）只计入累计指标，不在 Server-Timing 中。
+单个请求的计数同一时刻只由处理它的一个线程更新；按路由累计只在事件循环线程中更新与读取，均不加锁。
+"""
+
+import logging
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.db.database import add_pool_wait_listener, engine, get_async_engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))  # 0 表示不记录慢语句
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").strip().lower() in ("1", "true", "yes", "on")
+
+# 请求延迟直方图的桶上界（秒，升序，逗号分隔）
+LATENCY_BUCKETS = tuple(
+    sorted(
+        float(bound)
+        for bound in os.getenv("METRICS_LATENCY_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10").split(",")
+        if bound.strip()
+    )
+)
+
+SLOW_QUERY_LOG_CHARS = 500
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestStats:
+    __slots__ = ("scope", "status", "statements", "db_seconds", "pool_wait_seconds", "slow_statements")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.status = 0
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.slow_statements = 0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+_installed = False
+
+
+def _route_of(scope: dict) -> str:
+    # 路由匹配后 FastAPI 将 APIRoute 写入 scope；按路径模板聚合，避免把路径参数变成标签
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._instrument_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - context._instrument_started
+    stats = _current.get()
+    slow = SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        if slow:
+            stats.slow_statements += 1
+    if slow:
+        where = f"{stats.scope['method']} {_route_of(stats.scope)}" if stats is not None else "-"
+        sql = " ".join(statement.split())[:SLOW_QUERY_LOG_CHARS]
+        logger.warning("slow query %.1fms %s: %s", elapsed * 1000, where, sql)
+
+
+def _on_pool_wait(seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+
+def install_db_instrumentation(engines: Optional[List[Engine]] = None) -> None:
+    """为引擎注册计时事件（默认同步引擎与异步引擎）；只在首次调用时生效。"""
+    global _installed
+    if _installed:
+        return
+    for target in engines or [engine, get_async_engine().sync_engine]:
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    add_pool_wait_listener(_on_pool_wait)
+    _installed = True
+
+
+# ---- 按路由累计 ----
+
+_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+
+class RouteSeries:
+    """单个 (方法, 路由模板) 的累计值；延迟分桶按桶存放（非累积），输出时再累加。"""
+
+    __slots__ = (
+        "requests", "statuses", "latency_buckets", "latency_sum",
+        "statements", "db_seconds", "pool_wait_seconds", "slow_statements",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses = [0] * 5  # 1xx..5xx
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # 末位为 +Inf
+        self.latency_sum = 0.0
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.slow_statements = 0
+
+
+# (方法, 路由模板) -> RouteSeries；首次出现时创建，之后每个请求只做一次字典查找与原地累加
+_series: Dict[Tuple[str, str], RouteSeries] = {}
+# 正在处理的请求数（含流式响应的输出阶段）
+in_flight = 0
+
+
+def _record(stats: RequestStats, status: int, handler_seconds: float) -> None:
+    method = stats.scope["method"]
+    key = (method if method in _METHODS else "OTHER", _route_of(stats.scope))
+    series = _series.get(key)
+    if series is None:
+        series = _series[key] = RouteSeries()
+    series.requests += 1
+    # 未发出响应即抛出异常时由外层 ServerErrorMiddleware 返回 500，记为 5xx
+    series.statuses[status // 100 - 1 if 100 <= status < 600 else 4] += 1
+    series.latency_buckets[bisect_left(LATENCY_BUCKETS, handler_seconds)] += 1
+    series.latency_sum += handler_seconds
+    series.statements += stats.statements
+    series.db_seconds += stats.db_seconds
+    series.pool_wait_seconds += stats.pool_wait_seconds
+    series.slow_statements += stats.slow_statements
+
+
+def requests_in_flight() -> int:
+    return in_flight
+
+
+def route_series() -> List[Tuple[str, str, RouteSeries]]:
+    """按 (方法, 路由模板) 排序的累计值快照（对象本身，调用方只读）。"""
+    return [(method, route, series) for (method, route), series in sorted(_series.items())]
+
+
+def _server_timing(stats: RequestStats, handler_seconds: float) -> bytes:
+    return (
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries", '
+        f"pool;dur={stats.pool_wait_seconds * 1000:.1f}, app;dur={handler_seconds * 1000:.1f}"
+    ).encode()
+
+
+class RequestInstrumentationMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        global in_flight
+        stats = RequestStats(scope)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                stats.status = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    headers = list(message.get("headers", ()))
+                    headers.append((b"server-timing", _server_timing(stats, time.perf_counter() - started)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(stats)
+        in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            in_flight -= 1
+            _current.reset(token)
+            _record(stats, stats.status, time.perf_counter() - started)
+
@@ -1,16 +1,52 @@
 """
 库存（inventory）相关路由：查询、创建、更新、调整库存。
+GET /factory/inventory/events 以 Server-Sent Events 推送库存变更，可按仓库过滤。
+补货阈值：PUT /factory/inventory/{warehouse_id}/{part_id}/reorder 设置；
+GET /factory/inventory/low-stock 列出低库存行，GET /factory/inventory/alerts 查询后台评估生成的告警。
 """
 
-from typing import List, Optional
+import asyncio
+import json
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from schemas.inventory import InventoryAdjust, InventoryCreate, InventoryOut, InventoryUpdate
+from api.conditional import conditional_json
+from api.pagination import (
+    MAX_PAGE_SIZE,
+    STREAM_BATCH_SIZE,
+    csv_response,
+    encode_composite_cursor,
+    ndjson_response,
+    parse_composite_cursor,
+    set_next_cursor,
+)
+from schemas.inventory import (
+    InventoryAdjust,
+    InventoryBatchAdjust,
+    InventoryBatchAdjustOut,
+    InventoryCreate,
+    InventoryOut,
+    InventoryReorderUpdate,
+    InventoryUpdate,
+    StockAlertOut,
+)
 from services import inventory as inventory_service
+from services import stock_alerts as stock_alerts_service
+from services.inventory_events import bus as inventory_event_bus
 from services.auth_deps import get_current_app_user, require_app_roles
-from src.db.database import get_db
+from services.versions import versioned_json, versioned_json_one
+from src.db.database import get_async_db, get_db
+
+EXPORT_COLUMNS = ("warehouse_id", "part_id", "stock_quantity", "created_at", "updated_at")
+# SSE 心跳间隔（秒），避免代理因空闲断开；断线后浏览器按 retry 毫秒重连
+SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MS = 3000
 
 router = APIRouter(
     prefix="/factory/inventory",
@@ -20,20 +56,150 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[InventoryOut])
-def list_inventory(
+async def list_inventory(
+    request: Request,
+    warehouse_id: Optional[str] = Query(None),
+    part_id: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="每页条数，按 (warehouse_id, part_id) 排序"),
+    after: Optional[str] = Query(None, description="游标：上一页最后一条的 warehouse_id,part_id"),
+    changed_since: Optional[datetime] = Query(None, description="增量同步水位（见 /factory/sync-watermark）：updated_at >= 该值的行"),
+    stream: bool = Query(False, description="以 NDJSON 流式返回全部匹配行"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    cursor = parse_composite_cursor(after)
+    if stream:
+        rows = inventory_service.stream_inventory_async(
+            db, warehouse_id, part_id, after=cursor, batch_size=STREAM_BATCH_SIZE, changed_since=changed_since
+        )
+        return ndjson_response(rows, InventoryOut)
+    records = await inventory_service.list_inventory_async(
+        db, warehouse_id, part_id, limit=limit, after=cursor, changed_since=changed_since
+    )
+    response = conditional_json(request, versioned_json(InventoryOut, records))
+    set_next_cursor(response, records, limit, lambda r: encode_composite_cursor(r.warehouse_id, r.part_id))
+    return response
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_inventory(
     warehouse_id: Optional[str] = Query(None),
     part_id: Optional[str] = Query(None),
     db: Session = Depends(get_db),
 ):
-    return inventory_service.list_inventory(db, warehouse_id, part_id)
+    """以 CSV 流式导出库存（服务端游标分批读取）。"""
+    rows = inventory_service.iter_inventory(db, warehouse_id, part_id, batch_size=STREAM_BATCH_SIZE)
+    return csv_response(rows, EXPORT_COLUMNS, "inventory.csv")
+
+
+async def _inventory_event_stream(request: Request, warehouse_id: Optional[str]):
+    async with inventory_event_bus.subscribe(warehouse_id) as subscriber:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while not await request.is_disconnected():
+            try:
+                item = await asyncio.wait_for(subscriber.get(), SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield f"event: {item['op']}\ndata: {json.dumps(item)}\n\n"
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def inventory_events(
+    request: Request,
+    warehouse_id: Optional[str] = Query(None, description="只接收该仓库的变更"),
+    db: Session = Depends(get_db),
+):
+    """
+    库存变更推送（text/event-stream）：事件类型 upsert / delete / resync，
+    data 为 {op, warehouse_id, part_id, stock_quantity}；收到 resync 时应重新拉取列表。
+    """
+    # 鉴权依赖可能已用同一会话查询过 app_user，长连接期间不应占用连接池
+    await run_in_threadpool(db.close)
+    return StreamingResponse(
+        _inventory_event_stream(request, warehouse_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/adjust",
+    response_model=InventoryBatchAdjustOut,
+    responses={status.HTTP_409_CONFLICT: {"model": InventoryBatchAdjustOut}},
+    dependencies=[Depends(require_app_roles("admin", "warehouse_manager", "inventory_operator"))],
+)
+def batch_adjust_inventory(payload: InventoryBatchAdjust, response: Response, db: Session = Depends(get_db)):
+    """批量库存变动：一个事务、一条语句，全部成功或全部回滚；失败时返回 409 及逐行原因。"""
+    result = inventory_service.batch_adjust_inventory(db, payload)
+    if not result.applied:
+        response.status_code = status.HTTP_409_CONFLICT
+    return result
+
+
+@router.post(
+    "/rebuild",
+    dependencies=[Depends(require_app_roles("admin"))],
+)
+def rebuild_inventory(db: Session = Depends(get_db)) -> dict:
+    """按采购记录整体重算库存（单条集合语句）。"""
+    rows = inventory_service.rebuild_inventory_from_purchases(db)
+    return {"rows": rows}
+
+
+@router.get("/low-stock", response_model=List[InventoryOut])
+async def list_low_stock(
+    response: Response,
+    warehouse_id: Optional[str] = Query(None),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="每页条数，按 (warehouse_id, part_id) 排序"),
+    after: Optional[str] = Query(None, description="游标：上一页最后一条的 warehouse_id,part_id"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """库存不高于补货点的记录（未设补货点的不计入）。"""
+    records = await inventory_service.list_low_stock_async(
+        db, warehouse_id, limit=limit, after=parse_composite_cursor(after)
+    )
+    set_next_cursor(response, records, limit, lambda r: encode_composite_cursor(r.warehouse_id, r.part_id))
+    return records
+
+
+@router.get("/alerts", response_model=List[StockAlertOut])
+async def list_stock_alerts(
+    response: Response,
+    alert_status: Literal["open", "resolved", "all"] = Query("open", alias="status", description="open / resolved / all"),
+    warehouse_id: Optional[str] = Query(None),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="每页条数，按告警编号递增"),
+    after: Optional[int] = Query(None, description="游标：上一页最后一条的告警编号"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    records = await stock_alerts_service.list_alerts_async(
+        db, None if alert_status == "all" else alert_status, warehouse_id, limit=limit, after=after
+    )
+    set_next_cursor(response, records, limit, lambda r: str(r.id))
+    return records
+
+
+@router.post(
+    "/alerts/evaluate",
+    dependencies=[Depends(require_app_roles("admin"))],
+)
+def evaluate_stock_alerts(db: Session = Depends(get_db)) -> dict:
+    """全量重新评估低库存告警（批量设置补货点后或后台评估停用时使用）。"""
+    opened, resolved = stock_alerts_service.evaluate_stock_alerts(db)
+    db.commit()
+    return {"opened": len(opened), "resolved": len(resolved)}
 
 
 @router.get("/{warehouse_id}/{part_id}", response_model=InventoryOut)
-def get_inventory(warehouse_id: str, part_id: str, db: Session = Depends(get_db)):
-    record = inventory_service.get_inventory(db, warehouse_id, part_id)
+async def get_inventory(
+    warehouse_id: str,
+    part_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    record = await inventory_service.get_inventory_async(db, warehouse_id, part_id)
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inventory not found")
-    return record
+    return conditional_json(request, versioned_json_one(InventoryOut, record))
 
 
 @router.post(
@@ -58,6 +224,23 @@ def update_inventory(warehouse_id: str, part_id: str, payload: InventoryUpdate,
     return record
 
 
+@router.put(
+    "/{warehouse_id}/{part_id}/reorder",
+    response_model=InventoryOut,
+    dependencies=[Depends(require_app_roles("admin", "warehouse_manager"))],
+)
+def set_reorder_levels(
+    warehouse_id: str, part_id: str, payload: InventoryReorderUpdate, db: Session = Depends(get_db)
+):
+    try:
+        record = inventory_service.set_reorder_levels(db, warehouse_id, part_id, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not record:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inventory not found")
+    return record
+
+
 @router.post(
     "/{warehouse_id}/{part_id}/adjust",
     response_model=InventoryOut,
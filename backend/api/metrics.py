@@ -0,0 +1,142 @@
+"""
+Prometheus 文本格式（0.0.4）指标输出，供 GET /metrics 抓取。
+
+- 按 (方法, 路由模板)：请求数（按状态码分类）、延迟直方图、SQL 语句数/耗时、连接池借出等待、慢语句数，
+  数据由 api/instrumentation.py 的中间件在请求结束时原地累加，抓取时才格式化；
+- 进行中请求数、同步路由线程池（anyio 默认 CapacityLimiter）的容量/占用/排队数；
+- 同步与异步引擎连接池的占用与溢出，同步引擎的累计借出/新建/失效/超时与借出等待；
+- 鉴权缓存与参考数据缓存的条目数、命中/未命中/淘汰次数与命中率。
+
+指标为进程内状态：多 worker 部署时每个 worker 各自计数，需按实例抓取后再聚合。
+"""
+
+from typing import Iterable, List, Tuple
+
+import anyio.to_thread
+
+from api.instrumentation import LATENCY_BUCKETS, requests_in_flight, route_series
+from services.auth import auth_cache
+from services.reference_cache import reference_cache
+from src.db.database import DB_MAX_OVERFLOW, engine, get_async_engine, pool_metrics
+
+_STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+_BUCKET_LABELS = tuple(f"{bound:g}" for bound in LATENCY_BUCKETS) + ("+Inf",)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _value(value: float) -> str:
+    # 计数器不能用 :g（超过 6 位有效数字会丢精度）；float 的 repr 是可精确还原的最短表示
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Exposition:
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def add(self, name: str, kind: str, description: str, samples: Iterable[Tuple[str, float]]) -> None:
+        self.lines.append(f"# HELP {name} {description}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        self.lines.extend(
+            f"{name}{{{labels}}} {_value(value)}" if labels else f"{name} {_value(value)}" for labels, value in samples
+        )
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _add_route_metrics(out: _Exposition) -> None:
+    series = [(f'method="{_label(method)}",route="{_label(route)}"', s) for method, route, s in route_series()]
+
+    out.add(
+        "factory_http_requests_total",
+        "counter",
+        "请求数（按状态码分类）",
+        (
+            (f'{labels},code="{code}"', count)
+            for labels, s in series
+            for code, count in zip(_STATUS_CLASSES, s.statuses)
+            if count
+        ),
+    )
+
+    name = "factory_http_request_duration_seconds"
+    out.lines.append(f"# HELP {name} 请求处理耗时（秒，至响应结束）")
+    out.lines.append(f"# TYPE {name} histogram")
+    for labels, s in series:
+        cumulative = 0
+        for le, count in zip(_BUCKET_LABELS, s.latency_buckets):
+            cumulative += count
+            out.lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        out.lines.append(f"{name}_sum{{{labels}}} {_value(s.latency_sum)}")
+        out.lines.append(f"{name}_count{{{labels}}} {s.requests}")
+
+    out.add("factory_db_statements_total", "counter", "SQL 语句数", ((labels, s.statements) for labels, s in series))
+    out.add(
+        "factory_db_seconds_total", "counter", "SQL 执行耗时（秒）", ((labels, s.db_seconds) for labels, s in series)
+    )
+    out.add(
+        "factory_db_request_pool_wait_seconds_total",
+        "counter",
+        "请求内连接池借出等待（秒）",
+        ((labels, s.pool_wait_seconds) for labels, s in series),
+    )
+    out.add(
+        "factory_db_slow_statements_total",
+        "counter",
+        "慢语句数（SLOW_QUERY_MS）",
+        ((labels, s.slow_statements) for labels, s in series),
+    )
+
+
+def _add_runtime_metrics(out: _Exposition) -> None:
+    out.add("factory_http_requests_in_flight", "gauge", "进行中的请求数", [("", requests_in_flight())])
+
+    # 同步路由与 run_in_threadpool 共用 anyio 的默认线程限额；必须在事件循环中读取
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    out.add("factory_threadpool_threads", "gauge", "线程池容量", [("", limiter.total_tokens)])
+    out.add("factory_threadpool_threads_busy", "gauge", "线程池占用数", [("", statistics.borrowed_tokens)])
+    out.add("factory_threadpool_tasks_waiting", "gauge", "等待线程的任务数", [("", statistics.tasks_waiting)])
+
+
+def _add_pool_metrics(out: _Exposition) -> None:
+    pools = (("sync", engine.pool), ("async", get_async_engine().sync_engine.pool))
+    labelled = [(f'engine="{name}"', pool) for name, pool in pools]
+    out.add("factory_db_pool_size", "gauge", "常驻连接数", ((labels, p.size()) for labels, p in labelled))
+    out.add("factory_db_pool_checked_out", "gauge", "已借出连接数", ((labels, p.checkedout()) for labels, p in labelled))
+    out.add("factory_db_pool_overflow", "gauge", "溢出连接数", ((labels, max(p.overflow(), 0)) for labels, p in labelled))
+    out.add("factory_db_pool_max_overflow", "gauge", "允许的溢出连接数", [("", DB_MAX_OVERFLOW)])
+
+    # 累计计数只覆盖同步引擎（见 src.db.database.PoolMetrics）
+    for name, description, value in (
+        ("factory_db_pool_checkouts_total", "借出次数", pool_metrics.checkouts),
+        ("factory_db_pool_connects_total", "新建连接次数", pool_metrics.connects),
+        ("factory_db_pool_invalidations_total", "连接失效次数", pool_metrics.invalidations),
+        ("factory_db_pool_timeouts_total", "借出超时次数", pool_metrics.timeouts),
+        ("factory_db_pool_wait_seconds_total", "借出等待（秒）", pool_metrics.wait_seconds_total),
+    ):
+        out.add(name, "counter", description, [('engine="sync"', value)])
+
+
+def _add_cache_metrics(out: _Exposition) -> None:
+    caches = [
+        (f'cache="{name}"', cache.stats()) for name, cache in (("auth", auth_cache), ("reference", reference_cache))
+    ]
+    out.add("factory_cache_entries", "gauge", "缓存条目数", ((labels, s["size"]) for labels, s in caches))
+    out.add("factory_cache_hits_total", "counter", "命中次数", ((labels, s["hits"]) for labels, s in caches))
+    out.add("factory_cache_misses_total", "counter", "未命中次数", ((labels, s["misses"]) for labels, s in caches))
+    out.add("factory_cache_evictions_total", "counter", "淘汰次数", ((labels, s["evictions"]) for labels, s in caches))
+    out.add("factory_cache_hit_ratio", "gauge", "累计命中率", ((labels, s["hit_rate"]) for labels, s in caches))
+
+
+def render_metrics() -> str:
+    """当前进程的全部指标；须在事件循环线程中调用（读取线程池限额与按路由累计值）。"""
+    out = _Exposition()
+    _add_route_metrics(out)
+    _add_runtime_metrics(out)
+    _add_pool_metrics(out)
+    _add_cache_metrics(out)
+    return out.render()
@@ -0,0 +1,112 @@
+"""
+列表接口公共工具：keyset 游标分页参数与 NDJSON / CSV 流式输出。
+
+- 分页：按主键排序，`limit` 限制条数，`after` 传上一页最后一条的主键；
+  若本页已满，响应头 `X-Next-Cursor` 返回下一页游标。
+- 流式：`stream=true` 时以 application/x-ndjson 逐批编码输出，内存占用与表大小无关；
+  导出接口以同样方式输出 CSV（带 BOM，Excel 可直接打开中文）。
+"""
+
+import csv
+import io
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, Optional, Sequence, Tuple, Type, Union
+
+from fastapi import HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+# 复合主键游标分隔符，例如 inventory 的 "W01,P1001"
+CURSOR_SEPARATOR = ","
+# 流式输出时每次写出的行数（与 yield_per 批大小一致）
+STREAM_BATCH_SIZE = 1000
+
+
+def set_next_cursor(response: Response, rows: list, limit: Optional[int], cursor_of) -> None:
+    """本页条数达到 limit 时，用最后一行生成下一页游标写入响应头。"""
+    if limit and len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_of(rows[-1])
+
+
+def encode_composite_cursor(*values: str) -> str:
+    return CURSOR_SEPARATOR.join(values)
+
+
+def parse_composite_cursor(after: Optional[str], parts: int = 2) -> Optional[Tuple[str, ...]]:
+    if after is None:
+        return None
+    values = tuple(after.split(CURSOR_SEPARATOR, parts - 1))
+    if len(values) != parts or not all(values):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def _encode_ndjson(rows: Iterable, schema: Type[BaseModel], batch_size: int) -> Iterator[bytes]:
+    buffer = []
+    for row in rows:
+        buffer.append(schema.model_validate(row).model_dump_json())
+        if len(buffer) >= batch_size:
+            yield ("\n".join(buffer) + "\n").encode("utf-8")
+            buffer.clear()
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode("utf-8")
+
+
+async def _aencode_ndjson(rows: AsyncIterable, schema: Type[BaseModel], batch_size: int) -> AsyncIterator[bytes]:
+    buffer = []
+    async for row in rows:
+        buffer.append(schema.model_validate(row).model_dump_json())
+        if len(buffer) >= batch_size:
+            yield ("\n".join(buffer) + "\n").encode("utf-8")
+            buffer.clear()
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode("utf-8")
+
+
+def ndjson_response(
+    rows: Union[Iterable, AsyncIterable],
+    schema: Type[BaseModel],
+    batch_size: int = STREAM_BATCH_SIZE,
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """将 ORM 行迭代器（同步或异步）按 schema 序列化为 NDJSON 流。"""
+    if hasattr(rows, "__aiter__"):
+        content = _aencode_ndjson(rows, schema, batch_size)
+    else:
+        content = _encode_ndjson(rows, schema, batch_size)
+    return StreamingResponse(content, media_type="application/x-ndjson", headers=headers)
+
+
+def _encode_csv(rows: Iterable, columns: Sequence[str], batch_size: int) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow([getattr(row, name) for name in columns])
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue().encode("utf-8")
+
+
+def csv_response(
+    rows: Iterable,
+    columns: Sequence[str],
+    filename: str,
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> StreamingResponse:
+    """将 ORM 行迭代器按给定列顺序导出为 CSV 附件流（直接取属性，不经 Pydantic）。"""
+    return StreamingResponse(
+        _encode_csv(rows, columns, batch_size),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
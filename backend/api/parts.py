@@ -2,15 +2,19 @@
 零件（part）相关路由：CRUD 及按类型筛选。
 """
 
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from api.conditional import conditional_json
 from schemas.part import PartCreate, PartOut, PartUpdate
 from services import parts as parts_service
 from services.auth_deps import get_current_app_user, require_app_roles
-from src.db.database import get_db
+from services.versions import versioned_json_one
+from src.db.database import get_async_db, get_db
 
 router = APIRouter(
     prefix="/factory/parts",
@@ -20,16 +24,21 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[PartOut])
-def list_parts(part_type: Optional[str] = Query(None, alias="type"), db: Session = Depends(get_db)):
-    return parts_service.list_parts(db, part_type)
+async def list_parts(
+    request: Request,
+    part_type: Optional[str] = Query(None, alias="type"),
+    changed_since: Optional[datetime] = Query(None, description="增量同步水位（见 /factory/sync-watermark）：updated_at >= 该值的行"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return conditional_json(request, await parts_service.list_parts_async(db, part_type, changed_since))
 
 
 @router.get("/{part_id}", response_model=PartOut)
-def get_part(part_id: str, db: Session = Depends(get_db)):
-    part = parts_service.get_part(db, part_id)
+async def get_part(part_id: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    part = await parts_service.get_part_async(db, part_id)
     if not part:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Part not found")
-    return part
+    return conditional_json(request, versioned_json_one(PartOut, part))
 
 
 @router.post(
@@ -1,16 +1,37 @@
 """
 采购（purchase）相关路由：查询、创建、更新、删除采购单。
+写操作同步过账库存；若冲减会使库存为负则返回 409。
+采购表按月分区，/partitions 供管理员查看分区与归档旧分区。
 """
 
+from datetime import date, datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from schemas.purchase import PurchaseCreate, PurchaseOut, PurchaseUpdate
+from api.conditional import conditional_json
+from api.pagination import MAX_PAGE_SIZE, STREAM_BATCH_SIZE, csv_response, ndjson_response, set_next_cursor
+from schemas.purchase import PurchaseCreate, PurchaseOut, PurchasePartitionOut, PurchaseUpdate
+from services import partitions as partitions_service
 from services import purchases as purchases_service
 from services.auth_deps import get_current_app_user, require_app_roles
-from src.db.database import get_db
+from services.versions import versioned_json, versioned_json_one
+from src.db.database import get_async_db, get_db
+
+EXPORT_COLUMNS = (
+    "purchase_id",
+    "purchase_date",
+    "warehouse_id",
+    "supplier_id",
+    "part_id",
+    "quantity",
+    "actual_price",
+    "created_at",
+    "updated_at",
+)
 
 router = APIRouter(
     prefix="/factory/purchases",
@@ -20,21 +41,102 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[PurchaseOut])
-def list_purchases(
+async def list_purchases(
+    request: Request,
     warehouse_id: Optional[str] = Query(None),
     supplier_id: Optional[str] = Query(None),
     part_id: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None, description="采购日期起（含）"),
+    date_to: Optional[date] = Query(None, description="采购日期止（含）"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="每页条数，按 purchase_id 排序"),
+    after: Optional[str] = Query(None, description="游标：上一页最后一条的 purchase_id"),
+    changed_since: Optional[datetime] = Query(None, description="增量同步水位（见 /factory/sync-watermark）：updated_at >= 该值的行"),
+    stream: bool = Query(False, description="以 NDJSON 流式返回全部匹配行"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if stream:
+        rows = purchases_service.stream_purchases_async(
+            db,
+            warehouse_id,
+            supplier_id,
+            part_id,
+            after=after,
+            date_from=date_from,
+            date_to=date_to,
+            batch_size=STREAM_BATCH_SIZE,
+            changed_since=changed_since,
+        )
+        return ndjson_response(rows, PurchaseOut)
+    records = await purchases_service.list_purchases_async(
+        db,
+        warehouse_id,
+        supplier_id,
+        part_id,
+        limit=limit,
+        after=after,
+        date_from=date_from,
+        date_to=date_to,
+        changed_since=changed_since,
+    )
+    response = conditional_json(request, versioned_json(PurchaseOut, records))
+    set_next_cursor(response, records, limit, lambda r: r.purchase_id)
+    return response
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_purchases(
+    warehouse_id: Optional[str] = Query(None),
+    supplier_id: Optional[str] = Query(None),
+    part_id: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None, description="采购日期起（含）"),
+    date_to: Optional[date] = Query(None, description="采购日期止（含）"),
     db: Session = Depends(get_db),
 ):
-    return purchases_service.list_purchases(db, warehouse_id, supplier_id, part_id)
+    """以 CSV 流式导出采购台账（服务端游标分批读取，内存占用与行数无关）。"""
+    rows = purchases_service.iter_purchases(
+        db,
+        warehouse_id,
+        supplier_id,
+        part_id,
+        date_from=date_from,
+        date_to=date_to,
+        batch_size=STREAM_BATCH_SIZE,
+    )
+    return csv_response(rows, EXPORT_COLUMNS, "purchases.csv")
+
+
+@router.get(
+    "/partitions",
+    response_model=List[PurchasePartitionOut],
+    dependencies=[Depends(require_app_roles("admin"))],
+)
+def list_purchase_partitions(db: Session = Depends(get_db)):
+    return partitions_service.list_partitions(db)
+
+
+@router.post(
+    "/partitions/archive",
+    dependencies=[Depends(require_app_roles("admin"))],
+)
+def archive_purchase_partitions(
+    before: date = Query(..., description="分离范围上界不晚于该日期的分区（整月）"),
+) -> dict:
+    """将旧分区从采购表分离（不阻塞读写）并移入归档 schema；归档数据不再出现在列表与导出中。"""
+    try:
+        archived = partitions_service.archive_purchase_partitions(before)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {"archived": archived, "schema": partitions_service.PURCHASE_ARCHIVE_SCHEMA}
 
 
 @router.get("/{purchase_id}", response_model=PurchaseOut)
-def get_purchase(purchase_id: str, db: Session = Depends(get_db)):
-    record = purchases_service.get_purchase(db, purchase_id)
+async def get_purchase(
+    purchase_id: str, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    record = await purchases_service.get_purchase_async(db, purchase_id)
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Purchase not found")
-    return record
+    return conditional_json(request, versioned_json_one(PurchaseOut, record))
 
 
 @router.post(
@@ -44,7 +146,10 @@ def get_purchase(purchase_id: str, db: Session = Depends(get_db)):
     dependencies=[Depends(require_app_roles("admin", "purchaser"))],
 )
 def create_purchase(payload: PurchaseCreate, db: Session = Depends(get_db)):
-    return purchases_service.create_purchase(db, payload)
+    try:
+        return purchases_service.create_purchase(db, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
 @router.put(
@@ -53,7 +158,10 @@ def create_purchase(payload: PurchaseCreate, db: Session = Depends(get_db)):
     dependencies=[Depends(require_app_roles("admin", "purchaser"))],
 )
 def update_purchase(purchase_id: str, payload: PurchaseUpdate, db: Session = Depends(get_db)):
-    record = purchases_service.update_purchase(db, purchase_id, payload)
+    try:
+        record = purchases_service.update_purchase(db, purchase_id, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Purchase not found")
     return record
@@ -65,7 +173,10 @@ def update_purchase(purchase_id: str, payload: PurchaseUpdate, db: Session = Dep
     dependencies=[Depends(require_app_roles("admin", "purchaser"))],
 )
 def delete_purchase(purchase_id: str, db: Session = Depends(get_db)):
-    ok = purchases_service.delete_purchase(db, purchase_id)
+    try:
+        ok = purchases_service.delete_purchase(db, purchase_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     if not ok:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Purchase not found")
     return None
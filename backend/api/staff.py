@@ -2,15 +2,19 @@
 员工（staff）相关路由：CRUD，支持按仓库过滤。
 """
 
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from api.conditional import conditional_json
 from schemas.staff import StaffCreate, StaffOut, StaffUpdate
 from services import staff as staff_service
 from services.auth_deps import get_current_app_user, require_app_roles
-from src.db.database import get_db
+from services.versions import versioned_json, versioned_json_one
+from src.db.database import get_async_db, get_db
 
 router = APIRouter(
     prefix="/factory/staff",
@@ -20,16 +24,22 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[StaffOut])
-def list_staff(warehouse_id: Optional[str] = Query(None), db: Session = Depends(get_db)):
-    return staff_service.list_staff(db, warehouse_id)
+async def list_staff(
+    request: Request,
+    warehouse_id: Optional[str] = Query(None),
+    changed_since: Optional[datetime] = Query(None, description="增量同步水位（见 /factory/sync-watermark）：updated_at >= 该值的行"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    staff = await staff_service.list_staff_async(db, warehouse_id, changed_since)
+    return conditional_json(request, versioned_json(StaffOut, staff))
 
 
 @router.get("/{staff_id}", response_model=StaffOut)
-def get_staff(staff_id: str, db: Session = Depends(get_db)):
-    staff = staff_service.get_staff(db, staff_id)
+async def get_staff(staff_id: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    staff = await staff_service.get_staff_async(db, staff_id)
     if not staff:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Staff not found")
-    return staff
+    return conditional_json(request, versioned_json_one(StaffOut, staff))
 
 
 @router.post(
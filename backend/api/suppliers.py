@@ -2,15 +2,19 @@
 供应商（supplier）相关路由：CRUD 及名称模糊查询。
 """
 
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from api.conditional import conditional_json
 from schemas.supplier import SupplierCreate, SupplierOut, SupplierUpdate
 from services import suppliers as suppliers_service
 from services.auth_deps import get_current_app_user, require_app_roles
-from src.db.database import get_db
+from services.versions import versioned_json_one
+from src.db.database import get_async_db, get_db
 
 router = APIRouter(
     prefix="/factory/suppliers",
@@ -20,16 +24,23 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[SupplierOut])
-def list_suppliers(name: Optional[str] = Query(None), db: Session = Depends(get_db)):
-    return suppliers_service.list_suppliers(db, name)
+async def list_suppliers(
+    request: Request,
+    name: Optional[str] = Query(None),
+    changed_since: Optional[datetime] = Query(None, description="增量同步水位（见 /factory/sync-watermark）：updated_at >= 该值的行"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return conditional_json(request, await suppliers_service.list_suppliers_async(db, name, changed_since))
 
 
 @router.get("/{supplier_id}", response_model=SupplierOut)
-def get_supplier(supplier_id: str, db: Session = Depends(get_db)):
-    supplier = suppliers_service.get_supplier(db, supplier_id)
+async def get_supplier(
+    supplier_id: str, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    supplier = await suppliers_service.get_supplier_async(db, supplier_id)
     if not supplier:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Supplier not found")
-    return supplier
+    return conditional_json(request, versioned_json_one(SupplierOut, supplier))
 
 
 @router.post(
@@ -2,15 +2,19 @@
 仓库（warehouse）相关路由：CRUD。
 """
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from api.conditional import conditional_json
 from schemas.warehouse import WarehouseCreate, WarehouseOut, WarehouseUpdate
 from services import warehouses as warehouses_service
 from services.auth_deps import get_current_app_user, require_app_roles
-from src.db.database import get_db
+from services.versions import versioned_json_one
+from src.db.database import get_async_db, get_db
 
 router = APIRouter(
     prefix="/factory/warehouses",
@@ -20,16 +24,22 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[WarehouseOut])
-def list_warehouses(db: Session = Depends(get_db)):
-    return warehouses_service.list_warehouses(db)
+async def list_warehouses(
+    request: Request,
+    changed_since: Optional[datetime] = Query(None, description="增量同步水位（见 /factory/sync-watermark）：updated_at >= 该值的行"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return conditional_json(request, await warehouses_service.list_warehouses_async(db, changed_since))
 
 
 @router.get("/{warehouse_id}", response_model=WarehouseOut)
-def get_warehouse(warehouse_id: str, db: Session = Depends(get_db)):
-    warehouse = warehouses_service.get_warehouse(db, warehouse_id)
+async def get_warehouse(
+    warehouse_id: str, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    warehouse = await warehouses_service.get_warehouse_async(db, warehouse_id)
     if not warehouse:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Warehouse not found")
-    return warehouse
+    return conditional_json(request, versioned_json_one(WarehouseOut, warehouse))
 
 
 @router.post(
@@ -0,0 +1,3 @@
+"""
+性能/并发基准脚本，直接连接 DATABASE_URL 指向的库运行（请勿对生产库执行）。
+"""
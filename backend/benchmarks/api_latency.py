@@ -0,0 +1,475 @@
+"""
+API 热点路径负载基准：并发客户端按场景调用列表/详情/库存调整/创建采购接口，
+统计每个场景的 p50/p95/p99 延迟、吞吐、错误数与每请求 SQL 条数，结果可写成 JSON 供不同提交间对比。
+
+- 默认在进程内直接调用 ASGI 应用（main.app，不经网络与 HTTP 解析），鉴权依赖替换为固定的 admin 用户，
+  SQL 条数由同步/异步引擎的 before_cursor_execute 事件按请求计数；
+- 指定 --base-url 时改为经 HTTP 压测已启动的服务（需 --token），SQL 条数取自响应头 Server-Timing
+  （服务端 SERVER_TIMING_ENABLED 关闭时不统计）；
+- 请求参数由 --seed 决定的随机序列从库中抽样的键生成，同样的数据与参数下请求序列一致；
+- 写场景（inventory.adjust / purchases.create）会真实修改数据，请只对本地/压测库执行。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.api_latency --generate --purchases 200000        # 先生成合成数据
+    python -m benchmarks.api_latency --concurrency 16 --requests 2000 --output bench.json
+    python -m benchmarks.api_latency --compare bench-main.json --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, text
+
+from src.db.database import SessionLocal, engine, get_async_engine
+
+# (method, path, query, json body)
+Request = Tuple[str, str, Dict[str, object], Optional[dict]]
+
+SAMPLE_SIZE = 1000
+PAGE_SIZE = 100
+
+_query_count: ContextVar[Optional[List[int]]] = ContextVar("bench_query_count", default=None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+@dataclass
+class Context:
+    """从库中抽样的键，供各场景生成请求参数。"""
+
+    inventory_keys: List[Tuple[str, str]]
+    purchase_ids: List[str]
+    part_ids: List[str]
+    supplier_ids: List[str]
+    warehouse_ids: List[str]
+    first_date: date
+    last_date: date
+    run_id: str
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[random.Random, Context, int], Request]
+
+
+def _purchase_window(rng: random.Random, ctx: Context) -> Dict[str, object]:
+    span = max((ctx.last_date - ctx.first_date).days - 30, 0)
+    start = ctx.first_date + timedelta(days=rng.randint(0, span))
+    return {
+        "warehouse_id": rng.choice(ctx.warehouse_ids),
+        "date_from": start.isoformat(),
+        "date_to": (start + timedelta(days=30)).isoformat(),
+        "limit": PAGE_SIZE,
+    }
+
+
+def _create_purchase(rng: random.Random, ctx: Context, n: int) -> Request:
+    warehouse_id, part_id = rng.choice(ctx.inventory_keys)
+    body = {
+        "purchase_id": f"BENCH{ctx.run_id}{n:08d}",
+        "part_id": part_id,
+        "supplier_id": rng.choice(ctx.supplier_ids),
+        "warehouse_id": warehouse_id,
+        "purchase_date": date.today().isoformat(),
+        "quantity": rng.randint(1, 20),
+        "actual_price": 1.0,
+    }
+    return "POST", "/factory/purchases", {}, body
+
+
+SCENARIOS = [
+    Scenario(
+        "inventory.list",
+        lambda rng, ctx, n: (
+            "GET", "/factory/inventory", {"warehouse_id": rng.choice(ctx.warehouse_ids), "limit": PAGE_SIZE}, None
+        ),
+    ),
+    Scenario(
+        "inventory.get",
+        lambda rng, ctx, n: ("GET", "/factory/inventory/{}/{}".format(*rng.choice(ctx.inventory_keys)), {}, None),
+    ),
+    Scenario(
+        "inventory.adjust",
+        lambda rng, ctx, n: (
+            "POST",
+            "/factory/inventory/{}/{}/adjust".format(*rng.choice(ctx.inventory_keys)),
+            {},
+            {"delta": rng.choice((1, -1))},
+        ),
+    ),
+    Scenario("purchases.list", lambda rng, ctx, n: ("GET", "/factory/purchases", _purchase_window(rng, ctx), None)),
+    Scenario(
+        "purchases.get",
+        lambda rng, ctx, n: ("GET", f"/factory/purchases/{rng.choice(ctx.purchase_ids)}", {}, None),
+    ),
+    Scenario("purchases.create", _create_purchase),
+    Scenario("parts.list", lambda rng, ctx, n: ("GET", "/factory/parts", {"limit": PAGE_SIZE}, None)),
+    Scenario("parts.get", lambda rng, ctx, n: ("GET", f"/factory/parts/{rng.choice(ctx.part_ids)}", {}, None)),
+]
+
+
+# ---- 请求发送 ----
+
+
+class InProcessTransport:
+    """直接以 ASGI 协议调用应用；每个请求在独立的上下文计数器中统计 SQL 条数。"""
+
+    counts_queries = True
+
+    def __init__(self):
+        from main import app
+        from schemas.user import UserSyncOut
+        from services.auth_deps import get_current_app_user
+
+        user = UserSyncOut(
+            id=uuid.uuid4(), auth_user_id=uuid.uuid4(), email="bench@example.com", role="admin"
+        )
+        app.dependency_overrides[get_current_app_user] = lambda: user
+        self.app = app
+        event.listen(engine, "before_cursor_execute", _count_query)
+        event.listen(get_async_engine().sync_engine, "before_cursor_execute", _count_query)
+
+    async def request(self, method: str, path: str, query: Dict[str, object], body: Optional[dict]):
+        payload = json.dumps(body).encode() if body is not None else b""
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": urllib.parse.urlencode(query).encode(),
+            "headers": [
+                (b"host", b"bench"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("bench", 80),
+        }
+        finished = asyncio.Event()
+        body_sent = False
+        status_code = 0
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": payload, "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body"):
+                finished.set()
+
+        counter = [0]
+        token = _query_count.set(counter)
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            # 未处理异常已由 ServerErrorMiddleware 回写 500 后重新抛出，按 500 计入
+            status_code = status_code or 500
+        finally:
+            _query_count.reset(token)
+            finished.set()
+        return status_code, counter[0]
+
+    def close(self) -> None:
+        pass
+
+
+_SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def _queries_from_server_timing(value: Optional[str]) -> Optional[int]:
+    match = _SERVER_TIMING_QUERIES.search(value or "")
+    return int(match.group(1)) if match else None
+
+
+class HttpTransport:
+    """经 HTTP 调用已启动的服务；标准库 urllib 在线程池中并发发送。"""
+
+    counts_queries = True
+
+    def __init__(self, base_url: str, token: str, concurrency: int):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def _send(self, method: str, url: str, payload: Optional[bytes]) -> Tuple[int, Optional[int]]:
+        req = urllib.request.Request(url, data=payload, method=method, headers=self.headers)
+        try:
+            with urllib.request.urlopen(req, timeout=30) as response:
+                response.read()
+                return response.status, _queries_from_server_timing(response.headers.get("Server-Timing"))
+        except urllib.error.HTTPError as e:
+            return e.code, _queries_from_server_timing(e.headers.get("Server-Timing"))
+
+    async def request(self, method: str, path: str, query: Dict[str, object], body: Optional[dict]):
+        url = self.base_url + path
+        if query:
+            url += "?" + urllib.parse.urlencode(query)
+        payload = json.dumps(body).encode() if body is not None else None
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._send, method, url, payload)
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+
+# ---- 数据准备 ----
+
+
+def _generate(args) -> None:
+    from services.summaries import rebuild_summaries
+    from src.db.synthetic import generate_synthetic, reset_synthetic, synthetic_exists
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        if synthetic_exists(conn):
+            reset_synthetic(conn)
+        generate_synthetic(
+            conn, args.warehouses, args.parts, args.suppliers, args.purchases, years=args.years, seed=args.seed, log=print
+        )
+        conn.execute(text("ANALYZE"))
+    db = SessionLocal()
+    try:
+        rebuild_summaries(db)
+    finally:
+        db.close()
+    print(f"生成数据耗时 {time.perf_counter() - started:.1f}s（purchase {args.purchases} 行）")
+
+
+def _sample(conn, sql: str) -> list:
+    # 按 md5 排序取前 N 行：结果只取决于数据，不受物理存放顺序影响
+    return [tuple(row) if len(row) > 1 else row[0] for row in conn.execute(text(sql), {"n": SAMPLE_SIZE})]
+
+
+def _load_context(run_id: str) -> Tuple[Context, Dict[str, int]]:
+    with engine.connect() as conn:
+        inventory_keys = _sample(
+            conn,
+            "SELECT warehouse_id, part_id FROM inventory WHERE stock_quantity > 0 "
+            "ORDER BY md5(warehouse_id || ',' || part_id) LIMIT :n",
+        )
+        ctx = Context(
+            inventory_keys=inventory_keys,
+            purchase_ids=_sample(conn, "SELECT purchase_id FROM purchase ORDER BY md5(purchase_id) LIMIT :n"),
+            part_ids=_sample(conn, "SELECT part_id FROM part ORDER BY md5(part_id) LIMIT :n"),
+            supplier_ids=_sample(conn, "SELECT supplier_id FROM supplier ORDER BY md5(supplier_id) LIMIT :n"),
+            warehouse_ids=sorted({w for w, _ in inventory_keys}),
+            first_date=conn.execute(text("SELECT min(purchase_date) FROM purchase")).scalar() or date.today(),
+            last_date=conn.execute(text("SELECT max(purchase_date) FROM purchase")).scalar() or date.today(),
+            run_id=run_id,
+        )
+        # 规模记录用统计信息估算，避免对大表 count(*)
+        rows = conn.execute(
+            text(
+                "SELECT relname, reltuples::bigint FROM pg_class "
+                "WHERE relname IN ('part', 'supplier', 'warehouse', 'staff', 'inventory') AND relkind = 'r'"
+            )
+        ).all()
+        dataset = {name: max(count, 0) for name, count in rows}
+        dataset["purchase"] = conn.execute(
+            text(
+                "SELECT coalesce(sum(c.reltuples), 0)::bigint FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass('purchase') AND c.reltuples > 0"
+            )
+        ).scalar()
+    if not (ctx.inventory_keys and ctx.purchase_ids and ctx.part_ids and ctx.supplier_ids):
+        raise SystemExit("库中缺少库存/采购/零件/供应商数据，请先加 --generate 生成合成数据")
+    return ctx, dataset
+
+
+# ---- 执行与统计 ----
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    # 最近秩法
+    return values[max(math.ceil(pct / 100 * len(values)) - 1, 0)]
+
+
+async def _run_scenario(transport, scenario: Scenario, ctx: Context, args) -> dict:
+    rng = random.Random(f"{args.seed}:{scenario.name}")
+    issued = 0
+    samples: List[Tuple[float, int, Optional[int]]] = []
+
+    async def client(total: int, record: bool) -> None:
+        nonlocal issued
+        while issued < total:
+            issued += 1
+            method, path, query, body = scenario.build(rng, ctx, issued)
+            started = time.perf_counter()
+            status_code, queries = await transport.request(method, path, query, body)
+            if record:
+                samples.append((time.perf_counter() - started, status_code, queries))
+
+    await asyncio.gather(*(client(args.warmup, False) for _ in range(args.concurrency)))
+    started = time.perf_counter()
+    await asyncio.gather(*(client(args.warmup + args.requests, True) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(s[0] * 1000 for s in samples)
+    errors: Dict[str, int] = {}
+    for _, status_code, _ in samples:
+        if status_code >= 400:
+            errors[str(status_code)] = errors.get(str(status_code), 0) + 1
+    queries = [s[2] for s in samples if s[2] is not None]
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3),
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3),
+        },
+        "queries_per_request": {
+            "mean": round(sum(queries) / len(queries), 2),
+            "max": max(queries),
+        } if queries else None,
+    }
+
+
+def _git_revision() -> Dict[str, object]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True, check=True).stdout.strip()
+        )
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def _print_results(results: Dict[str, dict], baseline: Optional[dict]) -> None:
+    print(f"{'scenario':<18}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'errors':>8}")
+    for name, result in results.items():
+        latency = result["latency_ms"]
+        queries = result["queries_per_request"]
+        print(
+            f"{name:<18}{result['throughput_rps']:>9.1f}{latency['p50']:>9.2f}{latency['p95']:>9.2f}"
+            f"{latency['p99']:>9.2f}{(queries['mean'] if queries else float('nan')):>9.2f}"
+            f"{sum(result['errors'].values()):>8}"
+        )
+        before = (baseline or {}).get("scenarios", {}).get(name)
+        if before:
+            changes = []
+            for key in ("p50", "p95", "p99"):
+                old, new = before["latency_ms"][key], latency[key]
+                changes.append(f"{key} {(new - old) / old * 100:+.1f}%" if old else f"{key} n/a")
+            old_rps = before["throughput_rps"]
+            changes.append(f"rps {(result['throughput_rps'] - old_rps) / old_rps * 100:+.1f}%" if old_rps else "rps n/a")
+            print(f"{'':<18}vs baseline: {', '.join(changes)}")
+
+
+async def _run(args, transport, ctx: Context) -> Dict[str, dict]:
+    selected = set(args.scenarios.split(",")) if args.scenarios else None
+    results = {}
+    for scenario in SCENARIOS:
+        if selected is None or scenario.name in selected:
+            results[scenario.name] = await _run_scenario(transport, scenario, ctx, args)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="API 热点路径负载基准")
+    parser.add_argument("--concurrency", type=int, default=16, help="并发客户端数")
+    parser.add_argument("--requests", type=int, default=2000, help="每个场景计入统计的请求数")
+    parser.add_argument("--warmup", type=int, default=200, help="每个场景正式计时前的预热请求数")
+    parser.add_argument("--scenarios", default="", help=f"逗号分隔，默认全部：{','.join(s.name for s in SCENARIOS)}")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子：决定合成数据与请求序列")
+    parser.add_argument("--base-url", default="", help="经 HTTP 压测已启动的服务，如 http://localhost:8000")
+    parser.add_argument("--token", default="", help="--base-url 模式下的 Bearer token")
+    parser.add_argument("--output", default="", help="结果写入的 JSON 文件")
+    parser.add_argument("--compare", default="", help="对比的基线 JSON 文件")
+    parser.add_argument("--generate", action="store_true", help="运行前重新生成合成数据（src.db.synthetic）")
+    parser.add_argument("--warehouses", type=int, default=20)
+    parser.add_argument("--parts", type=int, default=2000)
+    parser.add_argument("--suppliers", type=int, default=200)
+    parser.add_argument("--purchases", type=int, default=200_000)
+    parser.add_argument("--years", type=int, default=2)
+    args = parser.parse_args()
+
+    unknown = set(filter(None, args.scenarios.split(","))) - {s.name for s in SCENARIOS}
+    if unknown:
+        print(f"未知场景: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    if args.base_url and not args.token:
+        print("--base-url 模式需要 --token", file=sys.stderr)
+        return 2
+
+    if args.generate:
+        _generate(args)
+    run_id = uuid.uuid4().hex[:8].upper()
+    ctx, dataset = _load_context(run_id)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.base_url:
+        transport = HttpTransport(args.base_url, args.token, args.concurrency)
+    else:
+        transport = InProcessTransport()
+    try:
+        results = asyncio.run(_run(args, transport, ctx))
+    finally:
+        transport.close()
+
+    report = {
+        "meta": {
+            **_git_revision(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "mode": "http" if args.base_url else "in-process",
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "dataset": dataset,
+        },
+        "scenarios": results,
+    }
+    _print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+热点 SKU 并发调整基准：多线程同时对同一 (warehouse_id, part_id) 调用 adjust_inventory，
+校验最终库存 == 初始库存 + 成功调整的增量之和（零丢失更新），并输出吞吐与延迟。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.concurrent_adjust --warehouse-id W01 --part-id P1001 --workers 16 --ops 500
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+
+from schemas.inventory import InventoryAdjust
+from services import inventory as inventory_service
+from src.db.database import SessionLocal
+
+
+def _worker(args, seed: int, applied: list, latencies: list, lock: threading.Lock) -> None:
+    rng = random.Random(seed)
+    local_applied = 0
+    local_latencies = []
+    db = SessionLocal()
+    try:
+        for _ in range(args.ops):
+            delta = rng.choice((1, 1, 2, -1, -2))
+            started = time.perf_counter()
+            record = inventory_service.adjust_inventory(
+                db, args.warehouse_id, args.part_id, InventoryAdjust(delta=delta)
+            )
+            local_latencies.append(time.perf_counter() - started)
+            if record is not None:
+                local_applied += delta
+    finally:
+        db.close()
+    with lock:
+        applied.append(local_applied)
+        latencies.extend(local_latencies)
+
+
+def _stock(warehouse_id: str, part_id: str) -> int:
+    db = SessionLocal()
+    try:
+        record = inventory_service.get_inventory(db, warehouse_id, part_id)
+        if record is None:
+            raise SystemExit(f"库存记录不存在: ({warehouse_id}, {part_id})")
+        return record.stock_quantity
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="热点 SKU 并发 adjust_inventory 基准")
+    parser.add_argument("--warehouse-id", default="W01")
+    parser.add_argument("--part-id", default="P1001")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=500, help="每个线程的调整次数")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    initial = _stock(args.warehouse_id, args.part_id)
+    applied: list = []
+    latencies: list = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=_worker, args=(args, args.seed + i, applied, latencies, lock))
+        for i in range(args.workers)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    final = _stock(args.warehouse_id, args.part_id)
+    expected = initial + sum(applied)
+    latencies.sort()
+    total_ops = len(latencies)
+    print(f"ops={total_ops} elapsed={elapsed:.2f}s throughput={total_ops / elapsed:.0f} ops/s")
+    print(
+        f"latency p50={statistics.median(latencies) * 1000:.2f}ms "
+        f"p99={latencies[int(total_ops * 0.99) - 1] * 1000:.2f}ms"
+    )
+    print(f"initial={initial} applied_delta={sum(applied)} expected={expected} final={final}")
+    if final != expected:
+        print(f"丢失更新: {expected - final}")
+        return 1
+    print("零丢失更新")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
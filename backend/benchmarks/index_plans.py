@@ -0,0 +1,175 @@
+"""
+二级索引前后执行计划对比：在独立 schema 中按模型建表、用 generate_series 生成数据（默认 100 万条采购），
+先在仅有主键时对各列表过滤查询执行 EXPLAIN (ANALYZE, BUFFERS)，再按 models.py 声明创建二级索引后重跑，
+输出每条查询的扫描方式与耗时。不读写 public 下的业务表。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.index_plans --purchases 1000000
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import date
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateTable
+
+from src.db import models
+from src.db.database import engine
+from src.db.partitions import ensure_purchase_partitions
+
+TABLES = [
+    models.Warehouse.__table__,
+    models.Part.__table__,
+    models.Supplier.__table__,
+    models.Staff.__table__,
+    models.AppUser.__table__,
+    models.Inventory.__table__,
+    models.Purchase.__table__,
+]
+
+# (名称, SQL)：与各 list_* 服务生成的过滤条件一致
+QUERIES: List[Tuple[str, str]] = [
+    (
+        "purchase by warehouse + date range",
+        "SELECT * FROM purchase WHERE warehouse_id = 'W007' "
+        "AND purchase_date BETWEEN DATE '2024-03-01' AND DATE '2024-03-31'",
+    ),
+    ("purchase by supplier", "SELECT * FROM purchase WHERE supplier_id = 'S0042'"),
+    ("purchase by part", "SELECT * FROM purchase WHERE part_id = 'P00042'"),
+    ("inventory by part", "SELECT * FROM inventory WHERE part_id = 'P00042'"),
+    ("staff by warehouse", "SELECT * FROM staff WHERE warehouse_id = 'W007'"),
+    ("part by type", "SELECT * FROM part WHERE type = 'type-07'"),
+    ("supplier name ILIKE", "SELECT * FROM supplier WHERE name ILIKE '%upplier 0042%'"),
+    ("app_user by role", "SELECT * FROM app_user WHERE role = 'admin'"),
+    ("app_user by warehouse", "SELECT * FROM app_user WHERE warehouse_id = 'W007'"),
+    ("app_user email ILIKE", "SELECT * FROM app_user WHERE email ILIKE '%user0004242%'"),
+]
+
+
+def _seed(conn, args) -> None:
+    params = {
+        "warehouses": args.warehouses,
+        "parts": args.parts,
+        "suppliers": args.suppliers,
+        "purchases": args.purchases,
+        "users": args.users,
+    }
+    statements = [
+        """INSERT INTO warehouse (warehouse_id, address)
+           SELECT 'W' || lpad(g::text, 3, '0'), 'address ' || g FROM generate_series(1, :warehouses) g""",
+        """INSERT INTO part (part_id, name, unit_price, type)
+           SELECT 'P' || lpad(g::text, 5, '0'), 'part ' || g, (g % 500) + 1, 'type-' || lpad((g % 20)::text, 2, '0')
+           FROM generate_series(1, :parts) g""",
+        """INSERT INTO supplier (supplier_id, name)
+           SELECT 'S' || lpad(g::text, 4, '0'), 'Supplier ' || lpad(g::text, 4, '0') FROM generate_series(1, :suppliers) g""",
+        """INSERT INTO staff (staff_id, name, gender, hire_date, warehouse_id)
+           SELECT 'E' || g, 'staff ' || g, CASE WHEN g % 2 = 0 THEN 'M' ELSE 'F' END, DATE '2020-01-01',
+                  'W' || lpad((g % :warehouses + 1)::text, 3, '0')
+           FROM generate_series(1, :warehouses * 200) g""",
+        """INSERT INTO app_user (auth_user_id, email, role, warehouse_id)
+           SELECT gen_random_uuid(), 'user' || lpad(g::text, 7, '0') || '@example.com',
+                  (ARRAY['admin','warehouse_manager','purchaser','inventory_operator'])[CASE WHEN g % 100 = 0 THEN 1 ELSE g % 3 + 2 END],
+                  'W' || lpad((g % :warehouses + 1)::text, 3, '0')
+           FROM generate_series(1, :users) g""",
+        """INSERT INTO inventory (warehouse_id, part_id, stock_quantity)
+           SELECT w.warehouse_id, p.part_id, 100 FROM warehouse w CROSS JOIN part p""",
+        """INSERT INTO purchase (purchase_id, part_id, supplier_id, warehouse_id, purchase_date, quantity, actual_price)
+           SELECT 'PUR' || g,
+                  'P' || lpad((g % :parts + 1)::text, 5, '0'),
+                  'S' || lpad((g % :suppliers + 1)::text, 4, '0'),
+                  'W' || lpad((g % :warehouses + 1)::text, 3, '0'),
+                  DATE '2023-01-01' + (g % 730),
+                  g % 50 + 1,
+                  (g % 500) + 1
+           FROM generate_series(1, :purchases) g""",
+    ]
+    for statement in statements:
+        conn.execute(text(statement), params)
+    conn.execute(text("ANALYZE"))
+
+
+def _scan_nodes(plan: dict) -> List[str]:
+    nodes = []
+    if "Scan" in plan["Node Type"]:
+        label = plan["Node Type"]
+        if plan.get("Index Name"):
+            label += f" using {plan['Index Name']}"
+        nodes.append(label)
+    for child in plan.get("Plans", ()):
+        nodes.extend(_scan_nodes(child))
+    return nodes
+
+
+def _explain(conn) -> List[Tuple[str, float, List[str]]]:
+    results = []
+    for name, sql in QUERIES:
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        results.append((name, plan[0]["Execution Time"], _scan_nodes(plan[0]["Plan"])))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="二级索引前后执行计划对比")
+    parser.add_argument("--schema", default="bench_index_plans", help="临时 schema，运行前会被清空")
+    parser.add_argument("--purchases", type=int, default=1_000_000)
+    parser.add_argument("--parts", type=int, default=10_000)
+    parser.add_argument("--suppliers", type=int, default=1_000)
+    parser.add_argument("--warehouses", type=int, default=50)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--keep", action="store_true", help="结束后保留临时 schema")
+    args = parser.parse_args()
+
+    if not args.schema.isidentifier() or args.schema == "public":
+        print("schema 名称不合法", file=sys.stderr)
+        return 2
+
+    translate = {None: args.schema}
+    with engine.connect() as raw:
+        conn = raw.execution_options(schema_translate_map=translate)
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {args.schema}"))
+        conn.execute(text(f"SET search_path TO {args.schema}, public"))
+        try:
+            # 仅建表与主键/约束，二级索引稍后创建
+            for table in TABLES:
+                conn.execute(CreateTable(table, include_foreign_key_constraints=[]))
+            # 搜索切分索引依赖的函数
+            conn.execute(text(models.SEARCH_FUNCTIONS_DDL))
+            # purchase 为按月分区表，覆盖生成数据的日期范围
+            ensure_purchase_partitions(conn, date(2023, 1, 1), date(2024, 12, 31))
+            started = time.perf_counter()
+            _seed(conn, args)
+            conn.commit()
+            print(f"生成数据耗时 {time.perf_counter() - started:.1f}s（purchase {args.purchases} 行）")
+
+            before = _explain(conn)
+            started = time.perf_counter()
+            for table in TABLES:
+                for index in sorted(table.indexes, key=lambda i: i.name):
+                    index.create(conn)
+            conn.execute(text("ANALYZE"))
+            conn.commit()
+            print(f"创建二级索引耗时 {time.perf_counter() - started:.1f}s\n")
+            after = _explain(conn)
+
+            for (name, before_ms, before_nodes), (_, after_ms, after_nodes) in zip(before, after):
+                print(f"{name}")
+                print(f"  before {before_ms:10.2f} ms  {', '.join(before_nodes)}")
+                print(f"  after  {after_ms:10.2f} ms  {', '.join(after_nodes)}")
+        finally:
+            conn.rollback()
+            if not args.keep:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+                conn.commit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,15 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.factory import router as factory_router
+from api.instrumentation import RequestInstrumentationMiddleware, install_db_instrumentation
+from api.pagination import NEXT_CURSOR_HEADER
 from api.health import router as health_router
+from api.imports import router as imports_router
 from api.inventory import router as inventory_router
 from api.parts import router as parts_router
 from api.purchases import router as purchases_router
@@ -12,9 +18,29 @@ from api.suppliers import router as suppliers_router
 from api.warehouses import router as warehouses_router
 from api.auth import router as auth_router
 from api.users import router as users_router
+from services import auth as auth_service
+from services import partitions as partitions_service
+from services import stock_alerts as stock_alerts_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 多 worker 时接收业务用户变更通知，失效本进程的鉴权缓存
+    auth_service.listen_for_app_user_changes()
+    # 后台周期性预建采购表未来月份的分区
+    tasks = [asyncio.create_task(partitions_service.maintenance_loop())]
+    # 后台按库存变更事件增量评估低库存告警
+    if stock_alerts_service.STOCK_ALERTS_ENABLED:
+        tasks.append(asyncio.create_task(stock_alerts_service.alert_loop()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+
 
 # FastAPI 应用实例，集中注册各业务路由。
-app = FastAPI(title="Factory API")
+app = FastAPI(title="Factory API", lifespan=lifespan)
 
 # CORS 设置：根据前端地址调整 allow_origins
 app.add_middleware(
@@ -23,7 +49,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],
 )
+# 最外层：统计每个请求的 SQL 语句数/耗时、连接池等待与处理耗时，写入 Server-Timing 并按路由累计
+install_db_instrumentation()
+app.add_middleware(RequestInstrumentationMiddleware)
 
 # 路由注册
 app.include_router(health_router)
@@ -34,6 +64,7 @@ app.include_router(warehouses_router)
 app.include_router(staff_router)
 app.include_router(inventory_router)
 app.include_router(purchases_router)
+app.include_router(imports_router)
 app.include_router(auth_router)
 app.include_router(users_router)
 
@@ -0,0 +1,21 @@
+"""
+增量同步（changed_since）相关的响应模型。
+"""
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class SyncWatermarkOut(BaseModel):
+    watermark: datetime = Field(..., description="下一轮增量同步的 changed_since")
+
+
+class TombstoneOut(BaseModel):
+    id: int = Field(..., description="墓碑序号，分页游标")
+    resource: str = Field(..., description="资源名：parts/suppliers/warehouses/staff/inventory/purchases")
+    record_key: str = Field(..., description="被删除记录的主键；inventory 为 warehouse_id,part_id")
+    deleted_at: datetime = Field(..., description="删除时间")
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,21 @@
+"""
+批量导入（import）相关的响应模型。
+"""
+
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class ImportRowError(BaseModel):
+    row: int = Field(..., description="数据行号（从 1 开始，不含 CSV 表头）")
+    errors: List[str] = Field(..., description="校验或写入失败原因")
+
+
+class ImportResult(BaseModel):
+    resource: str = Field(..., description="导入资源：parts / suppliers / purchases")
+    received: int = Field(..., description="读取的数据行数")
+    written: int = Field(..., description="成功写入（新增或更新）的行数")
+    rejected: int = Field(..., description="被拒绝的行数")
+    errors: List[ImportRowError] = Field(default_factory=list, description="被拒绝行明细（最多返回前 N 条）")
+    errors_truncated: bool = Field(False, description="拒绝明细是否被截断")
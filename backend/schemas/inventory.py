@@ -1,9 +1,10 @@
 """
 库存（inventory）相关的请求/响应模型。
-包含创建、更新、调整库存的结构定义，复合主键由 warehouse_id + part_id 组成。
+包含创建、更新、调整（含批量调整）库存、补货阈值与低库存告警的结构定义，复合主键由 warehouse_id + part_id 组成。
 """
 
-from typing import Optional
+from datetime import datetime
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -37,6 +38,60 @@ class InventoryAdjust(BaseModel):
         extra = "forbid"
 
 
+class InventoryAdjustItem(InventoryAdjust):
+    warehouse_id: str = Field(..., max_length=20, description="仓库编号")
+    part_id: str = Field(..., max_length=20, description="零件编号")
+
+
+class InventoryBatchAdjust(BaseModel):
+    items: List[InventoryAdjustItem] = Field(..., min_length=1, max_length=1000, description="库存变动明细，同一事务内全部成功或全部回滚")
+
+    class Config:
+        extra = "forbid"
+
+
+class InventoryAdjustLineResult(BaseModel):
+    warehouse_id: str = Field(..., description="仓库编号")
+    part_id: str = Field(..., description="零件编号")
+    delta: int = Field(..., description="本行增减量")
+    status: Literal["ok", "not_found", "insufficient_stock", "skipped"] = Field(
+        ..., description="ok 已生效；not_found 无库存记录；insufficient_stock 合计后为负；skipped 因其他行失败而回滚"
+    )
+    stock_quantity: Optional[int] = Field(None, description="生效后的库存；未生效时为当前库存")
+
+
+class InventoryBatchAdjustOut(BaseModel):
+    applied: bool = Field(..., description="整批是否已提交")
+    results: List[InventoryAdjustLineResult] = Field(..., description="逐行结果，顺序与请求一致")
+
+
+class InventoryReorderUpdate(BaseModel):
+    reorder_point: Optional[int] = Field(None, ge=0, description="补货点：库存不高于该值即告警；为空表示不监控")
+    target_level: Optional[int] = Field(None, ge=0, description="补货目标库存，不得低于补货点；为空则告警不给建议补货量")
+
+    class Config:
+        extra = "forbid"
+
+
 class InventoryOut(InventoryBase, TimestampMixin):
+    reorder_point: Optional[int] = Field(None, description="补货点")
+    target_level: Optional[int] = Field(None, description="补货目标库存")
+
+    class Config:
+        from_attributes = True
+
+
+class StockAlertOut(BaseModel):
+    id: int = Field(..., description="告警编号（递增）")
+    warehouse_id: str = Field(..., description="仓库编号")
+    part_id: str = Field(..., description="零件编号")
+    stock_quantity: int = Field(..., description="触发时的库存")
+    reorder_point: int = Field(..., description="触发时的补货点")
+    target_level: Optional[int] = Field(None, description="触发时的补货目标")
+    suggested_quantity: Optional[int] = Field(None, description="建议补货量：target_level - stock_quantity")
+    status: Literal["open", "resolved"] = Field(..., description="open 未恢复；resolved 库存已回到补货点以上或记录已删除")
+    created_at: datetime = Field(..., description="告警时间")
+    resolved_at: Optional[datetime] = Field(None, description="恢复时间")
+
     class Config:
         from_attributes = True
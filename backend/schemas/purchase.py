@@ -43,3 +43,11 @@ class PurchaseOut(PurchaseBase, TimestampMixin):
 
     class Config:
         from_attributes = True
+
+
+class PurchasePartitionOut(BaseModel):
+    name: str = Field(..., description="分区表名")
+    range_from: Optional[date] = Field(None, description="范围起（含），为空表示无下界")
+    range_to: Optional[date] = Field(None, description="范围止（不含），为空表示无上界")
+    estimated_rows: int = Field(..., description="估算行数（来自统计信息）")
+    detach_pending: bool = Field(False, description="CONCURRENTLY 分离未完成")
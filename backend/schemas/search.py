@@ -0,0 +1,17 @@
+"""
+站内搜索相关的响应模型。
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class SearchHit(BaseModel):
+    resource: str = Field(..., description="资源名：parts/suppliers/staff")
+    key: str = Field(..., description="记录主键")
+    matched_text: str = Field(..., description="命中字段的内容")
+    subtitle: Optional[str] = Field(None, description="辅助信息：零件类型 / 供应商地址或名称 / 员工所属仓库")
+    field: str = Field(..., description="命中字段：name 或 address")
+    match_rank: int = Field(..., description="0 完全相等，1 前缀，2 包含")
+    position: int = Field(..., description="关键词在字段中的位置（从 1 开始）")
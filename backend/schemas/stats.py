@@ -0,0 +1,52 @@
+"""
+统计看板（dashboard）相关的响应模型。
+金额字段为 数量 × 单价 的合计，由数据库按 DECIMAL 计算后输出。
+"""
+
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class WarehouseStockStats(BaseModel):
+    warehouse_id: str = Field(..., description="仓库编号")
+    sku_count: int = Field(..., description="有库存记录的零件种数")
+    total_quantity: int = Field(..., description="库存总件数")
+    stock_value: float = Field(..., description="库存金额：Σ stock_quantity × part.unit_price")
+    low_stock_count: int = Field(..., description="低于阈值的库存记录数")
+
+
+class SpendByMonth(BaseModel):
+    month: str = Field(..., description="月份，YYYY-MM")
+    purchase_count: int = Field(..., description="采购单数")
+    quantity: int = Field(..., description="采购总数量")
+    spend: float = Field(..., description="采购金额：Σ quantity × actual_price")
+
+
+class SpendBySupplier(BaseModel):
+    supplier_id: str = Field(..., description="供应商编号")
+    name: Optional[str] = Field(None, description="供应商名称")
+    purchase_count: int = Field(..., description="采购单数")
+    quantity: int = Field(..., description="采购总数量")
+    spend: float = Field(..., description="采购金额")
+
+
+class SpendByPartType(BaseModel):
+    type: str = Field(..., description="零件类型")
+    purchase_count: int = Field(..., description="采购单数")
+    quantity: int = Field(..., description="采购总数量")
+    spend: float = Field(..., description="采购金额")
+
+
+class DashboardStats(BaseModel):
+    low_stock_threshold: int = Field(..., description="低库存阈值（stock_quantity < 阈值）")
+    source: Literal["summary", "live"] = Field("summary", description="数据来源：summary 为汇总表，live 为明细实时计算")
+    summary_rebuilt_at: Optional[datetime] = Field(None, description="汇总表最近一次整体重建时间；为空表示尚未重建，可能缺少历史数据")
+    summary_updated_at: Optional[datetime] = Field(None, description="汇总表最近一次增量更新时间")
+    total_stock_value: float = Field(..., description="全部仓库库存金额")
+    low_stock_count: int = Field(..., description="低库存记录总数")
+    warehouses: List[WarehouseStockStats] = Field(default_factory=list)
+    spend_by_month: List[SpendByMonth] = Field(default_factory=list)
+    spend_by_supplier: List[SpendBySupplier] = Field(default_factory=list)
+    spend_by_part_type: List[SpendByPartType] = Field(default_factory=list)
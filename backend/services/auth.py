@@ -1,15 +1,80 @@
 """
 认证相关服务：基于 Supabase Auth 的 sub/email，同步/查询业务用户表。
+同时维护按 token 哈希索引的鉴权缓存（已验证的 JWT claims + 业务用户快照）。
+缓存在各 worker 进程内独立保存：INVENTORY_EVENTS_BACKEND=postgres 时，业务用户变更随事务提交
+经 NOTIFY 广播，各 worker 收到后失效本地快照；local 模式只失效当前进程，其他进程最多在 AUTH_CACHE_TTL 后过期。
 """
 
-from typing import Optional
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
 
+from dotenv import load_dotenv
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from schemas.user import UserSyncOut
+from services.cache import TTLCache
+from services.inventory_events import INVENTORY_EVENTS_BACKEND
+from services.inventory_events import bus as event_bus
 from src.db import models
 
+load_dotenv()
+
 DEFAULT_ROLE = "inventory_operator"
 
+# 鉴权缓存：容量上限与最长存活秒数（实际过期取 min(token exp, now + TTL)）
+AUTH_CACHE_MAXSIZE = int(os.getenv("AUTH_CACHE_MAXSIZE", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "300"))
+
+# 业务用户变更通知频道，负载为 auth_user_id
+AUTH_INVALIDATION_CHANNEL = "app_user_changes"
+
+
+@dataclass
+class AuthCacheEntry:
+    payload: Dict
+    app_user: Optional[UserSyncOut] = None
+
+
+auth_cache = TTLCache(maxsize=AUTH_CACHE_MAXSIZE, ttl=AUTH_CACHE_TTL)
+
+
+def token_cache_key(token: str) -> str:
+    """缓存键使用 token 的 SHA-256，避免在内存中以明文长期保存 token。"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def invalidate_app_user(auth_user_id) -> int:
+    """业务用户角色/归属变更后，失效其所有 token 对应的缓存快照。"""
+    sub = str(auth_user_id)
+    return auth_cache.invalidate_where(lambda _k, entry: entry.payload.get("sub") == sub)
+
+
+def notify_app_user_changed(db: Session, auth_user_id) -> None:
+    """在当前事务中登记跨 worker 的缓存失效通知（postgres 模式），提交时由 Postgres 投递，回滚则不发送。"""
+    if INVENTORY_EVENTS_BACKEND != "postgres":
+        return
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": AUTH_INVALIDATION_CHANNEL, "payload": str(auth_user_id)},
+    )
+
+
+def _on_app_user_changed(payload: Optional[str]) -> None:
+    # 重连期间可能漏收通知，清空全部快照
+    if payload is None:
+        auth_cache.clear()
+    else:
+        invalidate_app_user(payload)
+
+
+def listen_for_app_user_changes() -> None:
+    """应用启动时调用：postgres 模式下订阅业务用户变更通知。"""
+    if INVENTORY_EVENTS_BACKEND == "postgres":
+        event_bus.add_channel(AUTH_INVALIDATION_CHANNEL, _on_app_user_changed)
+
 
 def get_or_create_app_user(
     db: Session,
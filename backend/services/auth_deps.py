@@ -1,5 +1,6 @@
 """
 Supabase JWT 校验与权限依赖（供 FastAPI 路由使用），基于 PyJWT + PyJWKClient 验证 JWKS。
+已验证的 claims 与业务用户快照按 token 哈希缓存至 token 过期，命中时跳过验签与查库。
 """
 
 import os
@@ -13,7 +14,8 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
 from src.db.database import get_db
-from services.auth import get_or_create_app_user
+from schemas.user import UserSyncOut
+from services.auth import AuthCacheEntry, auth_cache, get_or_create_app_user, token_cache_key
 
 # 加载 .env 变量
 load_dotenv()
@@ -73,7 +75,13 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_
     if credentials is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     token = credentials.credentials
-    payload = _verify_token(token)
+    key = token_cache_key(token)
+    entry = auth_cache.get(key)
+    if entry is None:
+        payload = _verify_token(token)
+        entry = AuthCacheEntry(payload=payload)
+        auth_cache.set(key, entry, expires_at=payload.get("exp"))
+    payload = entry.payload
     return {
         "sub": payload.get("sub"),
         "email": payload.get("email"),
@@ -86,13 +94,22 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_
 def get_current_app_user(
     db: Session = Depends(get_db),
     user: Dict = Depends(get_current_user),
-):
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+) -> UserSyncOut:
     """
-    基于 Supabase sub 查/建 app_user，返回业务用户（含 role）。
+    基于 Supabase sub 查/建 app_user，返回业务用户快照（含 role）。
+    快照随 token 缓存；角色变更时由 services.users 主动失效。
     """
     if not user.get("sub") or not user.get("email"):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token payload")
-    return get_or_create_app_user(db, user["sub"], user["email"])
+    key = token_cache_key(credentials.credentials)
+    entry: Optional[AuthCacheEntry] = auth_cache.peek(key)
+    if entry is not None and entry.app_user is not None:
+        return entry.app_user
+    app_user = UserSyncOut.model_validate(get_or_create_app_user(db, user["sub"], user["email"]))
+    if entry is not None:
+        entry.app_user = app_user
+    return app_user
 
 
 def require_app_roles(*allowed: str):
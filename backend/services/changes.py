@@ -0,0 +1,63 @@
+"""
+增量变更服务：删除墓碑的写入与查询，以及增量同步水位。
+
+各资源的 delete_* 在删除同一事务内调用 record_tombstone；下游同步先按 changed_since
+拉取新增/修改的行，再按同一水位拉取墓碑删除本地记录。
+
+updated_at / deleted_at 取写入事务的开始时间（now()），开始早、提交晚的事务写入的行，
+时间戳可能早于客户端已经看到的最大 updated_at。因此水位不能取客户端见过的最大时间戳，
+而是由服务端在本轮同步读取之前计算（sync_watermark_async）：当前仍在进行中的事务最早的开始时间。
+这些事务之后提交的行时间戳不早于该水位，下一轮以 changed_since=水位（>=，边界行可能重复返回，
+按主键覆盖即可）一定能取到。同步流程：
+    1. GET /factory/sync-watermark 取得新水位 W；
+    2. 各列表接口与 /factory/deletions 带上一轮的水位作为 changed_since 拉取（首轮不带）；
+    3. 全部成功后保存 W 作为下一轮的 changed_since。
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.db import models
+
+RESOURCES = ("parts", "suppliers", "warehouses", "staff", "inventory", "purchases")
+
+
+def record_tombstone(db: Session, resource: str, record_key: str) -> None:
+    """记录一条删除墓碑（不提交，随调用方事务生效）。"""
+    db.add(models.DeletedRecord(resource=resource, record_key=record_key))
+
+
+async def list_tombstones_async(
+    db: AsyncSession,
+    resource: Optional[str] = None,
+    changed_since: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+) -> List[models.DeletedRecord]:
+    stmt = select(models.DeletedRecord)
+    if resource:
+        stmt = stmt.where(models.DeletedRecord.resource == resource)
+    if changed_since:
+        stmt = stmt.where(models.DeletedRecord.deleted_at >= changed_since)
+    if after:
+        stmt = stmt.where(models.DeletedRecord.id > after)
+    stmt = stmt.order_by(models.DeletedRecord.id).limit(limit)
+    return list((await db.scalars(stmt)).all())
+
+
+# pg_stat_activity 只对同一角色（或有 pg_read_all_stats 的角色）显示 xact_start；应用的所有连接使用同一角色
+_WATERMARK_SQL = text(
+    """
+    SELECT COALESCE(min(xact_start), now()) FROM pg_stat_activity
+    WHERE datname = current_database() AND backend_type = 'client backend' AND xact_start IS NOT NULL
+    """
+)
+
+
+async def sync_watermark_async(db: AsyncSession) -> datetime:
+    """下一轮增量同步的 changed_since：本库进行中事务的最早开始时间（含本事务，故不晚于 now()）。"""
+    return await db.scalar(_WATERMARK_SQL)
@@ -0,0 +1,216 @@
+"""
+批量导入服务：流式读取 CSV / NDJSON，按块用现有 Create Schema 校验，
+以多行 INSERT ... ON CONFLICT 写入；单行失败只记录不中断整批。
+
+- parts / suppliers：按主键 upsert（DO UPDATE），重复导入即覆盖；零件单价变化在同一事务内修正仓库库存金额汇总；
+- purchases：采购单为流水，已存在的单号跳过（先取单号 advisory lock 再检查）；新插入的行在同一事务内汇总过账库存并累加每日采购汇总。
+每块在 SAVEPOINT 内执行并单独提交；块写入失败（如外键不存在）时回退到逐行写入定位坏行。
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from typing import IO, Dict, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from schemas.imports import ImportResult, ImportRowError
+from schemas.part import PartCreate
+from schemas.purchase import PurchaseCreate
+from schemas.supplier import SupplierCreate
+from services import reference_cache
+from services.inventory import post_stock_receipts
+from services.partitions import ensure_purchase_months
+from services.purchases import lock_purchase_ids
+from services.summaries import apply_price_changes, apply_purchase_deltas, purchase_delta
+from src.db import models
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    schema: Type[BaseModel]
+    model: type
+    key: str
+    upsert: bool
+
+
+IMPORT_SPECS: Dict[str, ImportSpec] = {
+    "parts": ImportSpec(PartCreate, models.Part, "part_id", upsert=True),
+    "suppliers": ImportSpec(SupplierCreate, models.Supplier, "supplier_id", upsert=True),
+    "purchases": ImportSpec(PurchaseCreate, models.Purchase, "purchase_id", upsert=False),
+}
+
+
+def _iter_csv(text: IO[str]) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    for row_no, row in enumerate(csv.DictReader(text), start=1):
+        if None in row:
+            yield row_no, None, "too many columns"
+            continue
+        # CSV 空单元格视为未填写，交由 Schema 判断是否必填
+        yield row_no, {k: v for k, v in row.items() if v not in ("", None)}, None
+
+
+def _iter_ndjson(text: IO[str]) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    row_no = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_no += 1
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield row_no, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield row_no, None, "row must be a JSON object"
+            continue
+        yield row_no, data, None
+
+
+class _Importer:
+    def __init__(self, db: Session, resource: str, spec: ImportSpec):
+        self.db = db
+        self.spec = spec
+        self.result = ImportResult(resource=resource, received=0, written=0, rejected=0)
+
+    def reject(self, row_no: int, errors: List[str]) -> None:
+        self.result.rejected += 1
+        if len(self.result.errors) < MAX_REPORTED_ERRORS:
+            self.result.errors.append(ImportRowError(row=row_no, errors=errors))
+        else:
+            self.result.errors_truncated = True
+
+    def _statement(self, rows: List[dict]):
+        table = self.spec.model.__table__
+        stmt = pg_insert(table).values(rows)
+        if self.spec.upsert:
+            return stmt.on_conflict_do_update(
+                index_elements=[self.spec.key],
+                set_={
+                    **{name: stmt.excluded[name] for name in rows[0] if name != self.spec.key},
+                    "updated_at": func.now(),
+                },
+            )
+        # 冲突目标取库内主键（purchase 为分区表，主键含分区键 purchase_date）
+        return stmt.on_conflict_do_nothing(index_elements=[c.name for c in table.primary_key]).returning(
+            table.c.purchase_date,
+            table.c.warehouse_id,
+            table.c.supplier_id,
+            table.c.part_id,
+            table.c.quantity,
+            table.c.actual_price,
+        )
+
+    def _prepare(self, rows: List[dict]) -> None:
+        if self.spec.upsert:
+            return
+        # 在本事务读 purchase 之前建好分区，再锁住单号，使下面的“跳过已存在单号”不与并发写入竞争
+        ensure_purchase_months(self.db, (row["purchase_date"] for row in rows))
+        lock_purchase_ids(self.db, (row[self.spec.key] for row in rows))
+
+    def _lock_part_prices(self, rows: List[dict]) -> Dict[str, object]:
+        # 按主键顺序锁住已存在的零件并取写入前单价，避免与并发改价交错导致汇总差价算错
+        part = models.Part
+        stmt = (
+            select(part.part_id, part.unit_price)
+            .where(part.part_id.in_([row["part_id"] for row in rows]))
+            .order_by(part.part_id)
+            .with_for_update()
+        )
+        return dict(self.db.execute(stmt).all())
+
+    def _write(self, rows: List[dict]) -> int:
+        if self.spec.model is models.Part:
+            old_prices = self._lock_part_prices(rows)
+            result = self.db.execute(self._statement(rows).returning(models.Part.part_id, models.Part.unit_price))
+            apply_price_changes(
+                self.db,
+                [(row.part_id, old_prices[row.part_id], row.unit_price) for row in result if row.part_id in old_prices],
+            )
+            return len(rows)
+        if not self.spec.upsert:
+            # 分区表的主键约束只保证 (purchase_id, purchase_date) 唯一，已存在的单号在此跳过
+            key = getattr(self.spec.model, self.spec.key)
+            existing = set(self.db.scalars(select(key).where(key.in_([row[self.spec.key] for row in rows]))))
+            rows = [row for row in rows if row[self.spec.key] not in existing]
+            if not rows:
+                return 0
+        result = self.db.execute(self._statement(rows))
+        if self.spec.upsert:
+            return len(rows)
+        receipts: Dict[Tuple[str, str], int] = {}
+        summary_deltas = []
+        for row in result:
+            key = (row.warehouse_id, row.part_id)
+            receipts[key] = receipts.get(key, 0) + row.quantity
+            summary_deltas.append(purchase_delta(row))
+        post_stock_receipts(self.db, receipts)
+        apply_purchase_deltas(self.db, summary_deltas)
+        return len(summary_deltas)
+
+    def flush(self, chunk: Dict[str, Tuple[int, dict]]) -> None:
+        if not chunk:
+            return
+        self._prepare([row for _, row in chunk.values()])
+        try:
+            with self.db.begin_nested():
+                self.result.written += self._write([row for _, row in chunk.values()])
+        except DBAPIError:
+            # 整块失败时逐行重试，仅拒绝真正出错的行
+            for row_no, row in chunk.values():
+                try:
+                    with self.db.begin_nested():
+                        self.result.written += self._write([row])
+                except DBAPIError as e:
+                    self.reject(row_no, [str(e.orig).strip().splitlines()[0]])
+        self.db.commit()
+        if self.spec.upsert:
+            # parts / suppliers 为参考数据，导入后失效列表缓存
+            reference_cache.invalidate(self.result.resource)
+        chunk.clear()
+
+
+def import_rows(
+    db: Session,
+    resource: str,
+    stream: IO[bytes],
+    fmt: str = "csv",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ImportResult:
+    """
+    从二进制流导入数据；resource 见 IMPORT_SPECS，fmt 为 csv（需表头）或 ndjson。
+    同一块内主键重复时以最后一行为准。
+    """
+    spec = IMPORT_SPECS.get(resource)
+    if spec is None:
+        raise ValueError(f"Unsupported import resource: {resource}")
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    rows = _iter_csv(text) if fmt == "csv" else _iter_ndjson(text)
+
+    importer = _Importer(db, resource, spec)
+    chunk: Dict[str, Tuple[int, dict]] = {}
+    for row_no, data, error in rows:
+        importer.result.received += 1
+        if error:
+            importer.reject(row_no, [error])
+            continue
+        try:
+            record = spec.schema.model_validate(data).model_dump()
+        except ValidationError as e:
+            importer.reject(
+                row_no, [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+            )
+            continue
+        chunk[record[spec.key]] = (row_no, record)
+        if len(chunk) >= chunk_size:
+            importer.flush(chunk)
+    importer.flush(chunk)
+    return importer.result
@@ -1,24 +1,91 @@
 """
 库存（inventory）服务层：封装库存的查询、创建、更新、调整等操作。
+列表支持按复合主键 (warehouse_id, part_id) keyset 分页及 yield_per 流式迭代；
+apply_stock_delta 供采购入库在调用方事务内过账库存。
+所有库存写操作在同一事务内同步增量更新仓库库存金额汇总（services.summaries），
+并登记库存变更事件，提交后推送给订阅者（services.inventory_events）。
+读接口（list/get）另提供基于 AsyncSession 的 *_async 版本，供异步路由使用；
+changed_since 返回 updated_at 不早于该水位的行（水位见 services.changes）。
+低库存列表走部分索引 ix_inventory_below_reorder_point；补货阈值变更在同一事务内重新评估告警（services.stock_alerts）。
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
+from sqlalchemy import Integer, String, column, func, literal_column, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from schemas.inventory import InventoryAdjust, InventoryCreate, InventoryUpdate
+from schemas.inventory import (
+    InventoryAdjust,
+    InventoryAdjustLineResult,
+    InventoryBatchAdjust,
+    InventoryBatchAdjustOut,
+    InventoryCreate,
+    InventoryReorderUpdate,
+    InventoryUpdate,
+)
+from services.changes import record_tombstone
+from services.inventory_events import inventory_event, queue_inventory_events
+from services.stock_alerts import evaluate_stock_alerts
+from services.summaries import apply_stock_deltas, rebuild_stock_summary
 from src.db import models
 
 
-def list_inventory(db: Session, warehouse_id: Optional[str] = None, part_id: Optional[str] = None) -> List[models.Inventory]:
-    query = db.query(models.Inventory)
+def _inventory_criteria(
+    warehouse_id: Optional[str] = None,
+    part_id: Optional[str] = None,
+    after: Optional[Tuple[str, str]] = None,
+    changed_since: Optional[datetime] = None,
+) -> list:
+    criteria = []
     if warehouse_id:
-        query = query.filter(models.Inventory.warehouse_id == warehouse_id)
+        criteria.append(models.Inventory.warehouse_id == warehouse_id)
     if part_id:
-        query = query.filter(models.Inventory.part_id == part_id)
+        criteria.append(models.Inventory.part_id == part_id)
+    if after:
+        criteria.append(tuple_(models.Inventory.warehouse_id, models.Inventory.part_id) > tuple_(*after))
+    if changed_since:
+        criteria.append(models.Inventory.updated_at >= changed_since)
+    return criteria
+
+
+def _inventory_query(db: Session, *args):
+    return db.query(models.Inventory).filter(*_inventory_criteria(*args))
+
+
+def _order_by_pk(query):
+    return query.order_by(models.Inventory.warehouse_id, models.Inventory.part_id)
+
+
+def list_inventory(
+    db: Session,
+    warehouse_id: Optional[str] = None,
+    part_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[str, str]] = None,
+    changed_since: Optional[datetime] = None,
+) -> List[models.Inventory]:
+    query = _inventory_query(db, warehouse_id, part_id, after, changed_since)
+    if limit or after:
+        query = _order_by_pk(query).limit(limit)
     return query.all()
 
 
+def iter_inventory(
+    db: Session,
+    warehouse_id: Optional[str] = None,
+    part_id: Optional[str] = None,
+    after: Optional[Tuple[str, str]] = None,
+    batch_size: int = 1000,
+    changed_since: Optional[datetime] = None,
+) -> Iterator[models.Inventory]:
+    """按复合主键顺序流式读取（服务端游标），不在内存中物化整表。"""
+    query = _order_by_pk(_inventory_query(db, warehouse_id, part_id, after, changed_since))
+    return iter(query.yield_per(batch_size))
+
+
 def get_inventory(db: Session, warehouse_id: str, part_id: str) -> Optional[models.Inventory]:
     return (
         db.query(models.Inventory)
@@ -30,9 +97,62 @@ def get_inventory(db: Session, warehouse_id: str, part_id: str) -> Optional[mode
     )
 
 
+async def list_inventory_async(
+    db: AsyncSession,
+    warehouse_id: Optional[str] = None,
+    part_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[str, str]] = None,
+    changed_since: Optional[datetime] = None,
+) -> List[models.Inventory]:
+    stmt = select(models.Inventory).where(*_inventory_criteria(warehouse_id, part_id, after, changed_since))
+    if limit or after:
+        stmt = _order_by_pk(stmt).limit(limit)
+    return list((await db.scalars(stmt)).all())
+
+
+async def stream_inventory_async(
+    db: AsyncSession,
+    warehouse_id: Optional[str] = None,
+    part_id: Optional[str] = None,
+    after: Optional[Tuple[str, str]] = None,
+    batch_size: int = 1000,
+    changed_since: Optional[datetime] = None,
+) -> AsyncIterator[models.Inventory]:
+    """异步版 iter_inventory：服务端游标按批拉取。"""
+    criteria = _inventory_criteria(warehouse_id, part_id, after, changed_since)
+    stmt = _order_by_pk(select(models.Inventory).where(*criteria))
+    result = await db.stream_scalars(stmt.execution_options(yield_per=batch_size))
+    async for record in result:
+        yield record
+
+
+async def get_inventory_async(db: AsyncSession, warehouse_id: str, part_id: str) -> Optional[models.Inventory]:
+    return await db.get(models.Inventory, (warehouse_id, part_id))
+
+
+async def list_low_stock_async(
+    db: AsyncSession,
+    warehouse_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[str, str]] = None,
+) -> List[models.Inventory]:
+    """库存不高于补货点的行，按复合主键排序；条件与部分索引谓词一致，只扫描低库存行。"""
+    criteria = _inventory_criteria(warehouse_id, None, after)
+    criteria.append(models.Inventory.stock_quantity <= models.Inventory.reorder_point)
+    stmt = _order_by_pk(select(models.Inventory).where(*criteria)).limit(limit)
+    return list((await db.scalars(stmt)).all())
+
+
 def create_inventory(db: Session, payload: InventoryCreate) -> models.Inventory:
     record = models.Inventory(**payload.dict())
     db.add(record)
+    db.flush()
+    key = (record.warehouse_id, record.part_id)
+    apply_stock_deltas(db, {key: record.stock_quantity}, {key: 1})
+    queue_inventory_events(
+        db, [inventory_event("upsert", record.warehouse_id, record.part_id, record.stock_quantity)]
+    )
     db.commit()
     db.refresh(record)
     return record
@@ -42,30 +162,238 @@ def update_inventory(db: Session, warehouse_id: str, part_id: str, payload: Inve
     record = get_inventory(db, warehouse_id, part_id)
     if not record:
         return None
+    old_quantity = record.stock_quantity
     for key, value in payload.dict(exclude_unset=True).items():
         setattr(record, key, value)
+    db.flush()
+    apply_stock_deltas(db, {(warehouse_id, part_id): record.stock_quantity - old_quantity})
+    queue_inventory_events(db, [inventory_event("upsert", warehouse_id, part_id, record.stock_quantity)])
     db.commit()
     db.refresh(record)
     return record
 
 
-def adjust_inventory(db: Session, warehouse_id: str, part_id: str, payload: InventoryAdjust) -> Optional[models.Inventory]:
+def set_reorder_levels(
+    db: Session, warehouse_id: str, part_id: str, payload: InventoryReorderUpdate
+) -> Optional[models.Inventory]:
+    """设置补货点与目标库存（两者均为空即取消监控），同一事务内重新评估该行的告警。"""
+    if payload.target_level is not None:
+        if payload.reorder_point is None:
+            raise ValueError("target_level requires reorder_point")
+        if payload.target_level < payload.reorder_point:
+            raise ValueError("target_level must not be lower than reorder_point")
     record = get_inventory(db, warehouse_id, part_id)
     if not record:
         return None
-    new_qty = record.stock_quantity + payload.delta
-    if new_qty < 0:
-        return None
-    record.stock_quantity = new_qty
+    record.reorder_point = payload.reorder_point
+    record.target_level = payload.target_level
+    db.flush()
+    evaluate_stock_alerts(db, [(warehouse_id, part_id)])
     db.commit()
     db.refresh(record)
     return record
 
 
+def adjust_inventory(db: Session, warehouse_id: str, part_id: str, payload: InventoryAdjust) -> Optional[models.Inventory]:
+    """
+    原子调整库存：单条条件 UPDATE ... RETURNING，由数据库完成加减与非负校验。
+    并发调整同一 (warehouse_id, part_id) 时由行锁串行化，不会丢失更新；
+    记录不存在或结果为负时不修改并返回 None。
+    """
+    stmt = (
+        update(models.Inventory)
+        .where(
+            models.Inventory.warehouse_id == warehouse_id,
+            models.Inventory.part_id == part_id,
+            models.Inventory.stock_quantity + payload.delta >= 0,
+        )
+        .values(stock_quantity=models.Inventory.stock_quantity + payload.delta)
+        .returning(models.Inventory)
+        .execution_options(synchronize_session=False)
+    )
+    record = db.execute(stmt).scalar_one_or_none()
+    if record is not None:
+        # 脱离会话，提交后不被过期，避免序列化时 refresh 再查一次
+        db.expunge(record)
+        apply_stock_deltas(db, {(warehouse_id, part_id): payload.delta})
+        queue_inventory_events(db, [inventory_event("upsert", warehouse_id, part_id, record.stock_quantity)])
+    db.commit()
+    return record
+
+
+def batch_adjust_inventory(db: Session, payload: InventoryBatchAdjust) -> InventoryBatchAdjustOut:
+    """
+    批量调整库存：同一 (warehouse_id, part_id) 的多行先合并为净增减量，
+    再以一条 UPDATE ... FROM (VALUES ...) RETURNING 在单个事务内整体生效。
+    UPDATE 的加锁顺序取决于执行计划，先按主键顺序 SELECT ... FOR UPDATE 锁住所有键，
+    使键集合交叠的并发批次按同一顺序等待而不会死锁。
+    任一键不存在或合计后为负则整批回滚，并返回逐行原因。
+    """
+    net: Dict[Tuple[str, str], int] = {}
+    for item in payload.items:
+        key = (item.warehouse_id, item.part_id)
+        net[key] = net.get(key, 0) + item.delta
+
+    db.execute(
+        select(models.Inventory.warehouse_id, models.Inventory.part_id)
+        .where(tuple_(models.Inventory.warehouse_id, models.Inventory.part_id).in_(sorted(net)))
+        .order_by(models.Inventory.warehouse_id, models.Inventory.part_id)
+        .with_for_update()
+    ).all()
+
+    movements = values(
+        column("warehouse_id", String),
+        column("part_id", String),
+        column("delta", Integer),
+        name="movements",
+    ).data([(w, p, d) for (w, p), d in net.items()])
+    stmt = (
+        update(models.Inventory)
+        .where(
+            models.Inventory.warehouse_id == movements.c.warehouse_id,
+            models.Inventory.part_id == movements.c.part_id,
+            models.Inventory.stock_quantity + movements.c.delta >= 0,
+        )
+        .values(stock_quantity=models.Inventory.stock_quantity + movements.c.delta)
+        .returning(models.Inventory.warehouse_id, models.Inventory.part_id, models.Inventory.stock_quantity)
+        .execution_options(synchronize_session=False)
+    )
+    updated = {(row.warehouse_id, row.part_id): row.stock_quantity for row in db.execute(stmt)}
+
+    applied = len(updated) == len(net)
+    if applied:
+        apply_stock_deltas(db, net)
+        queue_inventory_events(db, [inventory_event("upsert", w, p, qty) for (w, p), qty in updated.items()])
+        db.commit()
+        current = updated
+    else:
+        db.rollback()
+        # 仅失败时多查一次，用于区分“不存在”与“库存不足”
+        current = {
+            (row.warehouse_id, row.part_id): row.stock_quantity
+            for row in db.execute(
+                select(models.Inventory.warehouse_id, models.Inventory.part_id, models.Inventory.stock_quantity).where(
+                    tuple_(models.Inventory.warehouse_id, models.Inventory.part_id).in_(list(net))
+                )
+            )
+        }
+        db.commit()
+
+    results = []
+    for item in payload.items:
+        key = (item.warehouse_id, item.part_id)
+        if applied:
+            line_status = "ok"
+        elif key not in current:
+            line_status = "not_found"
+        elif key not in updated:
+            line_status = "insufficient_stock"
+        else:
+            line_status = "skipped"
+        results.append(
+            InventoryAdjustLineResult(
+                warehouse_id=item.warehouse_id,
+                part_id=item.part_id,
+                delta=item.delta,
+                status=line_status,
+                stock_quantity=current.get(key),
+            )
+        )
+    return InventoryBatchAdjustOut(applied=applied, results=results)
+
+
+def post_stock_receipts(db: Session, totals: Dict[Tuple[str, str], int]) -> None:
+    """
+    入库过账（不提交）：多行 INSERT ... ON CONFLICT DO UPDATE 一次累加多个 (warehouse_id, part_id)，
+    记录不存在时自动创建（xmax = 0 即本语句新插入的行，计入零件种数）。totals 的增量须为正。
+    """
+    if not totals:
+        return
+    # 按主键顺序写入，多键并发入库时加锁顺序一致
+    stmt = pg_insert(models.Inventory).values(
+        [{"warehouse_id": w, "part_id": p, "stock_quantity": qty} for (w, p), qty in sorted(totals.items())]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.Inventory.warehouse_id, models.Inventory.part_id],
+        set_={
+            "stock_quantity": models.Inventory.stock_quantity + stmt.excluded.stock_quantity,
+            "updated_at": func.now(),
+        },
+    )
+    stmt = stmt.returning(
+        models.Inventory.warehouse_id,
+        models.Inventory.part_id,
+        models.Inventory.stock_quantity,
+        literal_column("xmax = 0").label("inserted"),
+    )
+    rows = db.execute(stmt).all()
+    queue_inventory_events(
+        db, [inventory_event("upsert", row.warehouse_id, row.part_id, row.stock_quantity) for row in rows]
+    )
+    apply_stock_deltas(db, totals, {(row.warehouse_id, row.part_id): 1 for row in rows if row.inserted})
+
+
+def apply_stock_delta(db: Session, warehouse_id: str, part_id: str, delta: int) -> bool:
+    """
+    在当前事务内过账库存变动，不提交（由调用方统一 commit/rollback）。
+    - delta > 0：INSERT ... ON CONFLICT DO UPDATE 累加，记录不存在时自动创建；
+    - delta < 0：条件 UPDATE，记录不存在或结果为负时返回 False。
+    """
+    if delta > 0:
+        post_stock_receipts(db, {(warehouse_id, part_id): delta})
+        return True
+    if delta < 0:
+        result = db.execute(
+            update(models.Inventory)
+            .where(
+                models.Inventory.warehouse_id == warehouse_id,
+                models.Inventory.part_id == part_id,
+                models.Inventory.stock_quantity + delta >= 0,
+            )
+            .values(stock_quantity=models.Inventory.stock_quantity + delta)
+            .returning(models.Inventory.stock_quantity)
+            .execution_options(synchronize_session=False)
+        )
+        stock_quantity = result.scalar_one_or_none()
+        if stock_quantity is None:
+            return False
+        apply_stock_deltas(db, {(warehouse_id, part_id): delta})
+        queue_inventory_events(db, [inventory_event("upsert", warehouse_id, part_id, stock_quantity)])
+        return True
+    return True
+
+
+def rebuild_inventory_from_purchases(db: Session) -> int:
+    """
+    按采购记录重算库存：一条 INSERT ... SELECT ... GROUP BY ... ON CONFLICT DO UPDATE，
+    将每个 (warehouse_id, part_id) 的库存设为其采购数量合计；无采购记录的库存行保持不变。
+    随后整体重算仓库库存金额汇总。返回受影响行数。
+    """
+    totals = select(
+        models.Purchase.warehouse_id,
+        models.Purchase.part_id,
+        func.sum(models.Purchase.quantity),
+    ).group_by(models.Purchase.warehouse_id, models.Purchase.part_id)
+    stmt = pg_insert(models.Inventory).from_select(["warehouse_id", "part_id", "stock_quantity"], totals)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.Inventory.warehouse_id, models.Inventory.part_id],
+        set_={"stock_quantity": stmt.excluded.stock_quantity, "updated_at": func.now()},
+    )
+    result = db.execute(stmt)
+    rebuild_stock_summary(db)
+    queue_inventory_events(db, [inventory_event("resync", None, None, None)])
+    db.commit()
+    return result.rowcount
+
+
 def delete_inventory(db: Session, warehouse_id: str, part_id: str) -> bool:
     record = get_inventory(db, warehouse_id, part_id)
     if not record:
         return False
+    key = (warehouse_id, part_id)
+    apply_stock_deltas(db, {key: -record.stock_quantity}, {key: -1})
+    record_tombstone(db, "inventory", f"{warehouse_id},{part_id}")
+    queue_inventory_events(db, [inventory_event("delete", warehouse_id, part_id, None)])
     db.delete(record)
     db.commit()
     return True
@@ -0,0 +1,217 @@
+"""
+库存变更推送：库存写操作产生的事件在事务提交后广播给订阅者（SSE 路由）。
+
+- 服务层调用 queue_inventory_events 将事件挂在会话上，提交后才生效，回滚则丢弃；
+- local 模式（单进程）：提交后直接发布到进程内总线；
+- postgres 模式（多 worker）：提交前以 pg_notify 写入事务，由 Postgres 在提交时投递，
+  每个 worker 用一条 LISTEN 连接接收后再分发给本进程的订阅者。
+  PgBouncer 事务池不支持 LISTEN，可用 INVENTORY_EVENTS_LISTEN_URL 指定直连地址。
+  其他需要跨 worker 广播的模块（如鉴权缓存失效）可用 add_channel 复用同一条 LISTEN 连接。
+
+每个订阅者有独立的有界队列；消费过慢导致队列溢出时丢弃事件并补发一条 resync，提示客户端重新拉取。
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set
+
+import asyncpg
+from dotenv import load_dotenv
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_EVENTS_BACKEND = os.getenv("INVENTORY_EVENTS_BACKEND", "local").strip().lower()
+INVENTORY_EVENTS_LISTEN_URL = os.getenv("INVENTORY_EVENTS_LISTEN_URL") or os.getenv("DATABASE_URL")
+INVENTORY_EVENTS_QUEUE_SIZE = int(os.getenv("INVENTORY_EVENTS_QUEUE_SIZE", "1000"))
+
+CHANNEL = "inventory_changes"
+# NOTIFY 负载上限约 8000 字节，按条数分批发送
+NOTIFY_BATCH_SIZE = 50
+RECONNECT_DELAY_SECONDS = 2.0
+
+_PENDING_KEY = "pending_inventory_events"
+_SAVEPOINT_MARKS_KEY = "inventory_event_savepoints"
+
+
+def inventory_event(
+    op: str, warehouse_id: Optional[str], part_id: Optional[str], stock_quantity: Optional[int]
+) -> dict:
+    """op：upsert（新建或数量变化）/ delete / resync（需重新拉取全量）。"""
+    return {"op": op, "warehouse_id": warehouse_id, "part_id": part_id, "stock_quantity": stock_quantity}
+
+
+def queue_inventory_events(db: Session, events: Iterable[dict]) -> None:
+    """在当前事务中登记待发布事件（不提交）。"""
+    db.info.setdefault(_PENDING_KEY, []).extend(events)
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_before_commit(session: Session) -> None:
+    # 释放 SAVEPOINT 也会触发 commit 事件，只在最外层事务提交时处理
+    if INVENTORY_EVENTS_BACKEND != "postgres" or session.in_nested_transaction():
+        return
+    events = session.info.pop(_PENDING_KEY, None)
+    if not events:
+        return
+    for start in range(0, len(events), NOTIFY_BATCH_SIZE):
+        payload = json.dumps(events[start:start + NOTIFY_BATCH_SIZE], separators=(",", ":"))
+        session.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_SAVEPOINT_MARKS_KEY, None)
+    events = session.info.pop(_PENDING_KEY, None)
+    if events:
+        bus.publish(events)
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _mark_savepoint(session: Session, transaction) -> None:
+    if transaction.nested:
+        marks = session.info.setdefault(_SAVEPOINT_MARKS_KEY, {})
+        marks[transaction] = len(session.info.get(_PENDING_KEY, ()))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session: Session, previous_transaction) -> None:
+    # 回滚 SAVEPOINT 只丢弃其内部登记的事件；回滚整个事务则全部丢弃
+    if previous_transaction.nested:
+        mark = session.info.get(_SAVEPOINT_MARKS_KEY, {}).pop(previous_transaction, None)
+        pending = session.info.get(_PENDING_KEY)
+        if mark is not None and pending is not None:
+            del pending[mark:]
+    else:
+        session.info.pop(_PENDING_KEY, None)
+        session.info.pop(_SAVEPOINT_MARKS_KEY, None)
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, warehouse_id: Optional[str]):
+        self.loop = loop
+        self.warehouse_id = warehouse_id
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=INVENTORY_EVENTS_QUEUE_SIZE)
+        self.lagged = False
+
+    def _put(self, item: dict) -> None:
+        # 仅在订阅者所在事件循环中调用
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+    async def get(self) -> dict:
+        if self.lagged and self.queue.empty():
+            self.lagged = False
+            return inventory_event("resync", self.warehouse_id, None, None)
+        return await self.queue.get()
+
+
+class InventoryEventBus:
+    """进程内扇出：按仓库索引订阅者，发布时只遍历相关订阅者；可从任意线程调用 publish。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_warehouse: Dict[Optional[str], Set[_Subscriber]] = {}
+        self._channels: Dict[str, Callable[[Optional[str]], None]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._by_warehouse.values())
+
+    def publish(self, events: List[dict]) -> None:
+        with self._lock:
+            targets: Dict[_Subscriber, List[dict]] = {}
+            for item in events:
+                if item["warehouse_id"] is None:
+                    # 不针对具体仓库的事件（如 resync）发给所有订阅者
+                    groups = list(self._by_warehouse.values())
+                else:
+                    groups = [self._by_warehouse.get(None, ()), self._by_warehouse.get(item["warehouse_id"], ())]
+                for subs in groups:
+                    for sub in subs:
+                        targets.setdefault(sub, []).append(item)
+        for sub, items in targets.items():
+            for item in items:
+                try:
+                    sub.loop.call_soon_threadsafe(sub._put, item)
+                except RuntimeError:
+                    # 事件循环已关闭
+                    pass
+
+    @asynccontextmanager
+    async def subscribe(self, warehouse_id: Optional[str] = None) -> AsyncIterator[_Subscriber]:
+        sub = _Subscriber(asyncio.get_running_loop(), warehouse_id)
+        with self._lock:
+            self._by_warehouse.setdefault(warehouse_id, set()).add(sub)
+        if INVENTORY_EVENTS_BACKEND == "postgres":
+            self._ensure_listener()
+        try:
+            yield sub
+        finally:
+            with self._lock:
+                subs = self._by_warehouse.get(warehouse_id)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._by_warehouse[warehouse_id]
+
+    def add_channel(self, channel: str, handler: Callable[[Optional[str]], None]) -> None:
+        """
+        在 LISTEN 连接上额外监听 channel（仅 postgres 模式，须在事件循环中、启动时调用）：
+        handler 收到原始负载；重连后以 None 调用一次，表示断线期间的通知可能已丢失。
+        """
+        self._channels[channel] = handler
+        self._ensure_listener()
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """每个 worker 一条 LISTEN 连接；断线后重连并通知订阅者 resync。"""
+
+        def on_notify(connection, pid, channel, payload):
+            try:
+                self.publish(json.loads(payload))
+            except ValueError:
+                logger.warning("invalid inventory notification payload")
+
+        reconnect = False
+        while True:
+            try:
+                dsn = make_url(INVENTORY_EVENTS_LISTEN_URL).set(drivername="postgresql")
+                conn = await asyncpg.connect(dsn.render_as_string(hide_password=False))
+                try:
+                    await conn.add_listener(CHANNEL, on_notify)
+                    for channel, handler in self._channels.items():
+                        await conn.add_listener(channel, lambda _c, _pid, _ch, payload, h=handler: h(payload))
+                    if reconnect:
+                        self.publish([inventory_event("resync", None, None, None)])
+                        for handler in self._channels.values():
+                            handler(None)
+                    while not conn.is_closed():
+                        await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                finally:
+                    await conn.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("inventory LISTEN connection failed")
+            reconnect = True
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+
+bus = InventoryEventBus()
@@ -0,0 +1,138 @@
+"""
+采购分区维护：确保写入月份的分区存在、定期预建未来分区、归档（分离）旧分区。
+
+- ensure_purchase_months：写采购单前调用，须在业务会话读写 purchase 之前（已持有父表 ACCESS SHARE 锁时，
+  建分区所需的 ACCESS EXCLUSIVE 锁会等到超时）；在业务会话中查目录确认分区，缺失时用独立的短事务建分区
+  （强锁不能拖到业务事务提交）。不做进程内缓存：其他 worker 归档分区后，本进程无从得知；
+- maintenance_loop：应用启动后周期性预建当月起 PURCHASE_PARTITION_MONTHS_AHEAD 个月的分区；
+- archive_purchase_partitions：以 DETACH PARTITION ... CONCURRENTLY 分离早于指定日期的整月分区（不阻塞读写），
+  并移入 PURCHASE_ARCHIVE_SCHEMA，之后可 pg_dump 备份再 DROP。汇总表中对应月份的统计保留。
+  分离与移动是两条自动提交语句：分离前先检查归档 schema 中没有同名表，每次执行先补完上次已分离但未移走的分区，
+  避免分离出的表滞留在父表 schema 中、既不在采购表里也不在归档里。
+"""
+
+import asyncio
+import logging
+import os
+from datetime import date
+from typing import Iterable, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from src.db.database import engine
+from src.db.partitions import (
+    PARENT,
+    add_months,
+    covers_month,
+    ensure_purchase_partitions,
+    list_detached_purchase_partitions,
+    list_purchase_partitions,
+    month_start,
+)
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PURCHASE_PARTITION_MONTHS_AHEAD = int(os.getenv("PURCHASE_PARTITION_MONTHS_AHEAD", "3"))
+PURCHASE_PARTITION_CHECK_SECONDS = float(os.getenv("PURCHASE_PARTITION_CHECK_SECONDS", "21600"))
+PURCHASE_ARCHIVE_SCHEMA = os.getenv("PURCHASE_ARCHIVE_SCHEMA", "purchase_archive")
+
+# 建分区时等待父表锁的上限，避免排在长事务之后堵住采购表读写
+PARTITION_LOCK_TIMEOUT = "5s"
+
+def _create_partitions(start: date, end: date) -> List[str]:
+    # 多个 worker 可能同时建同一分区，失败后重试一次（重新读取已有分区）
+    for attempt in (1, 2):
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"SET LOCAL lock_timeout = '{PARTITION_LOCK_TIMEOUT}'"))
+                return ensure_purchase_partitions(conn, start, end)
+        except DBAPIError:
+            if attempt == 2:
+                raise
+    return []
+
+
+def ensure_purchase_months(db: Session, dates: Iterable[date]) -> None:
+    """确保这些采购日期所在月份均有分区；须在 db 本事务读写 purchase 之前调用。"""
+    months = {month_start(d) for d in dates if d is not None}
+    if not months:
+        return
+    existing = list_purchase_partitions(db.connection())
+    for month in sorted(m for m in months if not any(covers_month(p, m) for p in existing)):
+        created = _create_partitions(month, month)
+        if created:
+            logger.info("created purchase partitions %s", ", ".join(created))
+
+
+def ensure_future_partitions(today: Optional[date] = None) -> List[str]:
+    """预建当月至未来 PURCHASE_PARTITION_MONTHS_AHEAD 个月的分区，返回新建的分区名。"""
+    start = month_start(today or date.today())
+    end = add_months(start, PURCHASE_PARTITION_MONTHS_AHEAD)
+    return _create_partitions(start, end)
+
+
+def list_partitions(db: Session) -> List[dict]:
+    return list_purchase_partitions(db.connection())
+
+
+def _archived_names(conn, names: List[str]) -> List[str]:
+    """归档 schema 中已存在的同名表。"""
+    return [
+        name
+        for name in names
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": f"{PURCHASE_ARCHIVE_SCHEMA}.{name}"}).scalar()
+    ]
+
+
+def archive_purchase_partitions(before: date) -> List[str]:
+    """
+    分离范围上界不晚于 before 的分区并移入归档 schema，返回分区名（含补完移动的遗留分区）。
+    归档 schema 中已有同名表时不做任何分离，抛出 ValueError。
+    """
+    archived = []
+    # DETACH ... CONCURRENTLY 不能在事务块中执行
+    with engine.connect() as raw:
+        conn = raw.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {PURCHASE_ARCHIVE_SCHEMA}"))
+        leftovers = list_detached_purchase_partitions(conn)
+        candidates = [
+            p for p in list_purchase_partitions(conn) if p["range_to"] is not None and p["range_to"] <= before
+        ]
+        conflicts = _archived_names(conn, leftovers + [p["name"] for p in candidates])
+        if conflicts:
+            raise ValueError(
+                f"tables already exist in schema {PURCHASE_ARCHIVE_SCHEMA}: {', '.join(conflicts)}; "
+                "rename or drop them before archiving"
+            )
+        for name in leftovers:
+            # 上次已分离但未移入归档 schema
+            conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {PURCHASE_ARCHIVE_SCHEMA}"))
+            archived.append(name)
+        for partition in candidates:
+            name = partition["name"]
+            if partition["detach_pending"]:
+                # 上次 CONCURRENTLY 分离中断，补完
+                conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name} FINALIZE"))
+            else:
+                conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name} CONCURRENTLY"))
+            conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {PURCHASE_ARCHIVE_SCHEMA}"))
+            archived.append(name)
+    return archived
+
+
+async def maintenance_loop() -> None:
+    while True:
+        try:
+            created = await asyncio.to_thread(ensure_future_partitions)
+            if created:
+                logger.info("created purchase partitions %s", ", ".join(created))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("purchase partition maintenance failed")
+        await asyncio.sleep(PURCHASE_PARTITION_CHECK_SECONDS)
@@ -1,13 +1,24 @@
 """
 零件（part）服务层：封装对零件的增删改查，供路由调用。
 使用 SQLAlchemy Session 直接操作 ORM 模型。
+读接口（list/get）另提供基于 AsyncSession 的 *_async 版本，供异步路由使用；
+列表返回按响应 schema 序列化好的 JSON 及其内容版本（services.versions），供条件请求生成 ETag；changed_since 返回 updated_at 不早于该水位的行（水位见 services.changes）。
+异步列表的序列化结果连同内容版本经 services.reference_cache 缓存，写操作提交后整体失效。
+修改单价时在同一事务内修正仓库库存金额汇总。
 """
 
+from datetime import datetime
 from typing import List, Optional
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from schemas.part import PartCreate, PartOut, PartUpdate
+from services import reference_cache
+from services.changes import record_tombstone
+from services.summaries import apply_price_change
+from services.versions import VersionedJSON, versioned_json
 from src.db import models
 
 
@@ -22,21 +33,58 @@ def get_part(db: Session, part_id: str) -> Optional[models.Part]:
     return db.query(models.Part).filter(models.Part.part_id == part_id).first()
 
 
+def _part_criteria(part_type: Optional[str] = None, changed_since: Optional[datetime] = None) -> list:
+    criteria = []
+    if part_type:
+        criteria.append(models.Part.type == part_type)
+    if changed_since:
+        criteria.append(models.Part.updated_at >= changed_since)
+    return criteria
+
+
+async def list_parts_async(
+    db: AsyncSession, part_type: Optional[str] = None, changed_since: Optional[datetime] = None
+) -> VersionedJSON:
+    async def load() -> VersionedJSON:
+        stmt = select(models.Part).where(*_part_criteria(part_type, changed_since))
+        return versioned_json(PartOut, await db.scalars(stmt))
+
+    if changed_since:
+        # 增量查询的水位各不相同，不进缓存
+        return await load()
+    return await reference_cache.cached_list(reference_cache.PARTS, part_type, load)
+
+
+async def get_part_async(db: AsyncSession, part_id: str) -> Optional[models.Part]:
+    return await db.get(models.Part, part_id)
+
+
 def create_part(db: Session, payload: PartCreate) -> models.Part:
     part = models.Part(**payload.dict())
     db.add(part)
     db.commit()
+    reference_cache.invalidate(reference_cache.PARTS)
     db.refresh(part)
     return part
 
 
 def update_part(db: Session, part_id: str, payload: PartUpdate) -> Optional[models.Part]:
-    part = get_part(db, part_id)
+    # 锁住零件行再读原单价：并发改价依次基于前一次提交的单价计算差价，库存汇总不重复计入
+    part = db.scalars(
+        select(models.Part)
+        .where(models.Part.part_id == part_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).first()
     if not part:
         return None
+    old_price = part.unit_price
     for key, value in payload.dict(exclude_unset=True).items():
         setattr(part, key, value)
+    db.flush()
+    apply_price_change(db, part_id, old_price, part.unit_price)
     db.commit()
+    reference_cache.invalidate(reference_cache.PARTS)
     db.refresh(part)
     return part
 
@@ -45,6 +93,8 @@ def delete_part(db: Session, part_id: str) -> bool:
     part = get_part(db, part_id)
     if not part:
         return False
+    record_tombstone(db, "parts", part_id)
     db.delete(part)
     db.commit()
+    reference_cache.invalidate(reference_cache.PARTS)
     return True
@@ -1,49 +1,203 @@
 """
 采购（purchase）服务层：封装采购单的增删改查，供路由调用。
+列表支持按主键 keyset 分页（limit/after）及 yield_per 流式迭代。
+purchase 按 purchase_date 月度分区，带 date_from/date_to 的查询只扫描相应月份分区；写入前确保目标月份分区存在。
+分区表的主键含 purchase_date，单号全局唯一由写入前的事务级 advisory lock（lock_purchase_ids）加检查保证。
+采购单的增/改/删与对应库存过账、每日采购汇总增量更新在同一事务内完成；冲减导致库存为负时抛出 ValueError 并回滚。
+读接口（list/get）另提供基于 AsyncSession 的 *_async 版本，供异步路由使用；
+changed_since 返回 updated_at 不早于该水位的行（水位见 services.changes）。
 """
 
-from typing import List, Optional
+import zlib
+from datetime import date, datetime
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from schemas.purchase import PurchaseCreate, PurchaseUpdate
+from services.changes import record_tombstone
+from services.inventory import apply_stock_delta
+from services.partitions import ensure_purchase_months
+from services.summaries import apply_purchase_deltas, purchase_delta
 from src.db import models
 
 
-def list_purchases(
-    db: Session,
+def _purchase_criteria(
     warehouse_id: Optional[str] = None,
     supplier_id: Optional[str] = None,
     part_id: Optional[str] = None,
-) -> List[models.Purchase]:
-    query = db.query(models.Purchase)
+    after: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    changed_since: Optional[datetime] = None,
+) -> list:
+    criteria = []
     if warehouse_id:
-        query = query.filter(models.Purchase.warehouse_id == warehouse_id)
+        criteria.append(models.Purchase.warehouse_id == warehouse_id)
     if supplier_id:
-        query = query.filter(models.Purchase.supplier_id == supplier_id)
+        criteria.append(models.Purchase.supplier_id == supplier_id)
     if part_id:
-        query = query.filter(models.Purchase.part_id == part_id)
+        criteria.append(models.Purchase.part_id == part_id)
+    if date_from:
+        criteria.append(models.Purchase.purchase_date >= date_from)
+    if date_to:
+        criteria.append(models.Purchase.purchase_date <= date_to)
+    if after:
+        criteria.append(models.Purchase.purchase_id > after)
+    if changed_since:
+        criteria.append(models.Purchase.updated_at >= changed_since)
+    return criteria
+
+
+def _purchase_query(db: Session, *args):
+    return db.query(models.Purchase).filter(*_purchase_criteria(*args))
+
+
+def list_purchases(
+    db: Session,
+    warehouse_id: Optional[str] = None,
+    supplier_id: Optional[str] = None,
+    part_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    changed_since: Optional[datetime] = None,
+) -> List[models.Purchase]:
+    query = _purchase_query(db, warehouse_id, supplier_id, part_id, after, date_from, date_to, changed_since)
+    if limit or after:
+        query = query.order_by(models.Purchase.purchase_id).limit(limit)
     return query.all()
 
 
+def iter_purchases(
+    db: Session,
+    warehouse_id: Optional[str] = None,
+    supplier_id: Optional[str] = None,
+    part_id: Optional[str] = None,
+    after: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    batch_size: int = 1000,
+    changed_since: Optional[datetime] = None,
+) -> Iterator[models.Purchase]:
+    """按主键顺序流式读取（服务端游标），不在内存中物化整表。"""
+    query = _purchase_query(db, warehouse_id, supplier_id, part_id, after, date_from, date_to, changed_since)
+    return iter(query.order_by(models.Purchase.purchase_id).yield_per(batch_size))
+
+
 def get_purchase(db: Session, purchase_id: str) -> Optional[models.Purchase]:
     return db.query(models.Purchase).filter(models.Purchase.purchase_id == purchase_id).first()
 
 
+async def list_purchases_async(
+    db: AsyncSession,
+    warehouse_id: Optional[str] = None,
+    supplier_id: Optional[str] = None,
+    part_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    changed_since: Optional[datetime] = None,
+) -> List[models.Purchase]:
+    stmt = select(models.Purchase).where(
+        *_purchase_criteria(warehouse_id, supplier_id, part_id, after, date_from, date_to, changed_since)
+    )
+    if limit or after:
+        stmt = stmt.order_by(models.Purchase.purchase_id).limit(limit)
+    return list((await db.scalars(stmt)).all())
+
+
+async def stream_purchases_async(
+    db: AsyncSession,
+    warehouse_id: Optional[str] = None,
+    supplier_id: Optional[str] = None,
+    part_id: Optional[str] = None,
+    after: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    batch_size: int = 1000,
+    changed_since: Optional[datetime] = None,
+) -> AsyncIterator[models.Purchase]:
+    """异步版 iter_purchases：服务端游标按批拉取。"""
+    stmt = (
+        select(models.Purchase)
+        .where(*_purchase_criteria(warehouse_id, supplier_id, part_id, after, date_from, date_to, changed_since))
+        .order_by(models.Purchase.purchase_id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await db.stream_scalars(stmt)
+    async for record in result:
+        yield record
+
+
+async def get_purchase_async(db: AsyncSession, purchase_id: str) -> Optional[models.Purchase]:
+    return await db.get(models.Purchase, purchase_id)
+
+
+def _post_movements(db: Session, movements: Dict[Tuple[str, str], int]) -> None:
+    # 先入库后冲减，同一键的变动已在调用方合并为净额
+    for (warehouse_id, part_id), delta in sorted(movements.items(), key=lambda kv: kv[1] < 0):
+        if not apply_stock_delta(db, warehouse_id, part_id, delta):
+            db.rollback()
+            raise ValueError(f"Inventory ({warehouse_id}, {part_id}) would become negative")
+
+
+# advisory lock 两参数形式的第一个键，与迁移锁（单个 bigint 键）不在同一键空间
+PURCHASE_ID_LOCK_CLASS = 18
+# 单号按哈希分桶加锁：批量导入一次最多持有这么多把锁，不同单号偶尔落入同一桶只会短暂串行
+PURCHASE_ID_LOCK_BUCKETS = 256
+
+
+def lock_purchase_ids(db: Session, purchase_ids: Iterable[str]) -> None:
+    """
+    为这些单号取事务级 advisory lock（不提交），使同一单号的“检查是否存在 - 插入”在并发写入间串行。
+    桶号升序加锁，多个批次同时加锁不会互相死锁。
+    """
+    buckets = sorted({zlib.crc32(pid.encode()) % PURCHASE_ID_LOCK_BUCKETS for pid in purchase_ids})
+    if buckets:
+        # unnest 按数组顺序产出，聚合逐行调用，加锁顺序即 buckets 顺序
+        db.execute(
+            text("SELECT count(pg_advisory_xact_lock(:cls, b)) FROM unnest(CAST(:buckets AS integer[])) AS b"),
+            {"cls": PURCHASE_ID_LOCK_CLASS, "buckets": buckets},
+        )
+
+
 def create_purchase(db: Session, payload: PurchaseCreate) -> models.Purchase:
+    # 建分区须在本事务读 purchase 之前
+    ensure_purchase_months(db, [payload.purchase_date])
+    lock_purchase_ids(db, [payload.purchase_id])
+    if get_purchase(db, payload.purchase_id):
+        raise ValueError(f"Purchase {payload.purchase_id} already exists")
     record = models.Purchase(**payload.dict())
     db.add(record)
+    _post_movements(db, {(record.warehouse_id, record.part_id): record.quantity})
+    apply_purchase_deltas(db, [purchase_delta(record)])
     db.commit()
     db.refresh(record)
     return record
 
 
 def update_purchase(db: Session, purchase_id: str, payload: PurchaseUpdate) -> Optional[models.Purchase]:
+    changes = payload.dict(exclude_unset=True)
+    if changes.get("purchase_date"):
+        # 改日期可能跨月，行会移动到目标月分区；建分区须在本事务读 purchase 之前
+        ensure_purchase_months(db, [changes["purchase_date"]])
     record = get_purchase(db, purchase_id)
     if not record:
         return None
-    for key, value in payload.dict(exclude_unset=True).items():
+    movements: Dict[Tuple[str, str], int] = {(record.warehouse_id, record.part_id): -record.quantity}
+    summary_deltas = [purchase_delta(record, -1)]
+    for key, value in changes.items():
         setattr(record, key, value)
+    new_key = (record.warehouse_id, record.part_id)
+    movements[new_key] = movements.get(new_key, 0) + record.quantity
+    _post_movements(db, movements)
+    summary_deltas.append(purchase_delta(record))
+    apply_purchase_deltas(db, summary_deltas)
     db.commit()
     db.refresh(record)
     return record
@@ -53,6 +207,9 @@ def delete_purchase(db: Session, purchase_id: str) -> bool:
     record = get_purchase(db, purchase_id)
     if not record:
         return False
+    _post_movements(db, {(record.warehouse_id, record.part_id): -record.quantity})
+    apply_purchase_deltas(db, [purchase_delta(record, -1)])
+    record_tombstone(db, "purchases", purchase_id)
     db.delete(record)
     db.commit()
     return True
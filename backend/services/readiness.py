@@ -0,0 +1,104 @@
+"""
+就绪探测：供编排系统判断本实例能否接流量（/health 只表示进程存活）。
+
+- database：经异步引擎连接池执行 SELECT 1（含借出等待），超过 READINESS_DB_TIMEOUT_MS 视为不可用；
+- jwks：从缓存的 get_jwks_client 取签名公钥（PyJWKClient 自带 JWK Set 缓存，过期时才重新拉取），
+  超过 READINESS_JWKS_TIMEOUT_MS 或没有可用公钥视为不可用；只配置 HS 共享密钥时跳过；
+- pool：同步/异步连接池的剩余可借连接数（pool_size + max_overflow - 已借出）
+  都不低于 READINESS_MIN_POOL_HEADROOM，只读进程内计数，不访问数据库。
+
+结果在进程内缓存 READINESS_CACHE_SECONDS 秒，并发探测只触发一次检查，探测本身不会给数据库加压。
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from services.auth_deps import SUPABASE_JWKS_URL, SUPABASE_JWT_SECRET, get_jwks_client
+from src.db.database import DB_MAX_OVERFLOW, engine, get_async_engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+READINESS_CACHE_SECONDS = float(os.getenv("READINESS_CACHE_SECONDS", "2"))
+READINESS_DB_TIMEOUT_MS = float(os.getenv("READINESS_DB_TIMEOUT_MS", "500"))
+READINESS_JWKS_TIMEOUT_MS = float(os.getenv("READINESS_JWKS_TIMEOUT_MS", "1000"))
+READINESS_MIN_POOL_HEADROOM = int(os.getenv("READINESS_MIN_POOL_HEADROOM", "1"))
+
+_cached: Optional[Tuple[float, dict]] = None
+_lock = asyncio.Lock()
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+async def _check_database() -> dict:
+    started = time.perf_counter()
+
+    async def select_one():
+        async with get_async_engine().connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        await asyncio.wait_for(select_one(), READINESS_DB_TIMEOUT_MS / 1000)
+    except asyncio.TimeoutError:
+        return {"ok": False, "latency_ms": _elapsed_ms(started), "error": "timeout"}
+    except Exception as e:
+        logger.warning("readiness database check failed: %s", e)
+        return {"ok": False, "latency_ms": _elapsed_ms(started), "error": type(e).__name__}
+    return {"ok": True, "latency_ms": _elapsed_ms(started)}
+
+
+async def _check_jwks() -> dict:
+    if not SUPABASE_JWKS_URL:
+        if SUPABASE_JWT_SECRET:
+            return {"ok": True, "skipped": "HS256 secret only"}
+        return {"ok": False, "error": "JWKS URL not configured"}
+    started = time.perf_counter()
+    try:
+        # 命中 JWK Set 缓存时不发请求；拉取在线程中进行，超时后线程自行结束，下次探测再看
+        keys = await asyncio.wait_for(
+            asyncio.to_thread(lambda: get_jwks_client().get_signing_keys()), READINESS_JWKS_TIMEOUT_MS / 1000
+        )
+    except asyncio.TimeoutError:
+        return {"ok": False, "latency_ms": _elapsed_ms(started), "error": "timeout"}
+    except Exception as e:
+        logger.warning("readiness JWKS check failed: %s", e)
+        return {"ok": False, "latency_ms": _elapsed_ms(started), "error": type(e).__name__}
+    return {"ok": True, "latency_ms": _elapsed_ms(started), "keys": len(keys)}
+
+
+def _check_pool() -> dict:
+    headroom = {
+        name: pool.size() + DB_MAX_OVERFLOW - pool.checkedout()
+        for name, pool in (("sync", engine.pool), ("async", get_async_engine().sync_engine.pool))
+    }
+    return {"ok": min(headroom.values()) >= READINESS_MIN_POOL_HEADROOM, "headroom": headroom}
+
+
+async def check_readiness() -> dict:
+    """返回 {"ready": bool, "checks": {...}, "age_seconds": float}；缓存期内直接复用上次结果。"""
+    global _cached
+    async with _lock:
+        now = time.monotonic()
+        if _cached is None or now - _cached[0] >= READINESS_CACHE_SECONDS:
+            # 先读连接池余量，避免把本次 SELECT 1 借出的连接算进去
+            pool = _check_pool()
+            database, jwks = await asyncio.gather(_check_database(), _check_jwks())
+            checks = {"database": database, "jwks": jwks, "pool": pool}
+            _cached = (time.monotonic(), checks)
+            if not all(check["ok"] for check in checks.values()):
+                logger.warning("not ready: %s", checks)
+        checked_at, checks = _cached
+    return {
+        "ready": all(check["ok"] for check in checks.values()),
+        "checks": checks,
+        "age_seconds": round(time.monotonic() - checked_at, 3),
+    }
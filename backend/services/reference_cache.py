@@ -0,0 +1,54 @@
+"""
+参考数据缓存：零件、供应商、仓库列表变更少而读取频繁，按 (资源, 筛选参数) 缓存序列化后的列表结果。
+
+- 写穿失效：对应的 create/update/delete（及批量导入）提交成功后按资源整体失效；
+- 代际计数：读取开始后若发生失效，本次结果不写回缓存，避免旧数据覆盖新数据；
+- 进程内缓存，多进程部署时其他进程依赖 TTL 收敛（REF_CACHE_TTL 即最大陈旧时间）。
+"""
+
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from dotenv import load_dotenv
+
+from services.cache import TTLCache
+
+load_dotenv()
+
+REF_CACHE_MAXSIZE = int(os.getenv("REF_CACHE_MAXSIZE", "512"))
+REF_CACHE_TTL = float(os.getenv("REF_CACHE_TTL", "60"))
+
+PARTS = "parts"
+SUPPLIERS = "suppliers"
+WAREHOUSES = "warehouses"
+
+reference_cache = TTLCache(maxsize=REF_CACHE_MAXSIZE, ttl=REF_CACHE_TTL)
+
+_generations: Dict[str, int] = {}
+_generations_lock = threading.Lock()
+
+
+def _generation(resource: str) -> int:
+    with _generations_lock:
+        return _generations.get(resource, 0)
+
+
+def invalidate(resource: str) -> None:
+    """失效某一资源的全部缓存条目（写操作提交后调用）。"""
+    with _generations_lock:
+        _generations[resource] = _generations.get(resource, 0) + 1
+    reference_cache.invalidate_where(lambda key, _: key[0] == resource)
+
+
+async def cached_list(resource: str, args: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """命中则直接返回缓存结果；未命中时调用 loader 读取并写入缓存（列表连同其内容版本一起缓存）。"""
+    key = (resource, args)
+    value = reference_cache.get(key)
+    if value is not None:
+        return value
+    generation = _generation(resource)
+    value = await loader()
+    if _generation(resource) == generation:
+        reference_cache.set(key, value)
+    return value
@@ -0,0 +1,73 @@
+"""
+站内搜索：按名称子串检索零件、供应商（名称/地址）与员工，合并排序后分页返回。
+
+候选行由 search_grams(字段) @> search_query_grams(关键词) 经 GIN 索引筛出（单字/双字切分，
+一两个汉字的关键词同样走索引），再以 strpos 复核子串；排序依次为：完全相等 > 前缀 > 包含、
+名称命中优先于地址、命中位置靠前、字段较短。每个分支只取前 offset + limit 行，避免对全部命中排序。
+"""
+
+from typing import List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+RESOURCES = ("parts", "suppliers", "staff")
+MAX_OFFSET = 1000
+
+# (resource, 表, 主键, 字段, 副标题列, 字段权重)
+_BRANCHES = (
+    ("parts", "part", "part_id", "name", "type", 0),
+    ("suppliers", "supplier", "supplier_id", "name", "address", 0),
+    ("suppliers", "supplier", "supplier_id", "address", "name", 1),
+    ("staff", "staff", "staff_id", "name", "warehouse_id", 0),
+)
+
+
+def _matches(field: str) -> str:
+    return f"search_grams({field}) @> search_query_grams(:q) AND strpos(lower({field}), lower(:q)) > 0"
+
+
+def _branch_sql(resource: str, table: str, key: str, field: str, subtitle: str, field_rank: int) -> str:
+    where = _matches(field)
+    if field_rank:
+        # 名称已命中的供应商只保留名称分支，避免重复
+        where += f" AND NOT ({_matches('name')})"
+    return f"""
+        (SELECT '{resource}' AS resource, {key} AS key, {field} AS matched_text, {subtitle} AS subtitle,
+                '{field}' AS field,
+                CASE WHEN lower({field}) = lower(:q) THEN 0
+                     WHEN starts_with(lower({field}), lower(:q)) THEN 1
+                     ELSE 2 END AS match_rank,
+                {field_rank} AS field_rank,
+                strpos(lower({field}), lower(:q)) AS position,
+                char_length({field}) AS length
+         FROM {table}
+         WHERE {where}
+         ORDER BY match_rank, position, length, key
+         LIMIT :window)"""
+
+
+def _search_sql(resources: Sequence[str]) -> str:
+    branches = [_branch_sql(*branch) for branch in _BRANCHES if branch[0] in resources]
+    return (
+        "SELECT * FROM ("
+        + " UNION ALL ".join(branches)
+        + ") hits ORDER BY match_rank, field_rank, position, length, resource, key LIMIT :limit OFFSET :offset"
+    )
+
+
+async def search_async(
+    db: AsyncSession,
+    q: str,
+    resources: Optional[Sequence[str]] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> List[dict]:
+    resources = [r for r in (resources or RESOURCES) if r in RESOURCES]
+    if not q or not resources:
+        return []
+    rows = await db.execute(
+        text(_search_sql(resources)),
+        {"q": q, "window": offset + limit, "limit": limit, "offset": offset},
+    )
+    return [dict(row._mapping) for row in rows]
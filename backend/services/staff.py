@@ -1,12 +1,18 @@
 """
 员工（staff）服务层：封装员工的增删改查，供路由调用。
+读接口（list/get）另提供基于 AsyncSession 的 *_async 版本，供异步路由使用；
+changed_since 返回 updated_at 不早于该水位的行（水位见 services.changes）。
 """
 
+from datetime import datetime
 from typing import List, Optional
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from schemas.staff import StaffCreate, StaffUpdate
+from services.changes import record_tombstone
 from src.db import models
 
 
@@ -21,6 +27,26 @@ def get_staff(db: Session, staff_id: str) -> Optional[models.Staff]:
     return db.query(models.Staff).filter(models.Staff.staff_id == staff_id).first()
 
 
+def _staff_criteria(warehouse_id: Optional[str] = None, changed_since: Optional[datetime] = None) -> list:
+    criteria = []
+    if warehouse_id:
+        criteria.append(models.Staff.warehouse_id == warehouse_id)
+    if changed_since:
+        criteria.append(models.Staff.updated_at >= changed_since)
+    return criteria
+
+
+async def list_staff_async(
+    db: AsyncSession, warehouse_id: Optional[str] = None, changed_since: Optional[datetime] = None
+) -> List[models.Staff]:
+    stmt = select(models.Staff).where(*_staff_criteria(warehouse_id, changed_since))
+    return list((await db.scalars(stmt)).all())
+
+
+async def get_staff_async(db: AsyncSession, staff_id: str) -> Optional[models.Staff]:
+    return await db.get(models.Staff, staff_id)
+
+
 def create_staff(db: Session, payload: StaffCreate) -> models.Staff:
     staff = models.Staff(**payload.dict())
     db.add(staff)
@@ -44,6 +70,7 @@ def delete_staff(db: Session, staff_id: str) -> bool:
     staff = get_staff(db, staff_id)
     if not staff:
         return False
+    record_tombstone(db, "staff", staff_id)
     db.delete(staff)
     db.commit()
     return True
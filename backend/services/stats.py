@@ -0,0 +1,135 @@
+"""
+统计服务：为看板一次性计算库存金额、采购支出与低库存数量。
+所有聚合在数据库内以 GROUP BY 完成，并用 json_agg 合并为单行结果，一次往返返回。
+默认读取增量维护的汇总表（services.summaries），live=True 时直接扫描 purchase / inventory 明细；
+汇总模式下的新鲜度（最近重建/增量更新时间）在同一条语句中读取。
+"""
+
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import JSON, DateTime, Integer, Numeric, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas.stats import DashboardStats
+from services.summaries import PURCHASE_SUMMARY, STOCK_SUMMARY
+
+DEFAULT_LOW_STOCK_THRESHOLD = 10
+
+_STOCK_LIVE = """
+        SELECT i.warehouse_id,
+               COUNT(*)                                  AS sku_count,
+               COALESCE(SUM(i.stock_quantity), 0)        AS total_quantity,
+               COALESCE(SUM(i.stock_quantity * p.unit_price), 0) AS stock_value,
+               COUNT(*) FILTER (WHERE i.stock_quantity < :threshold) AS low_stock_count
+        FROM inventory i
+        JOIN part p ON p.part_id = i.part_id
+        GROUP BY i.warehouse_id
+"""
+
+# 种数、数量与金额取自增量维护的汇总表；低库存数依赖阈值，逐仓库在
+# ix_inventory_warehouse_id_stock_quantity 上做范围计数，只读低于阈值的索引项
+_STOCK_SUMMARY = """
+        SELECT s.warehouse_id,
+               s.sku_count,
+               s.total_quantity,
+               s.stock_value,
+               (SELECT COUNT(*)
+                FROM inventory i
+                WHERE i.warehouse_id = s.warehouse_id
+                  AND i.stock_quantity < :threshold) AS low_stock_count
+        FROM warehouse_stock_summary s
+"""
+
+_PURCHASES_LIVE = """
+        SELECT pu.purchase_date, pu.supplier_id, pu.part_id,
+               1 AS purchase_count, pu.quantity, pu.quantity * pu.actual_price AS amount
+        FROM purchase pu
+        WHERE (CAST(:date_from AS date) IS NULL OR pu.purchase_date >= :date_from)
+          AND (CAST(:date_to AS date) IS NULL OR pu.purchase_date <= :date_to)
+"""
+
+_PURCHASES_SUMMARY = """
+        SELECT pu.purchase_date, pu.supplier_id, pu.part_id,
+               pu.purchase_count, pu.quantity, pu.spend AS amount
+        FROM purchase_daily_summary pu
+        WHERE (CAST(:date_from AS date) IS NULL OR pu.purchase_date >= :date_from)
+          AND (CAST(:date_to AS date) IS NULL OR pu.purchase_date <= :date_to)
+"""
+
+
+# 两张汇总表都重建过才给出重建时间；max(updated_at) 走 updated_at 索引（仓库汇总表每仓库一行）
+_FRESHNESS_SUMMARY = f"""
+        (SELECT min(rebuilt_at) FROM summary_rebuild
+         WHERE name IN ('{PURCHASE_SUMMARY}', '{STOCK_SUMMARY}') HAVING count(*) = 2) AS summary_rebuilt_at,
+        GREATEST((SELECT max(updated_at) FROM purchase_daily_summary),
+                 (SELECT max(updated_at) FROM warehouse_stock_summary)) AS summary_updated_at"""
+
+_FRESHNESS_LIVE = """
+        CAST(NULL AS timestamptz) AS summary_rebuilt_at,
+        CAST(NULL AS timestamptz) AS summary_updated_at"""
+
+
+def _dashboard_sql(stock_cte: str, purchases_cte: str, freshness: str):
+    return text(
+        f"""
+    WITH stock AS ({stock_cte}    ),
+    purchases AS ({purchases_cte}    ),
+    by_month AS (
+        SELECT to_char(date_trunc('month', purchase_date), 'YYYY-MM') AS month,
+               SUM(purchase_count) AS purchase_count, SUM(quantity) AS quantity, SUM(amount) AS spend
+        FROM purchases
+        GROUP BY 1
+    ),
+    by_supplier AS (
+        SELECT pu.supplier_id, s.name,
+               SUM(pu.purchase_count) AS purchase_count, SUM(pu.quantity) AS quantity, SUM(pu.amount) AS spend
+        FROM purchases pu
+        LEFT JOIN supplier s ON s.supplier_id = pu.supplier_id
+        GROUP BY pu.supplier_id, s.name
+    ),
+    by_part_type AS (
+        SELECT p.type,
+               SUM(pu.purchase_count) AS purchase_count, SUM(pu.quantity) AS quantity, SUM(pu.amount) AS spend
+        FROM purchases pu
+        JOIN part p ON p.part_id = pu.part_id
+        GROUP BY p.type
+    )
+    SELECT
+        (SELECT COALESCE(SUM(stock_value), 0) FROM stock)     AS total_stock_value,
+        (SELECT COALESCE(SUM(low_stock_count), 0) FROM stock) AS low_stock_count,
+        (SELECT COALESCE(json_agg(stock ORDER BY warehouse_id), '[]') FROM stock) AS warehouses,
+        (SELECT COALESCE(json_agg(by_month ORDER BY month), '[]') FROM by_month) AS spend_by_month,
+        (SELECT COALESCE(json_agg(by_supplier ORDER BY spend DESC), '[]') FROM by_supplier) AS spend_by_supplier,
+        (SELECT COALESCE(json_agg(by_part_type ORDER BY spend DESC), '[]') FROM by_part_type) AS spend_by_part_type,{freshness}
+    """
+    ).columns(
+        total_stock_value=Numeric,
+        low_stock_count=Integer,
+        warehouses=JSON,
+        spend_by_month=JSON,
+        spend_by_supplier=JSON,
+        spend_by_part_type=JSON,
+        summary_rebuilt_at=DateTime(timezone=True),
+        summary_updated_at=DateTime(timezone=True),
+    )
+
+
+_DASHBOARD_SQL = _dashboard_sql(_STOCK_LIVE, _PURCHASES_LIVE, _FRESHNESS_LIVE)
+_DASHBOARD_SUMMARY_SQL = _dashboard_sql(_STOCK_SUMMARY, _PURCHASES_SUMMARY, _FRESHNESS_SUMMARY)
+
+
+async def get_dashboard_stats_async(
+    db: AsyncSession,
+    low_stock_threshold: int = DEFAULT_LOW_STOCK_THRESHOLD,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    live: bool = False,
+) -> DashboardStats:
+    row = (
+        await db.execute(
+            _DASHBOARD_SQL if live else _DASHBOARD_SUMMARY_SQL,
+            {"threshold": low_stock_threshold, "date_from": date_from, "date_to": date_to},
+        )
+    ).mappings().one()
+    return DashboardStats(low_stock_threshold=low_stock_threshold, source="live" if live else "summary", **row)
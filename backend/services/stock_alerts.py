@@ -0,0 +1,155 @@
+"""
+低库存告警：按 (仓库, 零件) 的补货点 reorder_point 增量评估库存，生成 / 关闭 stock_alert。
+
+- evaluate_stock_alerts：只评估给定的键（不给则全量），在调用方事务内执行（不提交）。
+  库存不高于补货点且没有未关闭告警时插入一条 open 告警（部分唯一索引 + ON CONFLICT 去重，
+  多个 worker 同时评估同一键也只留一条）；库存回到补货点以上、取消监控或库存记录已删除时置为 resolved；
+- alert_loop：应用启动后订阅库存变更事件（services.inventory_events），把 STOCK_ALERTS_BATCH_SECONDS 内
+  被单行/批量调整、采购入库等写操作触及的键合并后评估一次，不定时扫全表；
+  启动、订阅队列溢出或库存整体重算（resync）时做一次全量评估，全量评估同样只走部分索引与未关闭告警。
+"""
+
+import asyncio
+import logging
+import os
+from typing import Iterable, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from services.inventory_events import bus as inventory_event_bus
+from src.db import models
+from src.db.database import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+STOCK_ALERTS_ENABLED = os.getenv("STOCK_ALERTS_ENABLED", "true").strip().lower() in ("1", "true", "yes", "on")
+STOCK_ALERTS_BATCH_SECONDS = float(os.getenv("STOCK_ALERTS_BATCH_SECONDS", "1"))
+STOCK_ALERTS_MAX_BATCH = int(os.getenv("STOCK_ALERTS_MAX_BATCH", "500"))
+
+RETRY_DELAY_SECONDS = 5.0
+
+_TOUCHED = "unnest(CAST(:warehouse_ids AS varchar[]), CAST(:part_ids AS varchar[])) AS touched (warehouse_id, part_id)"
+
+_RESOLVE_SQL = """
+    UPDATE stock_alert a SET status = 'resolved', resolved_at = now()
+    WHERE a.status = 'open' {touched}
+      AND NOT EXISTS (
+          SELECT 1 FROM inventory i
+          WHERE i.warehouse_id = a.warehouse_id AND i.part_id = a.part_id
+            AND i.stock_quantity <= i.reorder_point
+      )
+    RETURNING a.id, a.warehouse_id, a.part_id
+"""
+
+# 条件与部分索引 ix_inventory_below_reorder_point 的谓词一致，全量评估时只读低库存行
+_OPEN_SQL = """
+    INSERT INTO stock_alert (warehouse_id, part_id, stock_quantity, reorder_point, target_level, suggested_quantity)
+    SELECT i.warehouse_id, i.part_id, i.stock_quantity, i.reorder_point, i.target_level,
+           i.target_level - i.stock_quantity
+    FROM inventory i {touched}
+    WHERE i.stock_quantity <= i.reorder_point
+    ON CONFLICT (warehouse_id, part_id) WHERE status = 'open' DO NOTHING
+    RETURNING id, warehouse_id, part_id, stock_quantity, reorder_point, suggested_quantity
+"""
+
+
+def evaluate_stock_alerts(
+    db: Session, keys: Optional[Iterable[Tuple[str, str]]] = None
+) -> Tuple[List[dict], List[dict]]:
+    """评估 keys 中的 (warehouse_id, part_id)（None 为全量），返回 (新开告警, 已关闭告警)；不提交。"""
+    if keys is None:
+        params: dict = {}
+        resolve_filter = open_join = ""
+    else:
+        keys = sorted(set(keys))
+        if not keys:
+            return [], []
+        params = {"warehouse_ids": [w for w, _ in keys], "part_ids": [p for _, p in keys]}
+        resolve_filter = f"AND (a.warehouse_id, a.part_id) IN (SELECT warehouse_id, part_id FROM {_TOUCHED})"
+        open_join = f"JOIN {_TOUCHED} USING (warehouse_id, part_id)"
+    resolved = db.execute(text(_RESOLVE_SQL.format(touched=resolve_filter)), params)
+    resolved = [dict(row._mapping) for row in resolved]
+    opened = db.execute(text(_OPEN_SQL.format(touched=open_join)), params)
+    opened = [dict(row._mapping) for row in opened]
+    return opened, resolved
+
+
+async def list_alerts_async(
+    db: AsyncSession,
+    status: Optional[str] = "open",
+    warehouse_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+) -> List[models.StockAlert]:
+    stmt = select(models.StockAlert)
+    if status:
+        stmt = stmt.where(models.StockAlert.status == status)
+    if warehouse_id:
+        stmt = stmt.where(models.StockAlert.warehouse_id == warehouse_id)
+    if after is not None:
+        stmt = stmt.where(models.StockAlert.id > after)
+    stmt = stmt.order_by(models.StockAlert.id).limit(limit)
+    return list((await db.scalars(stmt)).all())
+
+
+def _evaluate(keys: Optional[Set[Tuple[str, str]]]) -> None:
+    db = SessionLocal()
+    try:
+        opened, resolved = evaluate_stock_alerts(db, keys)
+        db.commit()
+    finally:
+        db.close()
+    for alert in opened:
+        logger.warning(
+            "low stock: warehouse=%s part=%s stock=%s reorder_point=%s suggested=%s",
+            alert["warehouse_id"],
+            alert["part_id"],
+            alert["stock_quantity"],
+            alert["reorder_point"],
+            alert["suggested_quantity"],
+        )
+    if resolved:
+        logger.info("resolved %d stock alerts", len(resolved))
+
+
+async def _collect(subscriber) -> Optional[Set[Tuple[str, str]]]:
+    """等到第一条事件后再收集一个批次窗口内的事件，返回被触及的键；含 resync 时返回 None（全量）。"""
+    loop = asyncio.get_running_loop()
+    item = await subscriber.get()
+    deadline = loop.time() + STOCK_ALERTS_BATCH_SECONDS
+    keys: Set[Tuple[str, str]] = set()
+    full = False
+    while True:
+        if item["op"] == "resync":
+            full = True
+        else:
+            keys.add((item["warehouse_id"], item["part_id"]))
+        remaining = deadline - loop.time()
+        if remaining <= 0 or len(keys) >= STOCK_ALERTS_MAX_BATCH:
+            break
+        try:
+            item = await asyncio.wait_for(subscriber.get(), remaining)
+        except asyncio.TimeoutError:
+            break
+    return None if full else keys
+
+
+async def alert_loop() -> None:
+    while True:
+        try:
+            async with inventory_event_bus.subscribe(None) as subscriber:
+                # 先订阅再全量评估一次，补上进程未运行（或上次出错）期间的变更
+                await asyncio.to_thread(_evaluate, None)
+                while True:
+                    keys = await _collect(subscriber)
+                    await asyncio.to_thread(_evaluate, keys)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("stock alert evaluation failed")
+        await asyncio.sleep(RETRY_DELAY_SECONDS)
@@ -0,0 +1,215 @@
+"""
+汇总表服务：增量维护每日采购汇总（purchase_daily_summary）与仓库库存汇总（warehouse_stock_summary：数量、金额、零件种数）。
+
+增量函数只执行语句、不提交，由采购/库存/零件服务在各自事务内调用，保证与业务数据同时生效；
+rebuild_summaries 以集合语句整体重算，用于初始化或修复漂移。
+"""
+
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Integer, Numeric, String, column, delete, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from src.db import models
+
+PURCHASE_SUMMARY = "purchase_daily_summary"
+STOCK_SUMMARY = "warehouse_stock_summary"
+
+# (purchase_date, warehouse_id, supplier_id, part_id)
+PurchaseKey = Tuple[date, str, str, str]
+
+
+def purchase_delta(record: models.Purchase, sign: int = 1) -> Tuple[PurchaseKey, Tuple[int, int, Decimal]]:
+    """采购单对汇总的贡献：sign=1 计入，sign=-1 冲回。"""
+    key = (record.purchase_date, record.warehouse_id, record.supplier_id, record.part_id)
+    amount = Decimal(str(record.actual_price)) * record.quantity
+    return key, (sign, sign * record.quantity, sign * amount)
+
+
+def apply_purchase_deltas(db: Session, deltas: Iterable[Tuple[PurchaseKey, Tuple[int, int, Decimal]]]) -> None:
+    """按键合并后以一条多行 INSERT ... ON CONFLICT 累加到每日采购汇总（不提交）。"""
+    merged: Dict[PurchaseKey, list] = {}
+    for key, (count, quantity, amount) in deltas:
+        acc = merged.setdefault(key, [0, 0, Decimal(0)])
+        acc[0] += count
+        acc[1] += quantity
+        acc[2] += amount
+    rows = [
+        {
+            "purchase_date": k[0],
+            "warehouse_id": k[1],
+            "supplier_id": k[2],
+            "part_id": k[3],
+            "purchase_count": c,
+            "quantity": q,
+            "spend": a,
+        }
+        for k, (c, q, a) in merged.items()
+        if c or q or a
+    ]
+    if not rows:
+        return
+    table = models.PurchaseDailySummary
+    stmt = pg_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.purchase_date, table.warehouse_id, table.supplier_id, table.part_id],
+        set_={
+            "purchase_count": table.purchase_count + stmt.excluded.purchase_count,
+            "quantity": table.quantity + stmt.excluded.quantity,
+            "spend": table.spend + stmt.excluded.spend,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+
+def apply_stock_deltas(
+    db: Session,
+    deltas: Dict[Tuple[str, str], int],
+    sku_deltas: Optional[Dict[Tuple[str, str], int]] = None,
+) -> None:
+    """
+    库存数量变动计入仓库库存汇总（不提交）：按零件当前单价折算金额，
+    sku_deltas 为库存记录的增删（新建 +1、删除 -1），累加到零件种数 sku_count；
+    一条 INSERT ... SELECT ... FROM (VALUES ...) JOIN part GROUP BY ... ON CONFLICT 完成。
+    折算前按 part_id 顺序以 FOR SHARE 锁住涉及的零件：与改价的行锁冲突，
+    使库存变动与并发改价串行，任一方都能看到另一方已提交的结果，差价不会丢失。
+    """
+    sku_deltas = sku_deltas or {}
+    keys = [k for k in {**deltas, **sku_deltas} if deltas.get(k) or sku_deltas.get(k)]
+    if not keys:
+        return
+    db.execute(
+        select(models.Part.part_id)
+        .where(models.Part.part_id.in_(sorted({p for _, p in keys})))
+        .order_by(models.Part.part_id)
+        .with_for_update(read=True)
+    ).all()
+    movements = values(
+        column("warehouse_id", String),
+        column("part_id", String),
+        column("delta", Integer),
+        column("skus", Integer),
+        name="movements",
+    ).data([(w, p, deltas.get((w, p), 0), sku_deltas.get((w, p), 0)) for w, p in keys])
+    per_warehouse = (
+        select(
+            movements.c.warehouse_id,
+            func.sum(movements.c.delta),
+            func.sum(movements.c.delta * models.Part.unit_price),
+            func.sum(movements.c.skus),
+        )
+        .join_from(movements, models.Part, models.Part.part_id == movements.c.part_id)
+        .group_by(movements.c.warehouse_id)
+        # 按仓库顺序更新汇总行，跨仓库的并发事务加锁顺序一致
+        .order_by(movements.c.warehouse_id)
+    )
+    table = models.WarehouseStockSummary
+    stmt = pg_insert(table).from_select(["warehouse_id", "total_quantity", "stock_value", "sku_count"], per_warehouse)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.warehouse_id],
+        set_={
+            "total_quantity": table.total_quantity + stmt.excluded.total_quantity,
+            "stock_value": table.stock_value + stmt.excluded.stock_value,
+            "sku_count": table.sku_count + stmt.excluded.sku_count,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+
+
+def apply_price_change(db: Session, part_id: str, old_price, new_price) -> None:
+    """零件单价变化时，按各仓库该零件的库存量修正库存金额（不提交）。"""
+    apply_price_changes(db, [(part_id, old_price, new_price)])
+
+
+def apply_price_changes(db: Session, changes: Iterable[Tuple[str, Any, Any]]) -> None:
+    """
+    多个零件 (part_id, 原单价, 新单价) 的单价变化一次计入库存金额（不提交）：
+    一条 UPDATE ... FROM (按仓库汇总 Σ 库存量 × 差价)，供批量导入使用。
+    """
+    diffs = {part_id: Decimal(str(new)) - Decimal(str(old)) for part_id, old, new in changes}
+    diffs = {part_id: diff for part_id, diff in diffs.items() if diff}
+    if not diffs:
+        return
+    prices = values(
+        column("part_id", String),
+        column("diff", Numeric),
+        name="price_changes",
+    ).data(list(diffs.items()))
+    per_warehouse = (
+        select(
+            models.Inventory.warehouse_id.label("warehouse_id"),
+            func.sum(models.Inventory.stock_quantity * prices.c.diff).label("value_delta"),
+        )
+        .join_from(models.Inventory, prices, models.Inventory.part_id == prices.c.part_id)
+        .group_by(models.Inventory.warehouse_id)
+        .subquery()
+    )
+    table = models.WarehouseStockSummary
+    db.execute(
+        update(table)
+        .where(table.warehouse_id == per_warehouse.c.warehouse_id)
+        .values(stock_value=table.stock_value + per_warehouse.c.value_delta, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _mark_rebuilt(db: Session, name: str) -> None:
+    stmt = pg_insert(models.SummaryRebuild).values(name=name)
+    stmt = stmt.on_conflict_do_update(index_elements=[models.SummaryRebuild.name], set_={"rebuilt_at": func.now()})
+    db.execute(stmt)
+
+
+def rebuild_stock_summary(db: Session) -> None:
+    """整体重算仓库库存汇总（不提交）。"""
+    table = models.WarehouseStockSummary
+    db.execute(delete(table))
+    totals = (
+        select(
+            models.Inventory.warehouse_id,
+            func.sum(models.Inventory.stock_quantity),
+            func.sum(models.Inventory.stock_quantity * models.Part.unit_price),
+            func.count(),
+        )
+        .join(models.Part, models.Part.part_id == models.Inventory.part_id)
+        .group_by(models.Inventory.warehouse_id)
+    )
+    db.execute(
+        pg_insert(table).from_select(["warehouse_id", "total_quantity", "stock_value", "sku_count"], totals)
+    )
+    _mark_rebuilt(db, STOCK_SUMMARY)
+
+
+def rebuild_purchase_summary(db: Session) -> None:
+    """整体重算每日采购汇总（不提交）。"""
+    table = models.PurchaseDailySummary
+    db.execute(delete(table))
+    p = models.Purchase
+    totals = select(
+        p.purchase_date,
+        p.warehouse_id,
+        p.supplier_id,
+        p.part_id,
+        func.count(),
+        func.sum(p.quantity),
+        func.sum(p.quantity * p.actual_price),
+    ).group_by(p.purchase_date, p.warehouse_id, p.supplier_id, p.part_id)
+    db.execute(
+        pg_insert(table).from_select(
+            ["purchase_date", "warehouse_id", "supplier_id", "part_id", "purchase_count", "quantity", "spend"],
+            totals,
+        )
+    )
+    _mark_rebuilt(db, PURCHASE_SUMMARY)
+
+
+def rebuild_summaries(db: Session) -> None:
+    """整体重建全部汇总表并提交。"""
+    rebuild_purchase_summary(db)
+    rebuild_stock_summary(db)
+    db.commit()
+
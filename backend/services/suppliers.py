@@ -1,12 +1,21 @@
 """
 供应商（supplier）服务层：封装供应商的增删改查，供路由调用。
+读接口（list/get）另提供基于 AsyncSession 的 *_async 版本，供异步路由使用；
+列表返回按响应 schema 序列化好的 JSON 及其内容版本（services.versions），供条件请求生成 ETag；changed_since 返回 updated_at 不早于该水位的行（水位见 services.changes）。
+异步列表结果经 services.reference_cache 缓存，写操作提交后整体失效。
 """
 
+from datetime import datetime
 from typing import List, Optional
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from schemas.supplier import SupplierCreate, SupplierUpdate
+from schemas.supplier import SupplierCreate, SupplierOut, SupplierUpdate
+from services import reference_cache
+from services.changes import record_tombstone
+from services.versions import VersionedJSON, versioned_json
 from src.db import models
 
 
@@ -21,10 +30,37 @@ def get_supplier(db: Session, supplier_id: str) -> Optional[models.Supplier]:
     return db.query(models.Supplier).filter(models.Supplier.supplier_id == supplier_id).first()
 
 
+def _supplier_criteria(name: Optional[str] = None, changed_since: Optional[datetime] = None) -> list:
+    criteria = []
+    if name:
+        criteria.append(models.Supplier.name.ilike(f"%{name}%"))
+    if changed_since:
+        criteria.append(models.Supplier.updated_at >= changed_since)
+    return criteria
+
+
+async def list_suppliers_async(
+    db: AsyncSession, name: Optional[str] = None, changed_since: Optional[datetime] = None
+) -> VersionedJSON:
+    async def load() -> VersionedJSON:
+        stmt = select(models.Supplier).where(*_supplier_criteria(name, changed_since))
+        return versioned_json(SupplierOut, await db.scalars(stmt))
+
+    if changed_since:
+        # 增量查询的水位各不相同，不进缓存
+        return await load()
+    return await reference_cache.cached_list(reference_cache.SUPPLIERS, name, load)
+
+
+async def get_supplier_async(db: AsyncSession, supplier_id: str) -> Optional[models.Supplier]:
+    return await db.get(models.Supplier, supplier_id)
+
+
 def create_supplier(db: Session, payload: SupplierCreate) -> models.Supplier:
     supplier = models.Supplier(**payload.dict())
     db.add(supplier)
     db.commit()
+    reference_cache.invalidate(reference_cache.SUPPLIERS)
     db.refresh(supplier)
     return supplier
 
@@ -36,6 +72,7 @@ def update_supplier(db: Session, supplier_id: str, payload: SupplierUpdate) -> O
     for key, value in payload.dict(exclude_unset=True).items():
         setattr(supplier, key, value)
     db.commit()
+    reference_cache.invalidate(reference_cache.SUPPLIERS)
     db.refresh(supplier)
     return supplier
 
@@ -44,6 +81,8 @@ def delete_supplier(db: Session, supplier_id: str) -> bool:
     supplier = get_supplier(db, supplier_id)
     if not supplier:
         return False
+    record_tombstone(db, "suppliers", supplier_id)
     db.delete(supplier)
     db.commit()
+    reference_cache.invalidate(reference_cache.SUPPLIERS)
     return True
@@ -8,6 +8,7 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from schemas.user import UserUpdate
+from services.auth import invalidate_app_user, notify_app_user_changed
 from src.db import models
 
 ALLOWED_ROLES = {"admin", "warehouse_manager", "purchaser", "inventory_operator"}
@@ -32,6 +33,9 @@ def update_user(db: Session, user_id: str, payload: UserUpdate) -> Optional[mode
         raise ValueError("Invalid role")
     for key, value in payload.dict(exclude_unset=True).items():
         setattr(user, key, value)
+    # 角色/归属仓库可能已变更：通知其他 worker，并失效本进程的鉴权缓存
+    notify_app_user_changed(db, user.auth_user_id)
     db.commit()
     db.refresh(user)
+    invalidate_app_user(user.auth_user_id)
     return user
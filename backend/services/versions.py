@@ -0,0 +1,38 @@
+"""
+数据版本：把实际返回的行按响应 schema 序列化为 JSON，并以序列化结果的摘要作为内容版本，供条件请求（ETag）判断响应是否变化。
+
+摘要只取决于响应内容本身：与行数 / max(updated_at) 之类的聚合不同，不需要额外扫描匹配的全部行，
+也不受 updated_at 为事务开始时间（提交顺序与时间戳顺序不一致）的影响，内容变了摘要必然变化。
+序列化得到的字节即 200 响应体（api.conditional.conditional_json），每行只序列化一次。
+"""
+
+import hashlib
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Type
+
+from pydantic import BaseModel, TypeAdapter
+
+
+class VersionedJSON(NamedTuple):
+    body: bytes
+    version: str
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def _versioned(body: bytes) -> VersionedJSON:
+    return VersionedJSON(body, hashlib.blake2b(body, digest_size=16).hexdigest())
+
+
+def versioned_json(schema: Type[BaseModel], rows: Iterable) -> VersionedJSON:
+    """rows 为 ORM 对象或 schema 实例，按 schema 序列化为 JSON 数组（顺序敏感）。"""
+    adapter = _list_adapter(schema)
+    return _versioned(adapter.dump_json(adapter.validate_python(list(rows), from_attributes=True), by_alias=True))
+
+
+def versioned_json_one(schema: Type[BaseModel], row) -> VersionedJSON:
+    """单个对象（详情接口）按 schema 序列化为 JSON 对象。"""
+    return _versioned(schema.model_validate(row).model_dump_json(by_alias=True).encode())
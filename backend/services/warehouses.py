@@ -1,12 +1,21 @@
 """
 仓库（warehouse）服务层：封装仓库的增删改查，供路由调用。
+读接口（list/get）另提供基于 AsyncSession 的 *_async 版本，供异步路由使用；
+列表返回按响应 schema 序列化好的 JSON 及其内容版本（services.versions），供条件请求生成 ETag；changed_since 返回 updated_at 不早于该水位的行（水位见 services.changes）。
+异步列表结果经 services.reference_cache 缓存，写操作提交后整体失效。
 """
 
+from datetime import datetime
 from typing import List, Optional
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from schemas.warehouse import WarehouseCreate, WarehouseUpdate
+from schemas.warehouse import WarehouseCreate, WarehouseOut, WarehouseUpdate
+from services import reference_cache
+from services.changes import record_tombstone
+from services.versions import VersionedJSON, versioned_json
 from src.db import models
 
 
@@ -18,10 +27,32 @@ def get_warehouse(db: Session, warehouse_id: str) -> Optional[models.Warehouse]:
     return db.query(models.Warehouse).filter(models.Warehouse.warehouse_id == warehouse_id).first()
 
 
+def _warehouse_criteria(changed_since: Optional[datetime] = None) -> list:
+    return [models.Warehouse.updated_at >= changed_since] if changed_since else []
+
+
+async def list_warehouses_async(
+    db: AsyncSession, changed_since: Optional[datetime] = None
+) -> VersionedJSON:
+    async def load() -> VersionedJSON:
+        stmt = select(models.Warehouse).where(*_warehouse_criteria(changed_since))
+        return versioned_json(WarehouseOut, await db.scalars(stmt))
+
+    if changed_since:
+        # 增量查询的水位各不相同，不进缓存
+        return await load()
+    return await reference_cache.cached_list(reference_cache.WAREHOUSES, None, load)
+
+
+async def get_warehouse_async(db: AsyncSession, warehouse_id: str) -> Optional[models.Warehouse]:
+    return await db.get(models.Warehouse, warehouse_id)
+
+
 def create_warehouse(db: Session, payload: WarehouseCreate) -> models.Warehouse:
     warehouse = models.Warehouse(**payload.dict())
     db.add(warehouse)
     db.commit()
+    reference_cache.invalidate(reference_cache.WAREHOUSES)
     db.refresh(warehouse)
     return warehouse
 
@@ -33,6 +64,7 @@ def update_warehouse(db: Session, warehouse_id: str, payload: WarehouseUpdate) -
     for key, value in payload.dict(exclude_unset=True).items():
         setattr(warehouse, key, value)
     db.commit()
+    reference_cache.invalidate(reference_cache.WAREHOUSES)
     db.refresh(warehouse)
     return warehouse
 
@@ -41,6 +73,8 @@ def delete_warehouse(db: Session, warehouse_id: str) -> bool:
     warehouse = get_warehouse(db, warehouse_id)
     if not warehouse:
         return False
+    record_tombstone(db, "warehouses", warehouse_id)
     db.delete(warehouse)
     db.commit()
+    reference_cache.invalidate(reference_cache.WAREHOUSES)
     return True
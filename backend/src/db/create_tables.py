@@ -3,6 +3,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 from models import Base
 from database import test_connection
+from partitions import add_months, ensure_purchase_partitions
+from datetime import date
 from dotenv import load_dotenv
 import os
 
@@ -24,12 +26,22 @@ print("测试数据库连接...")
 if test_connection():
     print("数据库连接成功!")
 
+    from sqlalchemy import text
+
+    # 三元组（gin_trgm_ops）索引依赖 pg_trgm 扩展
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
     # 创建所有表
     print("\n创建数据库表...")
     Base.metadata.create_all(engine)
 
+    # purchase 为按月分区表，预建当月起的分区（之后由应用后台任务续建）
+    with engine.begin() as conn:
+        created = ensure_purchase_partitions(conn, date.today(), add_months(date.today(), 3))
+        print(f"创建 purchase 分区: {', '.join(created) or '无'}")
+
     # 验证表是否创建成功
-    from sqlalchemy import text
     with engine.connect() as conn:
         result = conn.execute(text("""
             SELECT table_name
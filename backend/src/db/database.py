@@ -1,6 +1,14 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, List
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -12,8 +20,155 @@ DATABASE_URL = os.getenv('DATABASE_URL')
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL 环境变量未设置")
 
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# 连接池配置（均可通过环境变量覆盖）
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))  # 等待空闲连接的秒数
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # 连接最长复用秒数，避免被服务端/代理回收后报错
+DB_POOL_PRE_PING = _env_bool('DB_POOL_PRE_PING', True)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '0'))  # 0 表示不限制
+# PgBouncer 事务池模式：不发送启动参数（statement_timeout 改为每个事务 SET LOCAL），不依赖会话级状态
+DB_PGBOUNCER = _env_bool('DB_PGBOUNCER', False)
+
+
+class PoolMetrics:
+    """连接池计数器：借出/归还/新建/失效次数、借出等待耗时与超时次数。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+pool_metrics = PoolMetrics()
+
+# 借出等待回调（参数为秒数），同步与异步引擎的每次借出都会调用，供请求级计量（api/instrumentation.py）累加
+_pool_wait_listeners: List[Callable[[float], None]] = []
+
+
+def add_pool_wait_listener(listener: Callable[[float], None]) -> None:
+    _pool_wait_listeners.append(listener)
+
+
+def _notify_pool_wait(seconds: float) -> None:
+    for listener in _pool_wait_listeners:
+        listener(seconds)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """在借出连接时计时（含排队等待与新建连接），用于观察连接池是否成为瓶颈。"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            pool_metrics.incr('timeouts')
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            pool_metrics.record_wait(elapsed)
+            _notify_pool_wait(elapsed)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """异步引擎的连接池：借出耗时只通知等待回调，不计入 pool_metrics（其只描述同步引擎）。"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            _notify_pool_wait(time.perf_counter() - started)
+
+
+connect_args = {}
+if DB_STATEMENT_TIMEOUT_MS and not DB_PGBOUNCER:
+    connect_args['options'] = f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'
+
 # 创建引擎
-engine = create_engine(DATABASE_URL)
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=connect_args,
+)
+
+
+@event.listens_for(engine, 'connect')
+def _on_connect(dbapi_connection, connection_record):
+    pool_metrics.incr('connects')
+
+
+@event.listens_for(engine, 'checkout')
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_metrics.incr('checkouts')
+
+
+@event.listens_for(engine, 'checkin')
+def _on_checkin(dbapi_connection, connection_record):
+    pool_metrics.incr('checkins')
+
+
+@event.listens_for(engine, 'invalidate')
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.incr('invalidations')
+
+
+def _set_local_statement_timeout(conn):
+    # 事务池模式下连接在事务间被复用，只能按事务设置超时
+    conn.exec_driver_sql(f'SET LOCAL statement_timeout = {DB_STATEMENT_TIMEOUT_MS}')
+
+
+if DB_STATEMENT_TIMEOUT_MS and DB_PGBOUNCER:
+    event.listen(engine, 'begin', _set_local_statement_timeout)
+
+
+def pool_stats() -> dict:
+    """连接池当前状态与累计计数，供监控/健康检查读取。"""
+    pool = engine.pool
+    return {
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'checked_in': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'max_overflow': DB_MAX_OVERFLOW,
+        'checkouts': pool_metrics.checkouts,
+        'checkins': pool_metrics.checkins,
+        'connects': pool_metrics.connects,
+        'invalidations': pool_metrics.invalidations,
+        'timeouts': pool_metrics.timeouts,
+        'wait_seconds_total': round(pool_metrics.wait_seconds_total, 6),
+        'wait_seconds_max': round(pool_metrics.wait_seconds_max, 6),
+    }
+
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -26,6 +181,52 @@ def get_db():
     finally:
         db.close()
 
+# 异步引擎（asyncpg），供高并发只读路由使用；首次使用时创建，与同步引擎共用连接池配置
+def _async_database_url():
+    url = make_url(DATABASE_URL)
+    query = dict(url.query)
+    # asyncpg 不识别 libpq 的 sslmode，改用等价的 ssl 参数
+    sslmode = query.pop('sslmode', None)
+    if sslmode:
+        query['ssl'] = sslmode
+    if DB_PGBOUNCER:
+        # 事务池模式下不能复用服务端预编译语句
+        query['prepared_statement_cache_size'] = '0'
+    return url.set(drivername='postgresql+asyncpg', query=query)
+
+
+@lru_cache()
+def get_async_engine():
+    async_connect_args = {}
+    if DB_PGBOUNCER:
+        async_connect_args['statement_cache_size'] = 0
+    elif DB_STATEMENT_TIMEOUT_MS:
+        async_connect_args['server_settings'] = {'statement_timeout': str(DB_STATEMENT_TIMEOUT_MS)}
+    async_engine = create_async_engine(
+        _async_database_url(),
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=async_connect_args,
+    )
+    if DB_STATEMENT_TIMEOUT_MS and DB_PGBOUNCER:
+        event.listen(async_engine.sync_engine, 'begin', _set_local_statement_timeout)
+    return async_engine
+
+
+@lru_cache()
+def get_async_sessionmaker():
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+# 获取异步数据库会话
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
 # 测试连接
 def test_connection():
     """测试数据库连接是否成功"""
@@ -0,0 +1,19 @@
+-- DDL for incremental change feed (changed_since) based on backend/src/db/models.py
+-- updated_at 索引支撑 "updated_at > 水位" 的增量查询；deleted_record 保存删除墓碑。
+-- 大表上建议逐条在事务外执行 CREATE INDEX CONCURRENTLY，避免长时间锁表。
+
+CREATE INDEX IF NOT EXISTS ix_part_updated_at ON part (updated_at);
+CREATE INDEX IF NOT EXISTS ix_supplier_updated_at ON supplier (updated_at);
+CREATE INDEX IF NOT EXISTS ix_warehouse_updated_at ON warehouse (updated_at);
+CREATE INDEX IF NOT EXISTS ix_staff_updated_at ON staff (updated_at);
+CREATE INDEX IF NOT EXISTS ix_inventory_updated_at ON inventory (updated_at);
+CREATE INDEX IF NOT EXISTS ix_purchase_updated_at ON purchase (updated_at);
+
+-- 删除墓碑：resource 为资源名（parts/suppliers/warehouses/staff/inventory/purchases）
+CREATE TABLE IF NOT EXISTS deleted_record (
+    id BIGSERIAL PRIMARY KEY,
+    resource VARCHAR(30) NOT NULL,
+    record_key VARCHAR(100) NOT NULL,
+    deleted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS ix_deleted_record_resource_deleted_at ON deleted_record (resource, deleted_at);
@@ -0,0 +1,41 @@
+-- DDL for secondary indexes on list filter columns based on backend/src/db/models.py
+-- 每条 CREATE INDEX CONCURRENTLY 须单独执行且不能包在事务中（不阻塞读写）；
+-- 若中途失败会留下 INVALID 索引，先 DROP INDEX CONCURRENTLY 再重建。
+
+-- 三元组索引依赖 pg_trgm（Supabase 已内置，需启用）
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- purchase：按仓库/供应商/零件过滤，常叠加 purchase_date 范围
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_purchase_warehouse_id_purchase_date ON purchase (warehouse_id, purchase_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_purchase_supplier_id_purchase_date ON purchase (supplier_id, purchase_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_purchase_part_id_purchase_date ON purchase (part_id, purchase_date);
+
+-- inventory：主键 (warehouse_id, part_id) 无法服务仅按 part_id 的查询
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_inventory_part_id ON inventory (part_id);
+-- inventory：看板按阈值统计各仓库低库存数（stock_quantity < 阈值）
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_inventory_warehouse_id_stock_quantity ON inventory (warehouse_id, stock_quantity);
+
+-- staff / part
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_staff_warehouse_id ON staff (warehouse_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_part_type ON part (type);
+
+-- supplier.name / app_user.email 的 ILIKE '%...%' 模糊查询
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_supplier_name_trgm ON supplier USING gin (name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_app_user_email_trgm ON app_user USING gin (email gin_trgm_ops);
+
+-- app_user
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_app_user_role ON app_user (role);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_app_user_warehouse_id ON app_user (warehouse_id);
+
+-- 回滚：
+-- DROP INDEX CONCURRENTLY IF EXISTS ix_purchase_warehouse_id_purchase_date;
+-- DROP INDEX CONCURRENTLY IF EXISTS ix_purchase_supplier_id_purchase_date;
+-- DROP INDEX CONCURRENTLY IF EXISTS ix_purchase_part_id_purchase_date;
+-- DROP INDEX CONCURRENTLY IF EXISTS ix_inventory_part_id;
+-- DROP INDEX CONCURRENTLY IF EXISTS ix_inventory_warehouse_id_stock_quantity;
+-- DROP INDEX CONCURRENTLY IF EXISTS ix_staff_warehouse_id;
+-- DROP INDEX CONCURRENTLY IF EXISTS ix_part_type;
+-- DROP INDEX CONCURRENTLY IF EXISTS ix_supplier_name_trgm;
+-- DROP INDEX CONCURRENTLY IF EXISTS ix_app_user_email_trgm;
+-- DROP INDEX CONCURRENTLY IF EXISTS ix_app_user_role;
+-- DROP INDEX CONCURRENTLY IF EXISTS ix_app_user_warehouse_id;
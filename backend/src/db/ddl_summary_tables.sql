@@ -0,0 +1,32 @@
+-- DDL for pre-aggregated summary tables based on backend/src/db/models.py
+-- 汇总表为派生数据：由服务层在写采购/库存时增量维护，可随时通过 rebuild_summaries 整体重建。
+
+-- 每日采购汇总：按 (日期, 仓库, 供应商, 零件) 累计单数、数量、金额
+CREATE TABLE IF NOT EXISTS purchase_daily_summary (
+    purchase_date DATE NOT NULL,
+    warehouse_id VARCHAR(20) NOT NULL,
+    supplier_id VARCHAR(20) NOT NULL,
+    part_id VARCHAR(20) NOT NULL,
+    purchase_count INTEGER NOT NULL DEFAULT 0,
+    quantity BIGINT NOT NULL DEFAULT 0,
+    spend DECIMAL(16, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (purchase_date, warehouse_id, supplier_id, part_id)
+);
+-- 看板读取 max(updated_at) 作为汇总新鲜度
+CREATE INDEX IF NOT EXISTS ix_purchase_daily_summary_updated_at ON purchase_daily_summary (updated_at);
+
+-- 仓库库存汇总：Σ stock_quantity、Σ stock_quantity × part.unit_price 与库存记录数（零件种数）
+CREATE TABLE IF NOT EXISTS warehouse_stock_summary (
+    warehouse_id VARCHAR(20) PRIMARY KEY,
+    total_quantity BIGINT NOT NULL DEFAULT 0,
+    stock_value DECIMAL(16, 2) NOT NULL DEFAULT 0,
+    sku_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- 汇总表最近一次整体重建时间
+CREATE TABLE IF NOT EXISTS summary_rebuild (
+    name VARCHAR(50) PRIMARY KEY,
+    rebuilt_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
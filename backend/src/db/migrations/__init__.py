@@ -0,0 +1,19 @@
+"""
+数据库迁移：versions/ 下每个模块是一个迁移，按文件名编号顺序执行，定义 upgrade(op)，可选 downgrade(op)
+（未定义则不可回滚）。模块 docstring 首行作为迁移说明。op 为 ops.Operations。
+
+大表（purchase、inventory 等）上的变更须使用不锁表的写法，例如新增带校验的非空列：
+
+    def upgrade(op):
+        op.execute("ALTER TABLE purchase ADD COLUMN IF NOT EXISTS currency CHAR(3)")  # 可空列，仅改元数据
+        op.backfill("purchase", "purchase_id", "currency = 'CNY'", where="currency IS NULL")
+        op.add_constraint_not_valid("purchase", "check_currency_not_null", "CHECK (currency IS NOT NULL)")
+        op.validate_constraint("purchase", "check_currency_not_null")
+        op.create_index("ix_purchase_currency", "purchase", ["currency"])
+
+用法（在 backend 目录下）：
+    python -m src.db.migrations status
+    python -m src.db.migrations upgrade [--to 0004]
+    python -m src.db.migrations downgrade --to 0003
+    python -m src.db.migrations stamp [--to head]   # 已有库接入时只记录版本
+"""
@@ -0,0 +1,36 @@
+import argparse
+import sys
+
+from src.db.migrations import runner
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.db.migrations", description="数据库迁移")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="列出迁移及执行状态")
+    up = sub.add_parser("upgrade", help="执行未执行的迁移")
+    up.add_argument("--to", default="head", help="目标版本（编号或完整名），默认 head")
+    down = sub.add_parser("downgrade", help="回滚到目标版本（不含）之后的迁移")
+    down.add_argument("--to", required=True, help="目标版本，base 表示全部回滚")
+    st = sub.add_parser("stamp", help="只记录版本，不执行")
+    st.add_argument("--to", default="head")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        for revision, description, applied_at in runner.status():
+            state = applied_at.isoformat(timespec="seconds") if applied_at else "pending"
+            print(f"{revision:40} {state:26} {description}")
+    elif args.command == "upgrade":
+        done = runner.upgrade(args.to)
+        print(f"已执行 {len(done)} 个迁移")
+    elif args.command == "downgrade":
+        done = runner.downgrade(args.to)
+        print(f"已回滚 {len(done)} 个迁移")
+    else:
+        done = runner.stamp(args.to)
+        print(f"已记录 {len(done)} 个版本：{', '.join(done) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+迁移操作：供各迁移的 upgrade(op) / downgrade(op) 调用，封装大表上不锁表的变更写法。
+
+- execute：普通 DDL/DML，单独事务执行，SET LOCAL lock_timeout 限制排队等锁的时间，
+  超时后重试，避免 ALTER TABLE 排在长事务之后时把后续所有读写一起堵住；
+- create_index / drop_index：CREATE/DROP INDEX CONCURRENTLY，不阻塞读写，须在事务外执行；
+- add_constraint_not_valid + validate_constraint：先以 NOT VALID 添加约束（只校验新写入，瞬时完成），
+  再单独 VALIDATE CONSTRAINT 校验存量数据（仅持 SHARE UPDATE EXCLUSIVE 锁，不阻塞读写）；
+- backfill：按主键分批 UPDATE，每批单独提交，避免长事务与大量行锁。
+
+连接处于 autocommit 模式，事务由 transaction() 显式 BEGIN/COMMIT；所有操作都应可重复执行。
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Sequence, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+T = TypeVar("T")
+
+# Postgres 错误码：lock_timeout 触发
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+class Operations:
+    def __init__(self, conn: Connection, lock_timeout_ms: int, lock_retries: int):
+        self.conn = conn
+        self.lock_timeout_ms = lock_timeout_ms
+        self.lock_retries = lock_retries
+
+    @contextmanager
+    def transaction(self) -> Iterator[Connection]:
+        self.conn.execute(text("BEGIN"))
+        try:
+            self.conn.execute(text(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}"))
+            yield self.conn
+        except BaseException:
+            self.conn.execute(text("ROLLBACK"))
+            raise
+        self.conn.execute(text("COMMIT"))
+
+    def _retry_on_lock_timeout(self, fn: Callable[[], T]) -> T:
+        for attempt in range(1, self.lock_retries + 1):
+            try:
+                return fn()
+            except OperationalError as exc:
+                if getattr(exc.orig, "pgcode", None) != LOCK_NOT_AVAILABLE or attempt == self.lock_retries:
+                    raise
+                print(f"  等锁超时，第 {attempt} 次重试")
+                time.sleep(min(attempt, 5))
+        raise AssertionError("unreachable")
+
+    def execute(self, *statements: str) -> None:
+        """在同一事务中执行多条语句（等锁超时自动重试整个事务）。"""
+
+        def run():
+            with self.transaction() as conn:
+                for statement in statements:
+                    conn.execute(text(statement))
+
+        self._retry_on_lock_timeout(run)
+
+    def scalar(self, sql: str, params: Optional[dict] = None):
+        return self.conn.execute(text(sql), params or {}).scalar()
+
+    # ---- 索引 ----
+
+    def create_index(
+        self,
+        name: str,
+        table: str,
+        columns: Sequence[str],
+        using: Optional[str] = None,
+        unique: bool = False,
+        where: Optional[str] = None,
+    ) -> None:
+        """CREATE INDEX CONCURRENTLY；上次中断留下的 INVALID 索引会先删除再重建。"""
+        valid = self.scalar(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND c.relnamespace = current_schema()::regnamespace",
+            {"name": name},
+        )
+        if valid is False:
+            print(f"  删除未完成的索引 {name}")
+            self.drop_index(name)
+        sql = f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table}"
+        if using:
+            sql += f" USING {using}"
+        sql += f" ({', '.join(columns)})"
+        if where:
+            sql += f" WHERE {where}"
+        self.conn.execute(text(sql))
+
+    def drop_index(self, name: str) -> None:
+        self.conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+    # ---- 约束 ----
+
+    def constraint_exists(self, table: str, name: str) -> bool:
+        return bool(
+            self.scalar(
+                "SELECT 1 FROM pg_constraint WHERE conrelid = CAST(:table AS regclass) AND conname = :name",
+                {"table": table, "name": name},
+            )
+        )
+
+    def add_constraint_not_valid(self, table: str, name: str, definition: str) -> None:
+        """如 definition="CHECK (quantity > 0)" 或 "FOREIGN KEY (part_id) REFERENCES part (part_id)"。"""
+        if self.constraint_exists(table, name):
+            return
+        self.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition} NOT VALID")
+
+    def validate_constraint(self, table: str, name: str) -> None:
+        self.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+    def drop_constraint(self, table: str, name: str) -> None:
+        self.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}")
+
+    # ---- 回填 ----
+
+    def backfill(
+        self,
+        table: str,
+        key: str,
+        assignments: str,
+        where: str = "TRUE",
+        batch_size: int = 5000,
+        pause_seconds: float = 0.1,
+    ) -> int:
+        """
+        按单列主键 key 顺序分批执行 UPDATE table SET assignments WHERE where，每批单独提交，返回更新行数。
+        where 应排除已回填的行（如 "new_col IS NULL"），使中断后重跑只处理剩余部分。
+        """
+        total = 0
+        after = None
+        while True:
+            keyset = f"WHERE {key} > :after " if after is not None else ""
+            upto = self.scalar(
+                f"SELECT max({key}) FROM (SELECT {key} FROM {table} {keyset}ORDER BY {key} LIMIT :limit) batch",
+                {"after": after, "limit": batch_size},
+            )
+            if upto is None:
+                break
+
+            def run():
+                with self.transaction() as conn:
+                    lower = f"{key} > :after AND " if after is not None else ""
+                    result = conn.execute(
+                        text(f"UPDATE {table} SET {assignments} WHERE {lower}{key} <= :upto AND ({where})"),
+                        {"after": after, "upto": upto},
+                    )
+                    return result.rowcount
+
+            total += self._retry_on_lock_timeout(run)
+            print(f"  {table}: 已回填 {total} 行（至 {key} = {upto}）")
+            after = upto
+            if pause_seconds:
+                time.sleep(pause_seconds)
+        return total
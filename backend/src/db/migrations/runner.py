@@ -0,0 +1,162 @@
+"""
+迁移执行器：按文件名顺序加载 versions/ 下的迁移，已执行版本记录在 schema_migration 表中。
+
+- 使用独立的 autocommit 连接（CREATE INDEX CONCURRENTLY 不能在事务中执行），并关闭 statement_timeout；
+- 经 PgBouncer 事务池时须用 MIGRATION_DATABASE_URL 指定直连地址（依赖会话级 advisory lock）；
+- 以 advisory lock 保证同一时间只有一个迁移进程在运行；
+- 每个迁移完成后才写入版本记录，中途失败可直接重跑（迁移须可重复执行）。
+"""
+
+import importlib
+import os
+import pkgutil
+import time
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.pool import NullPool
+
+from src.db.migrations import versions
+from src.db.migrations.ops import Operations
+
+load_dotenv()
+
+MIGRATION_DATABASE_URL = os.getenv("MIGRATION_DATABASE_URL") or os.getenv("DATABASE_URL")
+MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_MS", "3000"))
+MIGRATION_LOCK_RETRIES = int(os.getenv("MIGRATION_LOCK_RETRIES", "20"))
+
+VERSION_TABLE = "schema_migration"
+# pg_advisory_lock 的键，任意固定值
+ADVISORY_LOCK_KEY = 7_291_034
+
+
+@dataclass
+class Migration:
+    revision: str  # 模块名，如 0001_baseline
+    description: str
+    module: ModuleType
+
+    @property
+    def reversible(self) -> bool:
+        return hasattr(self.module, "downgrade")
+
+
+def load_migrations() -> List[Migration]:
+    migrations = []
+    seen: Dict[str, str] = {}
+    for info in sorted(pkgutil.iter_modules(versions.__path__), key=lambda m: m.name):
+        prefix = info.name.split("_", 1)[0]
+        if prefix in seen:
+            raise RuntimeError(f"迁移编号重复：{seen[prefix]} 与 {info.name}")
+        seen[prefix] = info.name
+        module = importlib.import_module(f"{versions.__name__}.{info.name}")
+        description = (module.__doc__ or "").strip().splitlines()[0] if module.__doc__ else ""
+        migrations.append(Migration(info.name, description, module))
+    return migrations
+
+
+def _resolve(migrations: List[Migration], target: Optional[str]) -> int:
+    """目标版本 -> 其后一个位置的下标；head 为全部，base 为 0；支持只写编号前缀。"""
+    if target in (None, "head"):
+        return len(migrations)
+    if target == "base":
+        return 0
+    for index, migration in enumerate(migrations):
+        if migration.revision == target or migration.revision.split("_", 1)[0] == target:
+            return index + 1
+    raise ValueError(f"未知的迁移版本：{target}")
+
+
+def _connect() -> Connection:
+    if not MIGRATION_DATABASE_URL:
+        raise ValueError("DATABASE_URL 环境变量未设置")
+    engine = create_engine(MIGRATION_DATABASE_URL, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+    conn = engine.connect()
+    conn.execute(text("SET statement_timeout = 0"))
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+        "version VARCHAR(100) PRIMARY KEY, "
+        "applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW())"
+    ))
+    return conn
+
+
+def _applied(conn: Connection) -> Dict[str, object]:
+    rows = conn.execute(text(f"SELECT version, applied_at FROM {VERSION_TABLE}"))
+    return {row.version: row.applied_at for row in rows}
+
+
+class _Locked:
+    def __init__(self, conn: Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        if not self.conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}).scalar():
+            raise RuntimeError("已有其他迁移进程在运行")
+        return self.conn
+
+    def __exit__(self, *exc):
+        self.conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+
+
+def status() -> List[tuple]:
+    """[(revision, description, applied_at 或 None)]"""
+    migrations = load_migrations()
+    with _connect() as conn:
+        applied = _applied(conn)
+    return [(m.revision, m.description, applied.get(m.revision)) for m in migrations]
+
+
+def upgrade(target: Optional[str] = None) -> List[str]:
+    migrations = load_migrations()
+    stop = _resolve(migrations, target)
+    done = []
+    with _connect() as conn, _Locked(conn):
+        applied = _applied(conn)
+        op = Operations(conn, MIGRATION_LOCK_TIMEOUT_MS, MIGRATION_LOCK_RETRIES)
+        for migration in migrations[:stop]:
+            if migration.revision in applied:
+                continue
+            print(f"upgrade {migration.revision}: {migration.description}")
+            started = time.perf_counter()
+            migration.module.upgrade(op)
+            conn.execute(text(f"INSERT INTO {VERSION_TABLE} (version) VALUES (:v)"), {"v": migration.revision})
+            print(f"  完成，耗时 {time.perf_counter() - started:.1f}s")
+            done.append(migration.revision)
+    return done
+
+
+def downgrade(target: str) -> List[str]:
+    """回滚 target 之后的全部已执行迁移（target=base 回滚全部）。"""
+    migrations = load_migrations()
+    keep = _resolve(migrations, target)
+    done = []
+    with _connect() as conn, _Locked(conn):
+        applied = _applied(conn)
+        op = Operations(conn, MIGRATION_LOCK_TIMEOUT_MS, MIGRATION_LOCK_RETRIES)
+        for migration in reversed(migrations[keep:]):
+            if migration.revision not in applied:
+                continue
+            if not migration.reversible:
+                raise RuntimeError(f"{migration.revision} 不可回滚")
+            print(f"downgrade {migration.revision}: {migration.description}")
+            migration.module.downgrade(op)
+            conn.execute(text(f"DELETE FROM {VERSION_TABLE} WHERE version = :v"), {"v": migration.revision})
+            done.append(migration.revision)
+    return done
+
+
+def stamp(target: Optional[str] = None) -> List[str]:
+    """只记录版本不执行：已由 create_all 或 ddl_*.sql 建好的库接入迁移时使用。"""
+    migrations = load_migrations()
+    stop = _resolve(migrations, target)
+    with _connect() as conn, _Locked(conn):
+        applied = _applied(conn)
+        pending = [m.revision for m in migrations[:stop] if m.revision not in applied]
+        for revision in pending:
+            conn.execute(text(f"INSERT INTO {VERSION_TABLE} (version) VALUES (:v)"), {"v": revision})
+    return pending
@@ -0,0 +1,106 @@
+"""基线：核心业务表、updated_at 触发器（对应 ddl_add_timestamps.sql）。"""
+
+TABLES = ("app_user", "part", "supplier", "warehouse", "staff", "inventory", "purchase")
+
+
+def upgrade(op):
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS warehouse (
+            warehouse_id VARCHAR(20) PRIMARY KEY,
+            address VARCHAR(200) NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            updated_at TIMESTAMPTZ DEFAULT NOW()
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS part (
+            part_id VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            unit_price DECIMAL(10, 2) NOT NULL,
+            type VARCHAR(50) NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            updated_at TIMESTAMPTZ DEFAULT NOW(),
+            CONSTRAINT check_unit_price_positive CHECK (unit_price >= 0)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS supplier (
+            supplier_id VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            address VARCHAR(200),
+            phone VARCHAR(20),
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            updated_at TIMESTAMPTZ DEFAULT NOW()
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS staff (
+            staff_id VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(50) NOT NULL,
+            gender CHAR(1),
+            hire_date DATE NOT NULL,
+            title VARCHAR(50),
+            warehouse_id VARCHAR(20) NOT NULL REFERENCES warehouse (warehouse_id),
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            updated_at TIMESTAMPTZ DEFAULT NOW(),
+            CONSTRAINT check_gender CHECK (gender IN ('M', 'F'))
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS inventory (
+            warehouse_id VARCHAR(20) REFERENCES warehouse (warehouse_id),
+            part_id VARCHAR(20) REFERENCES part (part_id),
+            stock_quantity INTEGER NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            updated_at TIMESTAMPTZ DEFAULT NOW(),
+            PRIMARY KEY (warehouse_id, part_id),
+            CONSTRAINT check_stock_non_negative CHECK (stock_quantity >= 0)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS purchase (
+            purchase_id VARCHAR(30) PRIMARY KEY,
+            part_id VARCHAR(20) NOT NULL REFERENCES part (part_id),
+            supplier_id VARCHAR(20) NOT NULL REFERENCES supplier (supplier_id),
+            warehouse_id VARCHAR(20) NOT NULL REFERENCES warehouse (warehouse_id),
+            purchase_date DATE NOT NULL,
+            quantity INTEGER NOT NULL,
+            actual_price DECIMAL(10, 2) NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            updated_at TIMESTAMPTZ DEFAULT NOW(),
+            CONSTRAINT check_quantity_positive CHECK (quantity > 0),
+            CONSTRAINT check_price_positive CHECK (actual_price > 0)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS app_user (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            auth_user_id UUID NOT NULL UNIQUE,
+            email VARCHAR(255) NOT NULL,
+            display_name VARCHAR(100),
+            role VARCHAR(30) NOT NULL,
+            warehouse_id VARCHAR(20),
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            updated_at TIMESTAMPTZ DEFAULT NOW(),
+            CONSTRAINT check_app_user_role CHECK (role IN ('admin','warehouse_manager','purchaser','inventory_operator')),
+            CONSTRAINT fk_app_user_warehouse FOREIGN KEY (warehouse_id) REFERENCES warehouse(warehouse_id)
+        )
+        """,
+        """
+        CREATE OR REPLACE FUNCTION set_updated_at()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at = NOW();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+    )
+    # 每张表单独一个事务，缩短持有 ACCESS EXCLUSIVE 锁的时间
+    for table in TABLES:
+        op.execute(
+            f"DROP TRIGGER IF EXISTS trg_{table}_set_updated_at ON {table}",
+            f"CREATE TRIGGER trg_{table}_set_updated_at BEFORE UPDATE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION set_updated_at()",
+        )
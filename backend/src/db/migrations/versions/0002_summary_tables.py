@@ -0,0 +1,41 @@
+"""看板汇总表（对应 ddl_summary_tables.sql）；执行后调用 POST /factory/stats/rebuild 填充历史数据。"""
+
+
+def upgrade(op):
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS purchase_daily_summary (
+            purchase_date DATE NOT NULL,
+            warehouse_id VARCHAR(20) NOT NULL,
+            supplier_id VARCHAR(20) NOT NULL,
+            part_id VARCHAR(20) NOT NULL,
+            purchase_count INTEGER NOT NULL DEFAULT 0,
+            quantity BIGINT NOT NULL DEFAULT 0,
+            spend DECIMAL(16, 2) NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ DEFAULT NOW(),
+            PRIMARY KEY (purchase_date, warehouse_id, supplier_id, part_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS warehouse_stock_summary (
+            warehouse_id VARCHAR(20) PRIMARY KEY,
+            total_quantity BIGINT NOT NULL DEFAULT 0,
+            stock_value DECIMAL(16, 2) NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ DEFAULT NOW()
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS summary_rebuild (
+            name VARCHAR(50) PRIMARY KEY,
+            rebuilt_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+        """,
+    )
+
+
+def downgrade(op):
+    op.execute(
+        "DROP TABLE IF EXISTS summary_rebuild",
+        "DROP TABLE IF EXISTS warehouse_stock_summary",
+        "DROP TABLE IF EXISTS purchase_daily_summary",
+    )
@@ -0,0 +1,25 @@
+"""增量同步：updated_at 索引与删除墓碑表（对应 ddl_change_feed.sql）。"""
+
+TABLES = ("part", "supplier", "warehouse", "staff", "inventory", "purchase")
+
+
+def upgrade(op):
+    for table in TABLES:
+        op.create_index(f"ix_{table}_updated_at", table, ["updated_at"])
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS deleted_record (
+            id BIGSERIAL PRIMARY KEY,
+            resource VARCHAR(30) NOT NULL,
+            record_key VARCHAR(100) NOT NULL,
+            deleted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_deleted_record_resource_deleted_at ON deleted_record (resource, deleted_at)",
+    )
+
+
+def downgrade(op):
+    op.execute("DROP TABLE IF EXISTS deleted_record")
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_updated_at")
@@ -0,0 +1,26 @@
+"""列表过滤列的二级索引（对应 ddl_secondary_indexes.sql）。"""
+
+# (索引名, 表, 列, 索引方法)
+INDEXES = (
+    ("ix_purchase_warehouse_id_purchase_date", "purchase", ["warehouse_id", "purchase_date"], None),
+    ("ix_purchase_supplier_id_purchase_date", "purchase", ["supplier_id", "purchase_date"], None),
+    ("ix_purchase_part_id_purchase_date", "purchase", ["part_id", "purchase_date"], None),
+    ("ix_inventory_part_id", "inventory", ["part_id"], None),
+    ("ix_staff_warehouse_id", "staff", ["warehouse_id"], None),
+    ("ix_part_type", "part", ["type"], None),
+    ("ix_supplier_name_trgm", "supplier", ["name gin_trgm_ops"], "gin"),
+    ("ix_app_user_email_trgm", "app_user", ["email gin_trgm_ops"], "gin"),
+    ("ix_app_user_role", "app_user", ["role"], None),
+    ("ix_app_user_warehouse_id", "app_user", ["warehouse_id"], None),
+)
+
+
+def upgrade(op):
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, columns, using in INDEXES:
+        op.create_index(name, table, columns, using=using)
+
+
+def downgrade(op):
+    for name, _, _, _ in reversed(INDEXES):
+        op.drop_index(name)
@@ -0,0 +1,89 @@
+"""purchase 改为按月范围分区：存量数据整体挂为 purchase_legacy 分区，不重写数据。"""
+
+import re
+from datetime import date
+
+# 现有 purchase 上的二级索引：切换时改名为 *_legacy 后随分区挂到分区表的同名索引下
+INDEXES = (
+    ("ix_purchase_updated_at", "updated_at"),
+    ("ix_purchase_warehouse_id_purchase_date", "warehouse_id, purchase_date"),
+    ("ix_purchase_supplier_id_purchase_date", "supplier_id, purchase_date"),
+    ("ix_purchase_part_id_purchase_date", "part_id, purchase_date"),
+)
+RANGE_CHECK = "check_purchase_legacy_range"
+MONTHS_AHEAD = 3
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade(op):
+    if op.scalar("SELECT relkind FROM pg_class WHERE oid = to_regclass('purchase')") == "p":
+        return  # 已是分区表（由 create_all 按模型新建）
+
+    # 1. 切换月：存量与切换前写入的数据都早于该日期。取已有最大采购日期与当月中较晚者再往后两个月，
+    #    给迁移期间的新单留余量；重跑时沿用已建约束中的日期
+    existing = op.scalar(
+        "SELECT pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = 'purchase'::regclass AND conname = :name",
+        {"name": RANGE_CHECK},
+    )
+    if existing:
+        cutoff = date.fromisoformat(re.search(r"'(\d{4}-\d{2}-\d{2})'", existing).group(1))
+    else:
+        cutoff = op.scalar(
+            "SELECT (date_trunc('month', GREATEST(max(purchase_date), current_date)) + interval '2 months')::date "
+            "FROM purchase"
+        )
+
+    # 2. 分区表主键须含分区键：在线建 (purchase_id, purchase_date) 唯一索引，稍后直接转为主键
+    op.create_index("purchase_legacy_pkey", "purchase", ["purchase_id", "purchase_date"], unique=True)
+
+    # 3. 已校验的范围 CHECK 让 ATTACH PARTITION 跳过全表扫描；VALIDATE 不阻塞读写
+    op.add_constraint_not_valid("purchase", RANGE_CHECK, f"CHECK (purchase_date < DATE '{cutoff.isoformat()}')")
+    op.validate_constraint("purchase", RANGE_CHECK)
+
+    # 4. 短事务内完成切换，只改元数据
+    statements = [
+        "ALTER TABLE purchase RENAME TO purchase_legacy",
+        "ALTER TABLE purchase_legacy DROP CONSTRAINT purchase_pkey",
+        "ALTER TABLE purchase_legacy ADD CONSTRAINT purchase_legacy_pkey PRIMARY KEY USING INDEX purchase_legacy_pkey",
+        "DROP TRIGGER IF EXISTS trg_purchase_set_updated_at ON purchase_legacy",
+    ]
+    statements += [f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_legacy" for name, _ in INDEXES]
+    statements.append(
+        """
+        CREATE TABLE purchase (
+            purchase_id VARCHAR(30) NOT NULL,
+            part_id VARCHAR(20) NOT NULL REFERENCES part (part_id),
+            supplier_id VARCHAR(20) NOT NULL REFERENCES supplier (supplier_id),
+            warehouse_id VARCHAR(20) NOT NULL REFERENCES warehouse (warehouse_id),
+            purchase_date DATE NOT NULL,
+            quantity INTEGER NOT NULL,
+            actual_price DECIMAL(10, 2) NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            updated_at TIMESTAMPTZ DEFAULT NOW(),
+            CONSTRAINT purchase_pkey PRIMARY KEY (purchase_id, purchase_date),
+            CONSTRAINT check_quantity_positive CHECK (quantity > 0),
+            CONSTRAINT check_price_positive CHECK (actual_price > 0)
+        ) PARTITION BY RANGE (purchase_date)
+        """
+    )
+    # 空分区表上建索引瞬时完成；ATTACH 时分区上结构相同的索引/主键/外键会被直接挂接复用
+    statements += [f"CREATE INDEX {name} ON purchase ({columns})" for name, columns in INDEXES]
+    statements += [
+        f"ALTER TABLE purchase ATTACH PARTITION purchase_legacy FOR VALUES FROM (MINVALUE) TO ('{cutoff.isoformat()}')",
+        "CREATE TRIGGER trg_purchase_set_updated_at BEFORE UPDATE ON purchase "
+        "FOR EACH ROW EXECUTE FUNCTION set_updated_at()",
+    ]
+    month = cutoff
+    for _ in range(MONTHS_AHEAD):
+        following = _add_months(month, 1)
+        statements.append(
+            f"CREATE TABLE purchase_p{month:%Y_%m} PARTITION OF purchase "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+        )
+        month = following
+    op.execute(*statements)
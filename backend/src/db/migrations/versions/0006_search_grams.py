@@ -0,0 +1,42 @@
+"""站内搜索：单字/双字切分函数与零件、供应商、员工名称（及供应商地址）的 GIN 索引。"""
+
+FUNCTIONS = (
+    """
+    CREATE OR REPLACE FUNCTION search_grams(value text) RETURNS text[]
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT coalesce(array_agg(DISTINCT substr(lower(value), i, n)), '{}')
+        FROM generate_series(1, 2) AS n, generate_series(1, char_length(value) - n + 1) AS i
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION search_query_grams(value text) RETURNS text[]
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT CASE WHEN char_length(value) = 1 THEN ARRAY[lower(value)]
+               ELSE (SELECT coalesce(array_agg(DISTINCT substr(lower(value), i, 2)), '{}')
+                     FROM generate_series(1, char_length(value) - 1) AS i)
+               END
+    $$
+    """,
+)
+
+INDEXES = (
+    ("ix_part_name_grams", "part", "name"),
+    ("ix_supplier_name_grams", "supplier", "name"),
+    ("ix_supplier_address_grams", "supplier", "address"),
+    ("ix_staff_name_grams", "staff", "name"),
+)
+
+
+def upgrade(op):
+    op.execute(*FUNCTIONS)
+    for name, table, column in INDEXES:
+        op.create_index(name, table, [f"search_grams({column})"], using="gin")
+
+
+def downgrade(op):
+    for name, _, _ in reversed(INDEXES):
+        op.drop_index(name)
+    op.execute(
+        "DROP FUNCTION IF EXISTS search_query_grams(text)",
+        "DROP FUNCTION IF EXISTS search_grams(text)",
+    )
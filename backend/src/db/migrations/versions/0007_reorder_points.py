@@ -0,0 +1,53 @@
+"""库存补货阈值（reorder_point / target_level）、低库存部分索引与 stock_alert 告警表。"""
+
+CHECKS = (
+    ("check_reorder_point_non_negative", "CHECK (reorder_point >= 0)"),
+    ("check_target_level_gte_reorder_point", "CHECK (target_level >= reorder_point)"),
+)
+
+
+def upgrade(op):
+    # 可空且无默认值的新列只改目录，不重写表
+    op.execute(
+        "ALTER TABLE inventory ADD COLUMN IF NOT EXISTS reorder_point INTEGER, "
+        "ADD COLUMN IF NOT EXISTS target_level INTEGER"
+    )
+    for name, definition in CHECKS:
+        op.add_constraint_not_valid("inventory", name, definition)
+        op.validate_constraint("inventory", name)
+    op.create_index(
+        "ix_inventory_below_reorder_point",
+        "inventory",
+        ["warehouse_id", "part_id"],
+        where="stock_quantity <= reorder_point",
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS stock_alert (
+            id BIGSERIAL PRIMARY KEY,
+            warehouse_id VARCHAR(20) NOT NULL,
+            part_id VARCHAR(20) NOT NULL,
+            stock_quantity INTEGER NOT NULL,
+            reorder_point INTEGER NOT NULL,
+            target_level INTEGER,
+            suggested_quantity INTEGER,
+            status VARCHAR(10) NOT NULL DEFAULT 'open',
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            resolved_at TIMESTAMPTZ,
+            CONSTRAINT check_stock_alert_status CHECK (status IN ('open', 'resolved'))
+        )
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_stock_alert_open ON stock_alert (warehouse_id, part_id) "
+        "WHERE status = 'open'",
+        "CREATE INDEX IF NOT EXISTS ix_stock_alert_created_at ON stock_alert (created_at)",
+    )
+
+
+def downgrade(op):
+    op.execute("DROP TABLE IF EXISTS stock_alert")
+    op.drop_index("ix_inventory_below_reorder_point")
+    for name, _ in reversed(CHECKS):
+        op.drop_constraint("inventory", name)
+    op.execute(
+        "ALTER TABLE inventory DROP COLUMN IF EXISTS target_level, DROP COLUMN IF EXISTS reorder_point"
+    )
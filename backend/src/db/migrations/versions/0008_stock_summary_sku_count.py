@@ -0,0 +1,25 @@
+"""
+warehouse_stock_summary 增加零件种数 sku_count，并为按阈值统计低库存数建 inventory (warehouse_id, stock_quantity) 索引。
+回填以一条按仓库分组的 UPDATE 完成；迁移期间旧版本实例不维护 sku_count，发布后调用 POST /factory/stats/rebuild 校正。
+"""
+
+
+def upgrade(op):
+    # 带常量默认值的 NOT NULL 新列只改目录，不重写表
+    op.execute("ALTER TABLE warehouse_stock_summary ADD COLUMN IF NOT EXISTS sku_count INTEGER NOT NULL DEFAULT 0")
+    op.execute(
+        """
+        UPDATE warehouse_stock_summary s
+        SET sku_count = c.sku_count
+        FROM (SELECT warehouse_id, count(*) AS sku_count FROM inventory GROUP BY warehouse_id) c
+        WHERE c.warehouse_id = s.warehouse_id
+        """
+    )
+    op.create_index(
+        "ix_inventory_warehouse_id_stock_quantity", "inventory", ["warehouse_id", "stock_quantity"]
+    )
+
+
+def downgrade(op):
+    op.drop_index("ix_inventory_warehouse_id_stock_quantity")
+    op.execute("ALTER TABLE warehouse_stock_summary DROP COLUMN IF EXISTS sku_count")
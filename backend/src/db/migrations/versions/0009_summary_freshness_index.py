@@ -0,0 +1,9 @@
+"""purchase_daily_summary (updated_at) 索引：看板读取汇总新鲜度时不再扫描整张汇总表。"""
+
+
+def upgrade(op):
+    op.create_index("ix_purchase_daily_summary_updated_at", "purchase_daily_summary", ["updated_at"])
+
+
+def downgrade(op):
+    op.drop_index("ix_purchase_daily_summary_updated_at")
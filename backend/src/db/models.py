@@ -1,7 +1,7 @@
 # models.py
 from sqlalchemy import (
-    Column, String, Integer, DECIMAL, Date, CHAR, DateTime,
-    ForeignKey, CheckConstraint, UniqueConstraint, func
+    Column, String, Integer, BigInteger, DECIMAL, Date, CHAR, DateTime,
+    ForeignKey, CheckConstraint, UniqueConstraint, Index, DDL, event, func, text
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
@@ -11,6 +11,24 @@ from sqlalchemy.orm import relationship
 # declarative_base() 创建了一个基类，用于定义数据库表结构的映射
 Base = declarative_base()
 
+# 站内搜索的切分函数（services/search.py）：按小写单字与相邻双字切分，
+# 其 GIN 索引可服务任意长度的子串查询，包括 pg_trgm 无法提取三元组的一两个汉字（如“轴承”）
+SEARCH_FUNCTIONS_DDL = """
+CREATE OR REPLACE FUNCTION search_grams(value text) RETURNS text[]
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT coalesce(array_agg(DISTINCT substr(lower(value), i, n)), '{}')
+    FROM generate_series(1, 2) AS n, generate_series(1, char_length(value) - n + 1) AS i
+$$;
+CREATE OR REPLACE FUNCTION search_query_grams(value text) RETURNS text[]
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE WHEN char_length(value) = 1 THEN ARRAY[lower(value)]
+           ELSE (SELECT coalesce(array_agg(DISTINCT substr(lower(value), i, 2)), '{}')
+                 FROM generate_series(1, char_length(value) - 1) AS i)
+           END
+$$;
+"""
+event.listen(Base.metadata, 'before_create', DDL(SEARCH_FUNCTIONS_DDL))
+
 
 class AppUser(Base):
     __tablename__ = 'app_user'
@@ -29,6 +47,10 @@ class AppUser(Base):
             "role IN ('admin','warehouse_manager','purchaser','inventory_operator')",
             name='check_app_user_role',
         ),
+        Index('ix_app_user_role', 'role'),
+        Index('ix_app_user_warehouse_id', 'warehouse_id'),
+        # email ILIKE '%...%' 需 pg_trgm 三元组 GIN 索引
+        Index('ix_app_user_email_trgm', 'email', postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}),
     )
 
 
@@ -40,11 +62,12 @@ class Part(Base):
     unit_price = Column(DECIMAL(10, 2), nullable=False)
     type = Column(String(50), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
 
     # 约束：单价 >= 0
     __table_args__ = (
         CheckConstraint('unit_price >= 0', name='check_unit_price_positive'),
+        Index('ix_part_type', 'type'),
     )
 
 class Supplier(Base):
@@ -55,7 +78,11 @@ class Supplier(Base):
     address = Column(String(200))
     phone = Column(String(20))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
+
+    __table_args__ = (
+        Index('ix_supplier_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
 
 class Warehouse(Base):
     __tablename__ = 'warehouse'
@@ -63,7 +90,7 @@ class Warehouse(Base):
     warehouse_id = Column(String(20), primary_key=True)
     address = Column(String(200), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
 
     # 可选：未来加组长时在此添加
     # leader_staff_id = Column(String(20), ForeignKey('staff.staff_id'), unique=True)
@@ -78,11 +105,12 @@ class Staff(Base):
     title = Column(String(50))
     warehouse_id = Column(String(20), ForeignKey('warehouse.warehouse_id'), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
     
     # 约束：性别只能是 M/F
     __table_args__ = (
         CheckConstraint("gender IN ('M', 'F')", name='check_gender'),
+        Index('ix_staff_warehouse_id', 'warehouse_id'),
     )
 
 class Inventory(Base):
@@ -91,13 +119,27 @@ class Inventory(Base):
     warehouse_id = Column(String(20), ForeignKey('warehouse.warehouse_id'), primary_key=True)
     part_id = Column(String(20), ForeignKey('part.part_id'), primary_key=True)
     stock_quantity = Column(Integer, nullable=False)
+    # 补货阈值：库存降到 reorder_point（含）及以下即为低库存；target_level 为补货目标，两者为空表示不监控
+    reorder_point = Column(Integer)
+    target_level = Column(Integer)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
     
     # 表级约束：确保库存数量不能为负数
     # 当尝试插入或更新为负数时会触发数据库错误
     __table_args__ = (
         CheckConstraint('stock_quantity >= 0', name='check_stock_non_negative'),
+        CheckConstraint('reorder_point >= 0', name='check_reorder_point_non_negative'),
+        CheckConstraint('target_level >= reorder_point', name='check_target_level_gte_reorder_point'),
+        # 主键 (warehouse_id, part_id) 无法服务仅按 part_id 的查询
+        Index('ix_inventory_part_id', 'part_id'),
+        # 看板按任意阈值统计各仓库低库存数（stock_quantity < 阈值），只需在索引内做范围计数
+        Index('ix_inventory_warehouse_id_stock_quantity', 'warehouse_id', 'stock_quantity'),
+        # 部分索引只含低库存行（reorder_point 为空时条件为 NULL，不入索引），低库存列表无需扫全表
+        Index(
+            'ix_inventory_below_reorder_point', 'warehouse_id', 'part_id',
+            postgresql_where=text('stock_quantity <= reorder_point'),
+        ),
     )
 
 class Purchase(Base):
@@ -107,11 +149,12 @@ class Purchase(Base):
     part_id = Column(String(20), ForeignKey('part.part_id'), nullable=False)
     supplier_id = Column(String(20), ForeignKey('supplier.supplier_id'), nullable=False)
     warehouse_id = Column(String(20), ForeignKey('warehouse.warehouse_id'), nullable=False)
-    purchase_date = Column(Date, nullable=False)
+    # 分区键：分区表的主键必须包含分区键，库内主键为 (purchase_id, purchase_date)
+    purchase_date = Column(Date, primary_key=True, nullable=False)
     quantity = Column(Integer, nullable=False)
     actual_price = Column(DECIMAL(10, 2), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
     
     # 表级约束：确保采购业务逻辑的合理性
     # - 采购数量必须为正数（不能为零或负数）
@@ -119,4 +162,94 @@ class Purchase(Base):
     __table_args__ = (
         CheckConstraint('quantity > 0', name='check_quantity_positive'),
         CheckConstraint('actual_price > 0', name='check_price_positive'),
+        # 列表按仓库/供应商/零件过滤，常叠加采购日期范围
+        Index('ix_purchase_warehouse_id_purchase_date', 'warehouse_id', 'purchase_date'),
+        Index('ix_purchase_supplier_id_purchase_date', 'supplier_id', 'purchase_date'),
+        Index('ix_purchase_part_id_purchase_date', 'part_id', 'purchase_date'),
+        # 按月范围分区，分区由 src/db/partitions.py 与 services/partitions.py 维护
+        {'postgresql_partition_by': 'RANGE (purchase_date)'},
     )
+    # ORM 仍以 purchase_id 标识采购单（db.get / 按 id 更新删除）；其全局唯一由服务层校验
+    __mapper_args__ = {'primary_key': [purchase_id]}
+
+
+# 站内搜索字段的切分 GIN 索引
+Index('ix_part_name_grams', func.search_grams(Part.name), postgresql_using='gin')
+Index('ix_supplier_name_grams', func.search_grams(Supplier.name), postgresql_using='gin')
+Index('ix_supplier_address_grams', func.search_grams(Supplier.address), postgresql_using='gin')
+Index('ix_staff_name_grams', func.search_grams(Staff.name), postgresql_using='gin')
+
+
+class DeletedRecord(Base):
+    __tablename__ = 'deleted_record'
+
+    # 删除墓碑：增量同步（changed_since）据此得知哪些记录已被删除
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    resource = Column(String(30), nullable=False)
+    record_key = Column(String(100), nullable=False)  # 主键；复合主键以逗号拼接，如 "W01,P1001"
+    deleted_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_deleted_record_resource_deleted_at', 'resource', 'deleted_at'),
+    )
+
+
+class StockAlert(Base):
+    __tablename__ = 'stock_alert'
+
+    # 低库存告警：由 services/stock_alerts.py 按变更增量评估生成；库存回到阈值以上时置为 resolved
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    warehouse_id = Column(String(20), nullable=False)
+    part_id = Column(String(20), nullable=False)
+    stock_quantity = Column(Integer, nullable=False)  # 触发时的库存
+    reorder_point = Column(Integer, nullable=False)
+    target_level = Column(Integer)
+    suggested_quantity = Column(Integer)  # 补到 target_level 所需数量；未设目标时为空
+    status = Column(String(10), nullable=False, server_default='open')
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    resolved_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        CheckConstraint("status IN ('open', 'resolved')", name='check_stock_alert_status'),
+        # 每个 (仓库, 零件) 至多一条未关闭告警，重复评估由 ON CONFLICT DO NOTHING 去重
+        Index(
+            'ux_stock_alert_open', 'warehouse_id', 'part_id',
+            unique=True, postgresql_where=text("status = 'open'"),
+        ),
+        Index('ix_stock_alert_created_at', 'created_at'),
+    )
+
+
+# ---- 汇总表（派生数据，由 services/summaries.py 增量维护，可整体重建） ----
+
+class PurchaseDailySummary(Base):
+    __tablename__ = 'purchase_daily_summary'
+
+    purchase_date = Column(Date, primary_key=True)
+    warehouse_id = Column(String(20), primary_key=True)
+    supplier_id = Column(String(20), primary_key=True)
+    part_id = Column(String(20), primary_key=True)
+    purchase_count = Column(Integer, nullable=False, server_default='0')
+    quantity = Column(BigInteger, nullable=False, server_default='0')
+    spend = Column(DECIMAL(16, 2), nullable=False, server_default='0')
+    # 看板以 max(updated_at) 展示汇总新鲜度，索引使其只读索引末端
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
+
+
+class WarehouseStockSummary(Base):
+    __tablename__ = 'warehouse_stock_summary'
+
+    warehouse_id = Column(String(20), primary_key=True)
+    total_quantity = Column(BigInteger, nullable=False, server_default='0')
+    stock_value = Column(DECIMAL(16, 2), nullable=False, server_default='0')
+    # 有库存记录的零件种数，随库存记录增删增量维护
+    sku_count = Column(Integer, nullable=False, server_default='0')
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class SummaryRebuild(Base):
+    __tablename__ = 'summary_rebuild'
+
+    # 汇总表名 -> 最近一次整体重建时间，用于判断汇总数据的新鲜度
+    name = Column(String(50), primary_key=True)
+    rebuilt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,112 @@
+"""
+purchase 按月范围分区（RANGE (purchase_date)）的 DDL 工具，只依赖连接，供迁移、建表/示例数据脚本与服务层共用。
+
+- 每月一个分区，命名 purchase_pYYYY_MM，范围 [当月 1 日, 次月 1 日)；
+- 由非分区表迁移而来时，存量数据整体作为 purchase_legacy 分区（MINVALUE 至切换月）；
+- 不设 DEFAULT 分区：有默认分区时无法 DETACH ... CONCURRENTLY，且新建分区需扫描默认分区。
+  写入前由服务层确保目标月份的分区存在。
+"""
+
+import re
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+PARENT = "purchase"
+LEGACY_PARTITION = "purchase_legacy"
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_p{month:%Y_%m}"
+
+
+def _parse_bound(value: str) -> Optional[date]:
+    # MINVALUE / MAXVALUE 表示无界
+    value = value.strip()
+    if value.upper() in ("MINVALUE", "MAXVALUE"):
+        return None
+    return date.fromisoformat(value.strip("'"))
+
+
+def list_purchase_partitions(conn: Connection) -> List[dict]:
+    """[{name, range_from, range_to, estimated_rows, detach_pending}]，按范围排序；range_from 为 None 表示无下界。"""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound, "
+            "c.reltuples::bigint AS estimated_rows, i.inhdetachpending AS detach_pending "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:parent)"
+        ),
+        {"parent": PARENT},
+    )
+    partitions = []
+    for row in rows:
+        match = _BOUND_RE.search(row.bound or "")
+        if not match:
+            continue
+        partitions.append(
+            {
+                "name": row.name,
+                "range_from": _parse_bound(match.group(1)),
+                "range_to": _parse_bound(match.group(2)),
+                # 从未 ANALYZE 的表 reltuples 为 -1
+                "estimated_rows": max(row.estimated_rows, 0),
+                "detach_pending": row.detach_pending,
+            }
+        )
+    return sorted(partitions, key=lambda p: p["range_from"] or date.min)
+
+
+def list_detached_purchase_partitions(conn: Connection) -> List[str]:
+    """
+    父表所在 schema 中已不再是分区的 purchase_pYYYY_MM / purchase_legacy 表名：
+    分离后未能移入归档 schema（移动失败或进程中断）的遗留分区。
+    """
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_class c "
+            "WHERE c.relnamespace = (SELECT relnamespace FROM pg_class WHERE oid = to_regclass(:parent)) "
+            "AND c.relkind = 'r' AND NOT c.relispartition "
+            "AND (c.relname ~ :pattern OR c.relname = :legacy) "
+            "ORDER BY c.relname"
+        ),
+        {"parent": PARENT, "pattern": f"^{PARENT}_p[0-9]{{4}}_[0-9]{{2}}$", "legacy": LEGACY_PARTITION},
+    )
+    return list(rows.scalars())
+
+
+def covers_month(partition: dict, month: date) -> bool:
+    lower, upper = partition["range_from"], partition["range_to"]
+    return (lower is None or lower <= month) and (upper is None or month < upper)
+
+
+def ensure_purchase_partitions(conn: Connection, start: date, end: date) -> List[str]:
+    """为 start 所在月至 end 所在月中尚无分区覆盖的月份建分区（不提交），返回新建的分区名。"""
+    existing = list_purchase_partitions(conn)
+    created = []
+    month = month_start(start)
+    while month <= end:
+        if not any(covers_month(p, month) for p in existing):
+            name = partition_name(month)
+            conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                )
+            )
+            created.append(name)
+        month = add_months(month, 1)
+    return created
@@ -0,0 +1,262 @@
+"""
+按规模生成合成数据（容量测试 / 基准用），以 COPY ... FROM STDIN 流式写入，千万级采购行内存占用仍只有一个数据块。
+
+- 规模：仓库 × 零件 × 供应商 × 若干年的采购，编号带 B 前缀（BW001 / BP00001 / BS0001 / BE00001 / BPUR...），
+  与样例数据不冲突；
+- 分布：零件热度服从 Zipf（少数零件占多数采购），单价对数正态，便宜零件单次采购量更大；
+  每个零件固定 1~3 家供应商；仓库规模不等；采购量逐年增长、工作日多于周末，单号随日期递增；
+- 确定性：各表使用由 seed 派生的独立随机序列，同样参数生成的数据完全一致，基准结果可跨提交对比；
+- 库存取各 (仓库, 零件) 采购数量之和，由数据库在加载后一条 INSERT ... SELECT 汇总。
+
+generate_synthetic 在调用方连接的事务内执行（不提交），已存在合成数据时先 reset_synthetic 清除。
+"""
+
+import bisect
+import csv
+import io
+import math
+import random
+from datetime import date, timedelta
+from itertools import accumulate, islice
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from src.db.partitions import ensure_purchase_partitions
+
+SYNTHETIC_START = date(2023, 1, 1)
+CHUNK_ROWS = 50_000
+
+CATEGORIES: Dict[str, Sequence[str]] = {
+    "轴承": ("深沟球轴承", "圆锥滚子轴承", "圆柱滚子轴承", "推力球轴承", "调心轴承"),
+    "齿轮": ("直齿轮", "斜齿轮", "锥齿轮", "蜗轮", "行星齿轮组"),
+    "密封件": ("O 型圈", "油封", "机械密封", "密封垫片", "液压密封圈"),
+    "紧固件": ("六角螺栓", "内六角螺钉", "平垫圈", "弹簧垫圈", "锁紧螺母"),
+    "传动件": ("同步带", "链条", "联轴器", "皮带轮", "传动轴"),
+    "液压件": ("液压缸", "换向阀", "溢流阀", "齿轮泵", "液压管接头"),
+    "电气件": ("接触器", "继电器", "断路器", "行程开关", "编码器"),
+    "电机": ("伺服电机", "步进电机", "减速电机", "变频电机", "直流电机"),
+}
+CITIES = ("上海", "北京", "深圳", "苏州", "宁波", "无锡", "天津", "重庆", "成都", "武汉", "西安", "青岛", "佛山", "温州")
+SUPPLIER_WORDS = ("精工", "华泰", "恒通", "宏达", "永固", "力源", "正兴", "东方", "联创", "远航", "金石", "博远")
+SUPPLIER_SUFFIXES = ("机械有限公司", "五金制品厂", "传动科技有限公司", "工业设备有限公司", "精密制造有限公司")
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾"
+GIVEN = "伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉萍红建文辉宁"
+TITLES = ("仓管员", "仓管员", "仓管员", "叉车司机", "质检员", "仓库主管")
+
+PURCHASE_COLUMNS = ("purchase_id", "part_id", "supplier_id", "warehouse_id", "purchase_date", "quantity", "actual_price")
+
+
+class _ChunkStream(io.RawIOBase):
+    """把逐块生成的 CSV 文本包装成只读流，COPY 读取时才生成下一块。"""
+
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self._view = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._view:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._view = memoryview(chunk.encode())
+        size = min(len(buffer), len(self._view))
+        buffer[:size] = self._view[:size]
+        self._view = self._view[size:]
+        return size
+
+
+def _csv_chunks(rows: Iterable[Sequence], chunk_rows: int) -> Iterator[str]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, chunk_rows))
+        if not batch:
+            return
+        out = io.StringIO()
+        csv.writer(out, lineterminator="\n").writerows(batch)
+        yield out.getvalue()
+
+
+def _copy(conn: Connection, table: str, columns: Sequence[str], rows: Iterable[Sequence], chunk_rows: int) -> None:
+    # 使用与 conn 相同的 DBAPI 连接，COPY 处于同一事务
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            _ChunkStream(_csv_chunks(rows, chunk_rows)),
+            size=1 << 20,
+        )
+    finally:
+        cursor.close()
+
+
+def _rng(seed: int, name: str) -> random.Random:
+    return random.Random(f"{seed}:{name}")
+
+
+def _picker(rng: random.Random, weights: Sequence[float]) -> Callable[[], int]:
+    """按权重抽取下标；累计权重 + 二分，比 random.choices 的单次调用开销小。"""
+    cumulative = list(accumulate(weights))
+    total = cumulative[-1]
+    random_ = rng.random
+    return lambda: bisect.bisect(cumulative, random_() * total)
+
+
+def _person_name(rng: random.Random) -> str:
+    return rng.choice(SURNAMES) + "".join(rng.choice(GIVEN) for _ in range(rng.choice((1, 2))))
+
+
+def reset_synthetic(conn: Connection) -> None:
+    """
+    删除全部合成数据（按 B 前缀编号识别），样例与业务数据不受影响。
+    采购与库存按引用的合成仓库/零件/供应商删除，压测（benchmarks.api_latency）写入的采购单一并清除。
+    """
+    for statement in (
+        "DELETE FROM purchase WHERE warehouse_id LIKE 'BW%' OR part_id LIKE 'BP%' OR supplier_id LIKE 'BS%'",
+        "DELETE FROM inventory WHERE warehouse_id LIKE 'BW%' OR part_id LIKE 'BP%'",
+        "DELETE FROM staff WHERE staff_id LIKE 'BE%'",
+        "DELETE FROM part WHERE part_id LIKE 'BP%'",
+        "DELETE FROM supplier WHERE supplier_id LIKE 'BS%'",
+        "DELETE FROM warehouse WHERE warehouse_id LIKE 'BW%'",
+    ):
+        conn.execute(text(statement))
+
+
+def synthetic_exists(conn: Connection) -> bool:
+    return conn.execute(text("SELECT 1 FROM warehouse WHERE warehouse_id = 'BW001'")).first() is not None
+
+
+def generate_synthetic(
+    conn: Connection,
+    warehouses: int,
+    parts: int,
+    suppliers: int,
+    purchases: int,
+    years: int = 2,
+    seed: int = 42,
+    chunk_rows: int = CHUNK_ROWS,
+    log: Optional[Callable[[str], None]] = None,
+) -> None:
+    """在 conn 的事务内生成合成数据（不提交）。"""
+    log = log or (lambda message: None)
+    end = SYNTHETIC_START.replace(year=SYNTHETIC_START.year + years)
+    days = (end - SYNTHETIC_START).days
+    ensure_purchase_partitions(conn, SYNTHETIC_START, end - timedelta(days=1))
+
+    # 仓库：规模对数正态分布，决定员工数与采购入库占比
+    rng = _rng(seed, "warehouse")
+    warehouse_ids = [f"BW{i:03d}" for i in range(1, warehouses + 1)]
+    warehouse_weights = [rng.lognormvariate(0, 0.6) for _ in warehouse_ids]
+    _copy(
+        conn,
+        "warehouse",
+        ("warehouse_id", "address"),
+        ((w, f"{rng.choice(CITIES)}市第{i}物流园 {rng.randint(1, 20)} 号库") for i, w in enumerate(warehouse_ids, 1)),
+        chunk_rows,
+    )
+
+    rng = _rng(seed, "staff")
+    heaviest = max(warehouse_weights)
+    staff_rows = []
+    for w, weight in zip(warehouse_ids, warehouse_weights):
+        for _ in range(5 + round(35 * weight / heaviest)):
+            hired = SYNTHETIC_START - timedelta(days=rng.randint(0, 3650))
+            staff_rows.append((_person_name(rng), rng.choice("MF"), hired, rng.choice(TITLES), w))
+    _copy(
+        conn,
+        "staff",
+        ("staff_id", "name", "gender", "hire_date", "title", "warehouse_id"),
+        ((f"BE{i:05d}", *row) for i, row in enumerate(staff_rows, 1)),
+        chunk_rows,
+    )
+
+    rng = _rng(seed, "supplier")
+    supplier_ids = [f"BS{i:04d}" for i in range(1, suppliers + 1)]
+    _copy(
+        conn,
+        "supplier",
+        ("supplier_id", "name", "address", "phone"),
+        (
+            (
+                s,
+                f"{rng.choice(CITIES)}{rng.choice(SUPPLIER_WORDS)}{rng.choice(SUPPLIER_SUFFIXES)}",
+                f"{rng.choice(CITIES)}市",
+                f"1{rng.choice('3589')}{rng.randint(0, 999_999_999):09d}",
+            )
+            for s in supplier_ids
+        ),
+        chunk_rows,
+    )
+
+    # 零件：单价对数正态（中位数约 20 元）；热度按随机排列后的名次服从 Zipf(1.1)；每个零件 1~3 家供应商
+    rng = _rng(seed, "part")
+    part_ids = [f"BP{i:05d}" for i in range(1, parts + 1)]
+    categories = list(CATEGORIES)
+    prices = [round(min(max(rng.lognormvariate(3.0, 1.0), 0.1), 50_000), 2) for _ in part_ids]
+    ranks = list(range(1, parts + 1))
+    rng.shuffle(ranks)
+    part_weights = [1 / rank ** 1.1 for rank in ranks]
+    part_suppliers = [rng.sample(supplier_ids, min(rng.randint(1, 3), suppliers)) for _ in part_ids]
+    part_rows = []
+    for p, price in zip(part_ids, prices):
+        category = rng.choice(categories)
+        name = f"{rng.choice(CATEGORIES[category])} {rng.choice('ABCDEFGHK')}{rng.randint(10, 9999)}"
+        part_rows.append((p, name, price, category))
+    _copy(conn, "part", ("part_id", "name", "unit_price", "type"), part_rows, chunk_rows)
+    log(f"维表已写入：仓库 {warehouses}、员工 {len(staff_rows)}、供应商 {suppliers}、零件 {parts}")
+
+    # 每日采购量：逐年增长约 20%，周末约为工作日三成，另有日间波动；按累计比例分配，总数恰为 purchases
+    rng = _rng(seed, "calendar")
+    day_weights = []
+    for offset in range(days):
+        day = SYNTHETIC_START + timedelta(days=offset)
+        weekend = 0.3 if day.weekday() >= 5 else 1.0
+        day_weights.append(1.2 ** (offset / 365) * weekend * rng.lognormvariate(0, 0.25))
+    total_weight = sum(day_weights)
+
+    def purchase_rows() -> Iterator[tuple]:
+        rng = _rng(seed, "purchase")
+        random_ = rng.random
+        pick_part = _picker(rng, part_weights)
+        pick_warehouse = _picker(rng, warehouse_weights)
+        seq = 0
+        running = 0.0
+        for offset, weight in enumerate(day_weights):
+            running += weight
+            day_total = round(running / total_weight * purchases) - seq
+            purchase_date = (SYNTHETIC_START + timedelta(days=offset)).isoformat()
+            for _ in range(day_total):
+                seq += 1
+                part = pick_part()
+                price = prices[part]
+                candidates = part_suppliers[part]
+                # 便宜零件单次采购量大：基准量约 500 / 单价，再乘对数正态波动
+                base = min(max(500 / price, 1.0), 2000.0)
+                quantity = max(1, int(base * math.exp(rng.gauss(0, 0.7))))
+                yield (
+                    f"BPUR{seq:010d}",
+                    part_ids[part],
+                    candidates[int(random_() * len(candidates))],
+                    warehouse_ids[pick_warehouse()],
+                    purchase_date,
+                    quantity,
+                    max(round(price * (0.85 + 0.2 * random_()), 2), 0.01),
+                )
+
+    _copy(conn, "purchase", PURCHASE_COLUMNS, purchase_rows(), chunk_rows)
+    log(f"采购已写入：{purchases} 行（{SYNTHETIC_START} 至 {end - timedelta(days=1)}）")
+
+    conn.execute(
+        text(
+            """INSERT INTO inventory (warehouse_id, part_id, stock_quantity)
+               SELECT warehouse_id, part_id, sum(quantity) FROM purchase
+               WHERE purchase_id LIKE 'BPUR%'
+               GROUP BY warehouse_id, part_id
+               ON CONFLICT (warehouse_id, part_id) DO UPDATE SET stock_quantity = EXCLUDED.stock_quantity"""
+        )
+    )
+    log("库存已按采购汇总写入")